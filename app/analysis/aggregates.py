@@ -0,0 +1,137 @@
+"""
+Rolling per-team result aggregates for the predictor
+Keyed by (sport, canonical team name) and bucketed by day: finished matches
+are folded in as they happen and team statistics are read without touching
+the database
+"""
+import threading
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from merge.matching import normalize_name
+from .rolling import RollingWindow, iter_finished_results
+
+# Counter positions in a bucket / running total
+MATCHES, WINS, DRAWS, LOSSES, GOALS_FOR, GOALS_AGAINST, CLEAN_SHEETS = range(7)
+
+
+def team_key(team_name: str) -> str:
+    """Canonical team key: 'Man. Utd FC' and 'Manchester United' share one entry"""
+    return ' '.join(normalize_name(team_name or ''))
+
+
+def parse_score(score) -> Optional[Tuple[int, int]]:
+    """'2:1' -> (2, 1); None for scores without a result"""
+    if not isinstance(score, str) or ':' not in score:
+        return None
+    try:
+        home, away = score.split(':', 1)
+        return int(home), int(away)
+    except ValueError:
+        return None
+
+
+class TeamAggregateStore:
+    """(sport, team) -> rolling wins/draws/losses, goals and clean sheets.
+
+    Each match contributes once, under its match_id: a later result for the
+    same match (a live score that moved, the final score) replaces the earlier
+    one. A sport is bootstrapped from the reader on first use.
+    """
+
+    def __init__(self, reader=None, window_days: int = 30):
+        self.reader = reader
+        self.window_days = window_days
+        self._teams = RollingWindow(window_days, width=7)  # (sport, team key) -> counters
+        self._counted: Dict[Tuple[str, str], tuple] = {}  # (sport, match_id) -> applied contribution
+        self._loaded = set()
+        self._pruned_on = None
+        self._lock = threading.RLock()
+
+    # Updates
+
+    def record_results(self, sport: str, matches: List[Dict], day: Optional[date] = None):
+        """Fold match results (e.g. LiveStateStore finished matches) into the aggregates"""
+        day = day or date.today()
+        with self._lock:
+            self._prune(date.today())
+            for match in matches:
+                self._apply(sport, match, day)
+
+    def _prune(self, today: date):
+        """Once a day, forget the contributions of matches that left the window"""
+        if self._pruned_on == today:
+            return
+        self._pruned_on = today
+        cutoff = today - timedelta(days=self.window_days)
+        for key in [key for key, contribution in self._counted.items() if contribution[0] <= cutoff]:
+            del self._counted[key]
+
+    def _apply(self, sport: str, match: Dict, day: date):
+        result = parse_score(match.get('score'))
+        home, away = match.get('home_team'), match.get('away_team')
+        if result is None or not home or not away:
+            return
+
+        match_key = (sport, str(match.get('match_id')))
+        previous = self._counted.get(match_key)
+        if previous is not None:
+            self._add(sport, *previous, sign=-1)
+        contribution = (day, home, away, result[0], result[1])
+        self._counted[match_key] = contribution
+        self._add(sport, *contribution, sign=1)
+
+    def _add(self, sport: str, day: date, home: str, away: str, home_goals: int, away_goals: int, sign: int):
+        for name, goals_for, goals_against in ((home, home_goals, away_goals), (away, away_goals, home_goals)):
+            self._teams.add((sport, team_key(name)), day,
+                            (1, goals_for > goals_against, goals_for == goals_against, goals_for < goals_against,
+                             goals_for, goals_against, goals_against == 0), sign)
+
+    def load(self, sport: str):
+        """Bootstrap a sport's aggregates from the reader's finished matches (newest row per match wins)"""
+        with self._lock:
+            if sport in self._loaded:
+                return
+            self._loaded.add(sport)
+            if self.reader is None:
+                return
+
+            for match, day in iter_finished_results(self.reader, sport, self.window_days):
+                if (sport, str(match['match_id'])) in self._counted:
+                    continue  # already updated live since startup
+                self._apply(sport, match, day)
+
+    # Reads
+
+    def get(self, sport: str, team_name: str, days: Optional[int] = None) -> Optional[Dict]:
+        """Statistics for a team over the last days (at most the window); None without results"""
+        self.load(sport)
+        with self._lock:
+            totals = self._teams.totals((sport, team_key(team_name)), days)
+        if totals is None or totals[MATCHES] <= 0:
+            return None
+        return self._stats(team_name, totals)
+
+    @staticmethod
+    def _stats(team_name: str, totals: List[int]) -> Dict:
+        matches = totals[MATCHES]
+        return {
+            'team_name': team_name,
+            'total_matches': matches,
+            'wins': totals[WINS],
+            'draws': totals[DRAWS],
+            'losses': totals[LOSSES],
+            'win_rate': totals[WINS] / matches,
+            'draw_rate': totals[DRAWS] / matches,
+            'loss_rate': totals[LOSSES] / matches,
+            'goals_for': totals[GOALS_FOR],
+            'goals_against': totals[GOALS_AGAINST],
+            'goal_difference': totals[GOALS_FOR] - totals[GOALS_AGAINST],
+            'goals_per_game': totals[GOALS_FOR] / matches,
+            'clean_sheets': totals[CLEAN_SHEETS],
+            'clean_sheet_rate': totals[CLEAN_SHEETS] / matches
+        }
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {'teams': len(self._teams), 'matches': len(self._counted), 'sports_loaded': sorted(self._loaded)}
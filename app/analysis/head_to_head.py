@@ -0,0 +1,194 @@
+"""
+Persistent head-to-head pair index for the predictor
+Finished results are kept per match in the main SQLite database and folded
+into in-memory counts keyed by (sport, home team key, away team key), so a
+head-to-head lookup is a dictionary read instead of a year of daily tables
+"""
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from .aggregates import team_key, parse_score
+from .rolling import RollingWindow, iter_finished_results
+
+# Counter positions in a pair bucket / running total
+MATCHES, HOME_WINS, AWAY_WINS, DRAWS = range(4)
+
+
+class HeadToHeadIndex:
+    """(sport, home, away) -> rolling fixture results over window_days.
+
+    Teams are keyed by analysis.aggregates.team_key, so provider spellings of
+    one team share a pair. Each match contributes once under its match_id; a
+    later result replaces the stored one. A sport is backfilled from the
+    reader the first time it is used and restored from its table afterwards.
+    """
+
+    def __init__(self, db_manager, reader=None, window_days: int = 365):
+        self.db_manager = db_manager
+        self.reader = reader
+        self.window_days = window_days
+        self._pairs = RollingWindow(window_days, width=4)  # (sport, home key, away key) -> counters
+        self._loaded = set()
+        self._pruned_on = None
+        self._lock = threading.RLock()
+        self._init_tables()
+
+    def _init_tables(self):
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS h2h_results (
+                    sport TEXT NOT NULL,
+                    match_id TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    home_key TEXT NOT NULL,
+                    away_key TEXT NOT NULL,
+                    home_goals INTEGER NOT NULL,
+                    away_goals INTEGER NOT NULL,
+                    PRIMARY KEY (sport, match_id)
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_h2h_results_day ON h2h_results (day)')
+            # Sports whose history has been backfilled into h2h_results
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS h2h_sports (
+                    sport TEXT PRIMARY KEY,
+                    backfilled_at TEXT NOT NULL
+                )
+            ''')
+            conn.commit()
+
+    # Updates
+
+    def record_results(self, sport: str, matches: List[Dict], day: Optional[date] = None) -> int:
+        """Fold finished matches into the index and persist them; returns the number recorded"""
+        day = day or date.today()
+        rows = []
+        for match in matches:
+            result = parse_score(match.get('score'))
+            home, away = match.get('home_team'), match.get('away_team')
+            if result is not None and home and away:
+                rows.append((sport, str(match.get('match_id')), day.isoformat(),
+                             team_key(home), team_key(away), result[0], result[1]))
+        if not rows:
+            return 0
+
+        self.load(sport)
+        with self._lock:
+            self._prune(date.today())
+            with self.db_manager.get_connection() as conn:
+                cursor = conn.cursor()
+                for row in rows:
+                    cursor.execute('''
+                        SELECT day, home_key, away_key, home_goals, away_goals FROM h2h_results
+                        WHERE sport = ? AND match_id = ?
+                    ''', row[:2])
+                    previous = cursor.fetchone()
+                    if previous is not None:
+                        self._add(sport, *previous, sign=-1)
+                    self._add(sport, *row[2:], sign=1)
+                cursor.executemany('INSERT OR REPLACE INTO h2h_results VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+                conn.commit()
+        return len(rows)
+
+    def _add(self, sport: str, day, home_key: str, away_key: str, home_goals: int, away_goals: int, sign: int):
+        day = date.fromisoformat(day) if isinstance(day, str) else day
+        self._pairs.add((sport, home_key, away_key), day,
+                        (1, home_goals > away_goals, away_goals > home_goals, home_goals == away_goals), sign)
+
+    def _prune(self, today: date):
+        """Once a day, delete stored results that left the window"""
+        if self._pruned_on == today:
+            return
+        self._pruned_on = today
+        cutoff = (today - timedelta(days=self.window_days)).isoformat()
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM h2h_results WHERE day <= ?", (cutoff,))
+            deleted = cursor.rowcount
+            conn.commit()
+        if deleted:
+            logging.info(f"CLEANUP: Pruned {deleted} head-to-head results older than {self.window_days} days")
+
+    def load(self, sport: str):
+        """Restore a sport's pairs from h2h_results, backfilling it from the reader once"""
+        with self._lock:
+            if sport in self._loaded:
+                return
+            self._loaded.add(sport)
+
+            with self.db_manager.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1 FROM h2h_sports WHERE sport = ?", (sport,))
+                backfilled = cursor.fetchone() is not None
+            if not backfilled:
+                self._backfill(sport)
+
+            cutoff = (date.today() - timedelta(days=self.window_days)).isoformat()
+            with self.db_manager.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT day, home_key, away_key, home_goals, away_goals FROM h2h_results
+                    WHERE sport = ? AND day > ?
+                ''', (sport, cutoff))
+                for row in cursor:
+                    self._add(sport, *row, sign=1)
+
+    def _backfill(self, sport: str):
+        """Store the newest row of every finished match in the window from the reader"""
+        rows = []
+        if self.reader is not None:
+            for match, day in iter_finished_results(self.reader, sport, self.window_days):
+                result = parse_score(match.get('score'))
+                if result is None or not match.get('home_team') or not match.get('away_team'):
+                    continue
+                rows.append((sport, str(match['match_id']), day.isoformat(),
+                             team_key(match['home_team']), team_key(match['away_team']), result[0], result[1]))
+
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            # Results recorded live are newer than the history rows of the same match
+            cursor.executemany('INSERT OR IGNORE INTO h2h_results VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+            cursor.execute("INSERT OR REPLACE INTO h2h_sports (sport, backfilled_at) VALUES (?, ?)",
+                           (sport, datetime.now().isoformat()))
+            conn.commit()
+        logging.info(f"SUCCESS: Backfilled {len(rows)} head-to-head results for {sport}")
+
+    # Reads
+
+    def _totals(self, sport: str, home: str, away: str, days: Optional[int]) -> List[int]:
+        return self._pairs.totals((sport, team_key(home), team_key(away)), days) or [0] * 4
+
+    def get(self, sport: str, home_team: str, away_team: str, days: Optional[int] = None) -> Dict:
+        """Results of home_team hosting away_team, shaped like MatchPredictor.get_head_to_head_stats"""
+        self.load(sport)
+        with self._lock:
+            totals = self._totals(sport, home_team, away_team, days)
+        total = totals[MATCHES]
+        stats = {'total_matches': total, 'home_wins': totals[HOME_WINS],
+                 'away_wins': totals[AWAY_WINS], 'draws': totals[DRAWS]}
+        if total > 0:
+            stats.update(home_win_rate=totals[HOME_WINS] / total, away_win_rate=totals[AWAY_WINS] / total,
+                         draw_rate=totals[DRAWS] / total)
+        return stats
+
+    def get_meetings(self, sport: str, team: str, opponent: str, days: Optional[int] = None) -> Dict:
+        """Both fixtures combined, from team's side: wins, draws and losses against opponent"""
+        self.load(sport)
+        with self._lock:
+            fixture = self._totals(sport, team, opponent, days)
+            reverse = self._totals(sport, opponent, team, days)
+        return {
+            'total_matches': fixture[MATCHES] + reverse[MATCHES],
+            'wins': fixture[HOME_WINS] + reverse[AWAY_WINS],
+            'draws': fixture[DRAWS] + reverse[DRAWS],
+            'losses': fixture[AWAY_WINS] + reverse[HOME_WINS],
+            'home_matches': fixture[MATCHES],
+            'away_matches': reverse[MATCHES]
+        }
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {'pairs': len(self._pairs), 'sports_loaded': sorted(self._loaded)}
@@ -1,6 +1,7 @@
 """
 Sports prediction engine using historical data and statistical analysis
 """
+import copy
 import logging
 import numpy as np
 import pandas as pd
@@ -8,18 +9,44 @@ from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta, date
 from collections import defaultdict
 
-from storage.database import DatabaseManager
+from storage.backend import StorageBackend
+from .aggregates import team_key
+from .cache import TTLCache
+from .score_model import ScoreModel
+
+# Outcome model weights (shared by the single-match and batch paths)
+FORM_WEIGHT = 0.3
+H2H_WEIGHT = 0.4
+HOME_ADVANTAGE = 0.55
+DRAW_WEIGHT = 0.5
+CONFIDENCE_WEIGHTS = (0.4, 0.4, 0.2)  # data availability, form consistency, head-to-head data
 
 class MatchPredictor:
     """Predicts match outcomes using historical data and statistical models"""
 
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: StorageBackend, team_stats=None, cache_config: Optional[Dict] = None,
+                 head_to_head=None):
         self.db = db_manager
-        self.team_stats_cache = {}
-        self.cache_expiry = 3600  # 1 hour
+        # Optional analysis.aggregates.TeamAggregateStore answering team statistics from memory
+        self.team_stats = team_stats
+        # Optional analysis.head_to_head.HeadToHeadIndex answering head-to-head lookups from memory
+        self.head_to_head = head_to_head
+        self.score_model = ScoreModel()
+        # analysis.cache section of config.yaml; entries are tagged with (sport, team key)
+        cache_config = cache_config or {}
+        self.team_stats_cache = TTLCache(cache_config.get('team_stats_entries', 2048),
+                                         cache_config.get('team_stats_hours', 1) * 3600)
+        self.prediction_cache = TTLCache(cache_config.get('prediction_entries', 4096),
+                                         cache_config.get('predictions_hours', 6) * 3600)
 
     def predict_match_outcome(self, home_team: str, away_team: str, sport: str = 'soccer') -> Dict:
         """Predict the outcome of a match between two teams"""
+        cache_key = (sport, home_team.lower(), away_team.lower())
+        cached = self.prediction_cache.get(cache_key)
+        if cached is not None:
+            # Deep copies: callers must not reach the cached 'factors' dict
+            return copy.deepcopy(cached)
+
         try:
             # Get historical data for both teams
             home_stats = self.get_team_statistics(home_team, sport, days=30)
@@ -31,7 +58,7 @@ class MatchPredictor:
             # Calculate prediction using multiple factors
             prediction = self._calculate_prediction(home_stats, away_stats, h2h_stats)
 
-            return {
+            result = {
                 'home_team': home_team,
                 'away_team': away_team,
                 'prediction': prediction,
@@ -43,44 +70,196 @@ class MatchPredictor:
                 },
                 'timestamp': datetime.now().isoformat()
             }
+            self.prediction_cache.set(cache_key, result, self._team_tags(sport, home_team, away_team))
+            return copy.deepcopy(result)
 
         except Exception as e:
             logging.error(f"Error predicting match {home_team} vs {away_team}: {e}")
             return self._default_prediction(home_team, away_team)
 
+    def predict_many(self, matches: List[Dict], sport: str = 'soccer') -> List[Dict]:
+        """predict_match_outcome() for a batch of matches, computed on arrays.
+
+        The sport's team form and head-to-head tables are loaded once; features
+        for every match are gathered with index lookups and the outcome and
+        confidence formulas run vectorized over the batch. Cached matchups are
+        answered from the prediction cache and only the rest are computed.
+        """
+        matches = [m for m in matches if m.get('home_team') and m.get('away_team')]
+        cached = {}
+        for index, match in enumerate(matches):
+            hit = self.prediction_cache.get((sport, match['home_team'].lower(), match['away_team'].lower()))
+            if hit is not None:
+                cached[index] = copy.deepcopy(hit)
+                if 'match_id' in match:
+                    cached[index]['match_id'] = match['match_id']
+        computed = iter(self._predict_batch([m for i, m in enumerate(matches) if i not in cached], sport))
+        return [cached[index] if index in cached else next(computed) for index in range(len(matches))]
+
+    def _predict_batch(self, matches: List[Dict], sport: str) -> List[Dict]:
+        """Vectorized predictions for matches missing from the prediction cache"""
+        if not matches:
+            return []
+
+        home_names = [m['home_team'] for m in matches]
+        away_names = [m['away_team'] for m in matches]
+        home_win, home_total = self._team_feature_arrays(home_names, sport)
+        away_win, away_total = self._team_feature_arrays(away_names, sport)
+
+        # Head-to-head rates; unseen pairings get the same defaults as _calculate_prediction
+        if self.head_to_head is not None:
+            h2h = pd.DataFrame([self.head_to_head.get(sport, home, away, 365) for home, away in zip(home_names, away_names)],
+                               columns=['total_matches', 'home_win_rate', 'away_win_rate', 'draw_rate'])
+        else:
+            h2h = self.get_head_to_head_table(sport, days=365).reindex(
+                pd.MultiIndex.from_arrays([[name.lower() for name in home_names], [name.lower() for name in away_names]])
+            )
+        h2h_home = h2h['home_win_rate'].fillna(0.5).to_numpy(dtype='float64')
+        h2h_away = h2h['away_win_rate'].fillna(0.5).to_numpy(dtype='float64')
+        h2h_draw = h2h['draw_rate'].fillna(0.3).to_numpy(dtype='float64')
+        h2h_total = h2h['total_matches'].fillna(0).to_numpy(dtype='float64')
+
+        outcomes = self._predict_arrays(home_win, away_win, h2h_home, h2h_away, h2h_draw)
+        confidences = self._confidence_arrays(home_win, away_win, home_total + away_total + h2h_total, h2h_total)
+
+        timestamp = datetime.now().isoformat()
+        predictions = []
+        for index, match in enumerate(matches):
+            prediction = {
+                'home_team': match['home_team'],
+                'away_team': match['away_team'],
+                'prediction': str(outcomes[index]),
+                'confidence': round(float(confidences[index]), 1),
+                'factors': {
+                    'home_form': float(home_win[index]),
+                    'away_form': float(away_win[index]),
+                    'head_to_head': float(h2h_home[index])
+                },
+                'timestamp': timestamp
+            }
+            self.prediction_cache.set((sport, match['home_team'].lower(), match['away_team'].lower()), prediction,
+                                      self._team_tags(sport, match['home_team'], match['away_team']))
+            prediction = copy.deepcopy(prediction)
+            if 'match_id' in match:
+                prediction['match_id'] = match['match_id']
+            predictions.append(prediction)
+        return predictions
+
+    def predict_scores(self, matches: List[Dict], sport: str = 'soccer') -> List[Dict]:
+        """predict_score() for a batch of matches, scored by the vectorized Poisson model"""
+        matches = [m for m in matches if m.get('home_team') and m.get('away_team')]
+        if not matches:
+            return []
+
+        stats = {}
+        for match in matches:
+            for name in (match['home_team'], match['away_team']):
+                if name not in stats:
+                    stats[name] = self.get_team_statistics(name, sport, days=30)
+        expected = np.array([self._expected_goals(stats[m['home_team']], stats[m['away_team']]) for m in matches])
+        distributions = self.score_model.evaluate(expected[:, 0], expected[:, 1])
+
+        timestamp = datetime.now().isoformat()
+        predictions = []
+        for match, distribution in zip(matches, distributions):
+            prediction = {'home_team': match['home_team'], 'away_team': match['away_team'], **distribution,
+                          'timestamp': timestamp}
+            if 'match_id' in match:
+                prediction['match_id'] = match['match_id']
+            predictions.append(prediction)
+        return predictions
+
+    @staticmethod
+    def _expected_goals(home_stats: Dict, away_stats: Dict) -> Tuple[float, float]:
+        """Expected goals of both sides: own scoring rate averaged with the opponent's conceding rate"""
+        home_attack = home_stats.get('goals_per_game', 1.5)
+        away_defense = away_stats.get('goals_against', 0) / max(away_stats.get('total_matches', 1), 1)
+
+        away_attack = away_stats.get('goals_per_game', 1.2)
+        home_defense = home_stats.get('goals_against', 0) / max(home_stats.get('total_matches', 1), 1)
+
+        return (home_attack + away_defense) / 2, (away_attack + home_defense) / 2
+
+    def invalidate_results(self, sport: str, matches: List[Dict]) -> int:
+        """Drop cached statistics and predictions of the teams in newly stored results.
+
+        Returns the number of cache entries dropped.
+        """
+        dropped = 0
+        for tag in {tag for match in matches for tag in self._team_tags(sport, match.get('home_team'), match.get('away_team'))}:
+            dropped += self.team_stats_cache.invalidate(tag) + self.prediction_cache.invalidate(tag)
+        return dropped
+
+    @staticmethod
+    def _team_tags(sport: str, *team_names: str) -> List[Tuple[str, str]]:
+        return [(sport, team_key(name)) for name in team_names if name]
+
+    def get_cache_stats(self) -> Dict:
+        return {'team_stats': self.team_stats_cache.get_stats(), 'predictions': self.prediction_cache.get_stats(),
+                'score_model': self.score_model.get_stats()}
+
+    def _team_feature_arrays(self, team_names: List[str], sport: str, days: int = 30) -> Tuple[np.ndarray, np.ndarray]:
+        """(win_rate, total_matches) arrays for a list of teams, as get_team_statistics would give them"""
+        if self.team_stats is not None and days <= self.team_stats.window_days:
+            stats = {name: self.get_team_statistics(name, sport, days) for name in set(team_names)}
+            return (np.array([stats[name]['win_rate'] for name in team_names], dtype='float64'),
+                    np.array([stats[name]['total_matches'] for name in team_names], dtype='float64'))
+
+        table = self.get_team_form_table(sport, days).reindex([name.lower() for name in team_names])
+        empty = self._empty_team_stats('')
+        return (table['win_rate'].fillna(empty['win_rate']).to_numpy(dtype='float64'),
+                table['total_matches'].fillna(0).to_numpy(dtype='float64'))
+
+    @staticmethod
+    def _predict_arrays(home_win: np.ndarray, away_win: np.ndarray, h2h_home: np.ndarray,
+                        h2h_away: np.ndarray, h2h_draw: np.ndarray) -> np.ndarray:
+        """Vectorized _calculate_prediction"""
+        home_score = home_win * FORM_WEIGHT * HOME_ADVANTAGE + (1 - away_win) * FORM_WEIGHT + h2h_home * H2H_WEIGHT
+        away_score = away_win * FORM_WEIGHT * (1 - HOME_ADVANTAGE) + (1 - home_win) * FORM_WEIGHT + h2h_away * H2H_WEIGHT
+        draw_score = h2h_draw * DRAW_WEIGHT
+        best = np.maximum(np.maximum(home_score, away_score), draw_score)
+        return np.where(home_score == best, 'home_win', np.where(away_score == best, 'away_win', 'draw'))
+
+    @staticmethod
+    def _confidence_arrays(home_win: np.ndarray, away_win: np.ndarray, total_matches: np.ndarray,
+                           h2h_total: np.ndarray) -> np.ndarray:
+        """Vectorized _calculate_confidence (before rounding)"""
+        data_confidence = np.minimum(total_matches / 20, 1.0)
+        consistency_confidence = 1.0 - np.minimum(np.abs(home_win - away_win), 0.5)
+        h2h_confidence = np.minimum(h2h_total / 10, 1.0)
+        data_weight, consistency_weight, h2h_weight = CONFIDENCE_WEIGHTS
+        confidence = data_confidence * data_weight + consistency_confidence * consistency_weight + h2h_confidence * h2h_weight
+        return confidence * 100
+
     def get_team_statistics(self, team_name: str, sport: str, days: int = 30) -> Dict:
         """Get comprehensive statistics for a team"""
-        cache_key = f"{team_name}_{sport}_{days}"
-
-        # Check cache first
-        if cache_key in self.team_stats_cache:
-            cached_data = self.team_stats_cache[cache_key]
-            if (datetime.now() - cached_data['timestamp']).seconds < self.cache_expiry:
-                return cached_data['stats']
+        if self.team_stats is not None and days <= self.team_stats.window_days:
+            return self.team_stats.get(sport, team_name, days) or self._empty_team_stats(team_name)
 
-        # Calculate statistics from historical data
-        matches = self.db.get_recent_matches(sport, days)
+        cache_key = (sport, team_name.lower(), days)
 
-        # Filter matches involving this team
-        team_matches = []
-        for match in matches:
-            if (match['home_team'].lower() == team_name.lower() or
-                match['away_team'].lower() == team_name.lower()):
-                team_matches.append(match)
-
-        if not team_matches:
-            return self._empty_team_stats(team_name)
-
-        # Calculate statistics
-        stats = self._calculate_team_stats(team_matches, team_name)
+        # Check cache first
+        cached = self.team_stats_cache.get(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+        # Stream only this team's matches, projecting the columns the stats need
+        team = team_name.lower()
+        team_matches = list(self.db.iter_matches(
+            sport, date.today() - timedelta(days=days - 1), date.today(),
+            columns=['home_team', 'away_team', 'score'],
+            where='lower(home_team) = ? OR lower(away_team) = ?', params=(team, team)
+        ))
+
+        if team_matches:
+            stats = self._calculate_team_stats(team_matches, team_name)
+        else:
+            stats = self._empty_team_stats(team_name)
 
-        # Cache the results
-        self.team_stats_cache[cache_key] = {
-            'stats': stats,
-            'timestamp': datetime.now()
-        }
+        # Cache the results (teams without matches too, until their first result invalidates them)
+        self.team_stats_cache.set(cache_key, stats, self._team_tags(sport, team_name))
 
-        return stats
+        return copy.deepcopy(stats)
 
     def _calculate_team_stats(self, matches: List[Dict], team_name: str) -> Dict:
         """Calculate detailed statistics for a team"""
@@ -135,17 +314,61 @@ class MatchPredictor:
             'clean_sheet_rate': clean_sheets / total_matches if total_matches > 0 else 0
         }
 
+    def get_team_form_table(self, sport: str, days: int = 30) -> pd.DataFrame:
+        """Team statistics for every team in a sport, computed in one vectorized pass.
+
+        Indexed by lower-cased team name with the same columns as
+        get_team_statistics (minus team_name).
+        """
+        frame = self.db.load_matches_frame(
+            sport, date.today() - timedelta(days=days - 1), date.today(),
+            columns=['home_team', 'away_team', 'score']
+        )
+        if frame.empty:
+            return pd.DataFrame(columns=list(self._empty_team_stats('').keys())[1:])
+
+        home_goals = frame['home_score'].astype('float64')
+        away_goals = frame['away_score'].astype('float64')
+        # One row per team appearance: goals for/against from that team's side
+        appearances = pd.DataFrame({
+            'team': pd.concat([frame['home_team'].astype(str), frame['away_team'].astype(str)],
+                              ignore_index=True).str.lower(),
+            'goals_for': pd.concat([home_goals, away_goals], ignore_index=True),
+            'goals_against': pd.concat([away_goals, home_goals], ignore_index=True)
+        })
+        appearances['wins'] = appearances['goals_for'] > appearances['goals_against']
+        appearances['draws'] = appearances['goals_for'] == appearances['goals_against']
+        appearances['losses'] = appearances['goals_for'] < appearances['goals_against']
+        appearances['clean_sheets'] = appearances['goals_against'] == 0
+
+        table = appearances.groupby('team').agg(
+            total_matches=('team', 'size'),
+            wins=('wins', 'sum'),
+            draws=('draws', 'sum'),
+            losses=('losses', 'sum'),
+            goals_for=('goals_for', 'sum'),
+            goals_against=('goals_against', 'sum'),
+            clean_sheets=('clean_sheets', 'sum')
+        )
+        total = table['total_matches']
+        table['win_rate'] = table['wins'] / total
+        table['draw_rate'] = table['draws'] / total
+        table['loss_rate'] = table['losses'] / total
+        table['goal_difference'] = table['goals_for'] - table['goals_against']
+        table['goals_per_game'] = table['goals_for'] / total
+        table['clean_sheet_rate'] = table['clean_sheets'] / total
+        return table
+
     def get_head_to_head_stats(self, home_team: str, away_team: str, sport: str, days: int = 365) -> Dict:
         """Get head-to-head statistics between two teams"""
-        matches = self.db.get_recent_matches(sport, days)
-
-        h2h_matches = []
-        for match in matches:
-            home_match = match['home_team'].lower() == home_team.lower()
-            away_match = match['away_team'].lower() == away_team.lower()
+        if self.head_to_head is not None and days <= self.head_to_head.window_days:
+            return self.head_to_head.get(sport, home_team, away_team, days)
 
-            if home_match and away_match:
-                h2h_matches.append(match)
+        h2h_matches = list(self.db.iter_matches(
+            sport, date.today() - timedelta(days=days - 1), date.today(),
+            columns=['home_team', 'away_team', 'score'],
+            where='lower(home_team) = ? AND lower(away_team) = ?', params=(home_team.lower(), away_team.lower())
+        ))
 
         if not h2h_matches:
             return {'total_matches': 0, 'home_wins': 0, 'away_wins': 0, 'draws': 0}
@@ -179,17 +402,50 @@ class MatchPredictor:
             'draw_rate': draws / total if total > 0 else 0
         }
 
+    def get_head_to_head_table(self, sport: str, days: int = 365) -> pd.DataFrame:
+        """Head-to-head results for every (home, away) pairing, indexed by lower-cased team names"""
+        frame = self.db.load_matches_frame(
+            sport, date.today() - timedelta(days=days - 1), date.today(),
+            columns=['home_team', 'away_team', 'score']
+        )
+        if frame.empty:
+            return pd.DataFrame(columns=['total_matches', 'home_wins', 'away_wins', 'draws',
+                                         'home_win_rate', 'away_win_rate', 'draw_rate'])
+
+        pairs = pd.DataFrame({
+            'home': frame['home_team'].astype(str).str.lower(),
+            'away': frame['away_team'].astype(str).str.lower(),
+            'home_wins': frame['home_score'] > frame['away_score'],
+            'away_wins': frame['away_score'] > frame['home_score'],
+            'draws': frame['home_score'] == frame['away_score']
+        })
+        # Unparsed scores compare as <NA>; count them as played but not as a result
+        for column in ('home_wins', 'away_wins', 'draws'):
+            pairs[column] = pairs[column].fillna(False).astype(bool)
+
+        table = pairs.groupby(['home', 'away']).agg(
+            total_matches=('home', 'size'),
+            home_wins=('home_wins', 'sum'),
+            away_wins=('away_wins', 'sum'),
+            draws=('draws', 'sum')
+        )
+        total = table['total_matches']
+        table['home_win_rate'] = table['home_wins'] / total
+        table['away_win_rate'] = table['away_wins'] / total
+        table['draw_rate'] = table['draws'] / total
+        return table
+
     def _calculate_prediction(self, home_stats: Dict, away_stats: Dict, h2h_stats: Dict) -> str:
         """Calculate match prediction using weighted factors"""
         # Weights for different factors
         weights = {
-            'home_form': 0.3,
-            'away_form': 0.3,
-            'head_to_head': 0.4
+            'home_form': FORM_WEIGHT,
+            'away_form': FORM_WEIGHT,
+            'head_to_head': H2H_WEIGHT
         }
 
         # Home advantage factor
-        home_advantage = 0.55
+        home_advantage = HOME_ADVANTAGE
 
         # Calculate scores
         home_score = (
@@ -204,7 +460,7 @@ class MatchPredictor:
             h2h_stats.get('away_win_rate', 0.5) * weights['head_to_head']
         )
 
-        draw_score = h2h_stats.get('draw_rate', 0.3) * 0.5
+        draw_score = h2h_stats.get('draw_rate', 0.3) * DRAW_WEIGHT
 
         # Determine outcome
         max_score = max(home_score, away_score, draw_score)
@@ -240,7 +496,7 @@ class MatchPredictor:
         confidence_factors.append(h2h_confidence)
 
         # Calculate weighted average
-        weights = [0.4, 0.4, 0.2]
+        weights = CONFIDENCE_WEIGHTS
         confidence = sum(f * w for f, w in zip(confidence_factors, weights))
 
         return round(confidence * 100, 1)
@@ -276,32 +532,18 @@ class MatchPredictor:
         }
 
     def predict_score(self, home_team: str, away_team: str, sport: str = 'soccer') -> Dict:
-        """Predict the exact score of a match"""
+        """Predict the exact score of a match from a Poisson score distribution"""
         try:
             home_stats = self.get_team_statistics(home_team, sport, days=30)
             away_stats = self.get_team_statistics(away_team, sport, days=30)
 
-            # Simple Poisson distribution-based score prediction
-            home_attack = home_stats.get('goals_per_game', 1.5)
-            away_defense = away_stats.get('goals_against', 0) / max(away_stats.get('total_matches', 1), 1)
-
-            away_attack = away_stats.get('goals_per_game', 1.2)
-            home_defense = home_stats.get('goals_against', 0) / max(home_stats.get('total_matches', 1), 1)
-
-            # Expected goals
-            expected_home_goals = (home_attack + away_defense) / 2
-            expected_away_goals = (away_attack + home_defense) / 2
-
-            # Most likely score (simplified)
-            home_goals = round(expected_home_goals)
-            away_goals = round(expected_away_goals)
+            expected_home_goals, expected_away_goals = self._expected_goals(home_stats, away_stats)
+            distribution = self.score_model.evaluate([expected_home_goals], [expected_away_goals])[0]
 
             return {
                 'home_team': home_team,
                 'away_team': away_team,
-                'predicted_score': f"{home_goals}:{away_goals}",
-                'expected_home_goals': round(expected_home_goals, 2),
-                'expected_away_goals': round(expected_away_goals, 2),
+                **distribution,
                 'confidence': min(self._calculate_confidence(home_stats, away_stats, {}), 70.0),
                 'timestamp': datetime.now().isoformat()
             }
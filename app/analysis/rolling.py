@@ -0,0 +1,89 @@
+"""
+Rolling-window counters shared by the predictor's result stores
+Counts are kept in day buckets with a running total per key, so reads over
+the whole window are O(1) and buckets that leave the window are subtracted
+lazily when their key is next read
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+
+
+class RollingCounter:
+    """Day buckets plus a running total for one key"""
+
+    __slots__ = ('buckets', 'totals')
+
+    def __init__(self, width: int):
+        self.buckets: Dict[date, List[int]] = {}
+        self.totals = [0] * width
+
+
+class RollingWindow:
+    """key -> RollingCounter of `width` counters over the last window_days"""
+
+    def __init__(self, window_days: int, width: int):
+        self.window_days = window_days
+        self.width = width
+        self.counters: Dict[Hashable, RollingCounter] = {}
+
+    def cutoff(self, today: Optional[date] = None) -> date:
+        """Newest day that is outside the window"""
+        return (today or date.today()) - timedelta(days=self.window_days)
+
+    def add(self, key: Hashable, day: date, values: Sequence[int], sign: int = 1):
+        """Add (sign=1) or remove (sign=-1) one contribution; days outside the window are ignored"""
+        if day <= self.cutoff():
+            # Never part of the totals (or already expired from them)
+            return
+        counter = self.counters.get(key)
+        if counter is None:
+            counter = self.counters[key] = RollingCounter(self.width)
+        bucket = counter.buckets.setdefault(day, [0] * self.width)
+        for index, value in enumerate(values):
+            bucket[index] += sign * value
+            counter.totals[index] += sign * value
+
+    def totals(self, key: Hashable, days: Optional[int] = None) -> Optional[List[int]]:
+        """Counts of a key over the last days (at most the window); None for unknown keys"""
+        counter = self.counters.get(key)
+        if counter is None:
+            return None
+        today = date.today()
+        self._expire(counter, today)
+        days = min(days or self.window_days, self.window_days)
+        if days == self.window_days:
+            return list(counter.totals)
+        cutoff = today - timedelta(days=days)
+        totals = [0] * self.width
+        for day, bucket in counter.buckets.items():
+            if day > cutoff:
+                totals = [total + value for total, value in zip(totals, bucket)]
+        return totals
+
+    def _expire(self, counter: RollingCounter, today: date):
+        """Drop buckets that left the window from the running total"""
+        cutoff = self.cutoff(today)
+        for day in [day for day in counter.buckets if day <= cutoff]:
+            bucket = counter.buckets.pop(day)
+            for index, value in enumerate(bucket):
+                counter.totals[index] -= value
+
+    def __len__(self) -> int:
+        return len(self.counters)
+
+
+def iter_finished_results(reader, sport: str, window_days: int) -> Iterator[Tuple[Dict, date]]:
+    """(match, day) for the newest row of every finished match in the last window_days of a reader"""
+    today = date.today()
+    seen = set()
+    for match in reader.iter_matches(sport, today - timedelta(days=window_days - 1), today,
+                                     columns=['match_id', 'timestamp', 'home_team', 'away_team', 'score'],
+                                     where='status = ?', params=('finished',), ordered=True):
+        if match['match_id'] in seen:
+            continue
+        seen.add(match['match_id'])
+        try:
+            day = datetime.fromisoformat(str(match['timestamp'])).date()
+        except ValueError:
+            day = today
+        yield match, day
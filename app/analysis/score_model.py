@@ -0,0 +1,98 @@
+"""
+Vectorized Poisson score model
+Builds the full score probability matrix of every match in a batch from the
+expected goals of both sides and derives 1X2, over/under and correct-score
+probabilities from it; results are cached per expected-goals pair
+"""
+import copy
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from .cache import TTLCache
+
+MAX_GOALS = 10
+OVER_UNDER_LINES = (0.5, 1.5, 2.5, 3.5, 4.5)
+TOP_SCORES = 5
+
+# Expected goals are rounded to this many decimals; the rounded pair is the cache key
+RATE_DECIMALS = 2
+# Floor for expected goals (a rate of 0 would put all mass on one score)
+MIN_RATE = 0.05
+
+
+def poisson_pmf(rates: np.ndarray, max_goals: int = MAX_GOALS) -> np.ndarray:
+    """P(k goals) for k = 0..max_goals, one row per rate"""
+    goals = np.arange(max_goals + 1)
+    log_factorial = np.concatenate(([0.0], np.cumsum(np.log(goals[1:]))))
+    rates = np.maximum(np.asarray(rates, dtype='float64'), MIN_RATE)[:, None]
+    return np.exp(goals * np.log(rates) - rates - log_factorial)
+
+
+def score_matrices(home_rates: np.ndarray, away_rates: np.ndarray, max_goals: int = MAX_GOALS) -> np.ndarray:
+    """(matches, home goals, away goals) probability matrices, normalized to sum to 1"""
+    matrices = np.einsum('ni,nj->nij', poisson_pmf(home_rates, max_goals), poisson_pmf(away_rates, max_goals))
+    return matrices / matrices.sum(axis=(1, 2), keepdims=True)
+
+
+class ScoreModel:
+    """Score distributions for batches of (expected home goals, expected away goals)"""
+
+    def __init__(self, max_goals: int = MAX_GOALS, lines: Sequence[float] = OVER_UNDER_LINES,
+                 max_entries: int = 4096):
+        self.max_goals = max_goals
+        self.lines = tuple(lines)
+        # Results depend only on the rounded rates, so entries never go stale
+        self.cache = TTLCache(max_entries, ttl_seconds=float('inf'))
+
+        goals = np.arange(max_goals + 1)
+        home_goals, away_goals = np.meshgrid(goals, goals, indexing='ij')
+        self._home_win = home_goals > away_goals
+        self._draw = home_goals == away_goals
+        self._away_win = home_goals < away_goals
+        totals = home_goals + away_goals
+        self._over = np.stack([totals > line for line in self.lines])  # (lines, home goals, away goals)
+        self._labels = np.array([f"{home}:{away}" for home, away in zip(home_goals.ravel(), away_goals.ravel())])
+
+    def evaluate(self, home_rates: Sequence[float], away_rates: Sequence[float]) -> List[Dict]:
+        """Distribution summary per match; only expected-goals pairs not cached are computed.
+        Every match gets its own copy, so callers may modify the returned dicts"""
+        keys = [(round(float(home), RATE_DECIMALS), round(float(away), RATE_DECIMALS))
+                for home, away in zip(home_rates, away_rates)]
+        results = {key: self.cache.get(key) for key in dict.fromkeys(keys)}
+        missing = [key for key, result in results.items() if result is None]
+        if missing:
+            for key, result in zip(missing, self._compute(np.array(missing, dtype='float64'))):
+                self.cache.set(key, result)
+                results[key] = result
+        return [copy.deepcopy(results[key]) for key in keys]
+
+    def _compute(self, rates: np.ndarray) -> List[Dict]:
+        matrices = score_matrices(rates[:, 0], rates[:, 1], self.max_goals)
+        home_win = (matrices * self._home_win).sum(axis=(1, 2))
+        draw = (matrices * self._draw).sum(axis=(1, 2))
+        away_win = (matrices * self._away_win).sum(axis=(1, 2))
+        over = np.einsum('nij,lij->nl', matrices, self._over)
+
+        flat = matrices.reshape(len(matrices), -1)
+        top = np.argsort(-flat, axis=1, kind='stable')[:, :TOP_SCORES]
+        top_probabilities = np.take_along_axis(flat, top, axis=1)
+
+        return [{
+            'expected_home_goals': float(rates[n, 0]),
+            'expected_away_goals': float(rates[n, 1]),
+            'predicted_score': str(self._labels[top[n, 0]]),
+            'probabilities': {
+                'home_win': round(float(home_win[n]), 4),
+                'draw': round(float(draw[n]), 4),
+                'away_win': round(float(away_win[n]), 4)
+            },
+            'over_under': {str(line): {'over': round(float(over[n, index]), 4),
+                                       'under': round(1 - float(over[n, index]), 4)}
+                           for index, line in enumerate(self.lines)},
+            'correct_scores': [{'score': str(self._labels[cell]), 'probability': round(float(probability), 4)}
+                               for cell, probability in zip(top[n], top_probabilities[n])]
+        } for n in range(len(matrices))]
+
+    def get_stats(self) -> Dict:
+        return self.cache.get_stats()
@@ -88,6 +88,9 @@ class ISCJXXQGMBAPI(BaseAPI):
             'valorant': {'round_1', 'round_2', 'in_play', 'live'},
         }
 
+        # Match statuses that mean the match is over (its score is the final result)
+        self.final_statuses = {'ended', 'finished', 'full_time', 'after_overtime', 'after_penalties', 'closed'}
+
         self.sports_cache = {}
         self.cache_expiry = 300  # 5 minutes
 
@@ -174,10 +177,10 @@ class ISCJXXQGMBAPI(BaseAPI):
                 sport_name = self.sports_map.get(int(sport_id_num), 'unknown')
                 matches = self._parse_matches(data, 'all', sport_name)
 
-                # Filter for live matches only and process them
+                # Filter for live (and just finished) matches and process them
                 live_matches = []
                 for match in matches:
-                    if match.get('type') == 'live':
+                    if match.get('type') in ('live', 'finished'):
                         # Process the match to standardize fields and ensure event_count
                         processed_match = self._process_match_data(match)
                         if processed_match:
@@ -244,10 +247,12 @@ class ISCJXXQGMBAPI(BaseAPI):
 
                             status = self._safe_get_status(stat)
                             is_live = False
+                            is_final = False
                             if status:
                                 is_live = status.lower() in [s.lower() for s in self.live_statuses.get(sport, set())]
+                                is_final = status.lower() in self.final_statuses
 
-                            entry_type = 'live' if is_live else 'pregame' if begin_at > current_timestamp else ss_type
+                            entry_type = 'live' if is_live else 'finished' if is_final else 'pregame' if begin_at > current_timestamp else ss_type
 
                             if ss_type == 'all' and not is_live and begin_at > current_timestamp:
                                 try:
@@ -271,6 +276,10 @@ class ISCJXXQGMBAPI(BaseAPI):
                                 "away_team_id": match.get("team2", {}).get("id"),
                             }
 
+                            if is_final:
+                                entry["status"] = status
+                                entry["score"] = stat.get("score")
+
                             if is_live:
                                 entry["match_time"] = stat.get("time") or None
                                 entry["status"] = status
@@ -397,7 +406,7 @@ class ISCJXXQGMBAPI(BaseAPI):
 
             # Determine status - ISCJXXQGMB provides actual status like "2nd_half"
             is_live = match_data.get('type') == 'live'
-            status = 'live' if is_live else 'pregame'
+            status = 'live' if is_live else 'finished' if match_data.get('type') == 'finished' else 'pregame'
 
             # Extract period from match_time, stat, or raw_data
             period = 1  # Default
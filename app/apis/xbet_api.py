@@ -219,6 +219,9 @@ class XBetAPI(BaseAPI):
                 'status': status,
                 'period': final_period,
                 'tournament': tournament,
+                'tournament_id': match_data.get('LI'),
+                'home_team_id': match_data.get('O1I'),
+                'away_team_id': match_data.get('O2I'),
                 'sport_id': str(match_data.get('SI', '')),
                 'event_count': event_count,
                 'start_time': start_time,
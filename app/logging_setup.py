@@ -0,0 +1,138 @@
+"""
+Logging setup for the collector: records pass a sampling/rate-limit filter,
+are queued without blocking the caller, and a background listener writes them
+to a size-rotated file (JSON lines) and the console
+"""
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+from typing import Dict, Optional
+
+# LogRecord attributes that are not user-supplied structured fields
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; extra= fields are included as keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Sampling and rate limiting for records below WARNING.
+
+    Records are keyed by log_key (extra={'log_key': ...}) or their call site.
+    sampling maps a message prefix (the text before the first ':') to the
+    fraction of records kept, applied deterministically (every Nth record).
+    Each key may then pass at most rate_per_minute records per minute; the
+    next record let through after a suppression carries a 'suppressed' count.
+    """
+
+    def __init__(self, rate_per_minute: int = 60, sampling: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self.rate_per_minute = rate_per_minute
+        self.sampling = {prefix: rate for prefix, rate in (sampling or {}).items()}
+        self._windows: Dict = {}   # key -> [window start, passed, suppressed]
+        self._seen: Dict = {}      # sampled prefix -> records seen
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        key = getattr(record, 'log_key', None) or (record.pathname, record.lineno)
+        with self._lock:
+            if self.sampling:
+                message = record.msg if isinstance(record.msg, str) else str(record.msg)
+                prefix = message.split(':', 1)[0]
+                rate = self.sampling.get(prefix)
+                if rate is not None:
+                    seen = self._seen[prefix] = self._seen.get(prefix, 0) + 1
+                    if rate <= 0 or (seen - 1) % max(int(round(1 / rate)), 1):
+                        return False
+
+            if not self.rate_per_minute:
+                return True
+            now = time.monotonic()
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= 60:
+                suppressed = window[2] if window else 0
+                window = self._windows[key] = [now, 0, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+            if window[1] >= self.rate_per_minute:
+                window[2] += 1
+                return False
+            window[1] += 1
+            return True
+
+
+class _Listener:
+    """QueueListener wrapper that drains the queue at exit"""
+
+    def __init__(self, log_queue: queue.Queue, *handlers: logging.Handler):
+        self.listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        self.handlers = handlers
+
+    def start(self):
+        self.listener.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        if self.listener._thread is not None:
+            self.listener.stop()
+        for handler in self.handlers:
+            handler.close()
+
+
+def setup_logging(log_config: Optional[Dict] = None) -> _Listener:
+    """Configure the root logger from the 'logging' section of config.yaml"""
+    log_config = log_config or {}
+    level = getattr(logging, str(log_config.get('level', 'INFO')).upper(), logging.INFO)
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_config.get('file', 'sports_collector_v2.log'),
+        maxBytes=int(log_config.get('max_file_size_mb', 100) * 1024 * 1024),
+        backupCount=log_config.get('backup_count', 5),
+        encoding='utf-8'
+    )
+    if log_config.get('format', 'json') == 'json':
+        file_handler.setFormatter(JsonFormatter())
+    else:
+        file_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    # Unbounded so logging never blocks a collector thread; the filter keeps volume down
+    log_queue = queue.Queue(-1)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(log_config.get('rate_limit_per_minute', 60),
+                                           log_config.get('sampling')))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = _Listener(log_queue, file_handler, console_handler)
+    listener.start()
+    return listener
@@ -8,36 +8,79 @@ Modular architecture with day-by-day tables and analysis capabilities
 - Mock data injection will contaminate the production database
 - Use test files (test_*.py) for any testing/mock data needs
 """
-import asyncio
 import logging
 import time
-from datetime import datetime, date
+from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List
 
 from apis.xbet_api import XBetAPI
 from apis.iscjxxqgmb_api import ISCJXXQGMBAPI
 from storage.database import DatabaseManager
+from storage.backend import create_backend
+from storage.export import DataExporter
+from storage.archive import ArchiveManager, TieredMatchReader
+from storage.maintenance import MaintenanceScheduler
+from storage.live_state import LiveStateStore
+from storage.events import EventDetector, EventStream
+from service.feed import LiveFeed, match_updates
+from service.query import QueryService
+from merge.entities import EntityResolver
+from merge.merger import MatchMerger, ProviderBatch
 from analysis.predictor import MatchPredictor
+from analysis.aggregates import TeamAggregateStore
+from analysis.head_to_head import HeadToHeadIndex
+from settings import load_config
+from logging_setup import setup_logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('sports_collector_v2.log'),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging: sampled and rate-limited, queued, JSON lines in a rotating file
+setup_logging(load_config().get('logging'))
 
 class SportsDataCollector:
     """Main orchestrator for sports data collection and analysis"""
 
     def __init__(self):
+        self.config = load_config()
         self.xbet_api = XBetAPI()
         self.iscjxxqgmb_api = ISCJXXQGMBAPI()
         self.db_manager = DatabaseManager('sports_data_v2.db')
-        self.predictor = MatchPredictor(self.db_manager)
+        self.archive = ArchiveManager.from_config(self.db_manager, self.config)
+
+        self.analytics = self._open_analytics_backend()
+
+        # Provider team/tournament/match IDs linked by earlier merges
+        self.entities = EntityResolver(self.db_manager)
+        self.merger = MatchMerger.from_config(self.config, self.entities)
+
+        # Current state of every offered match; only its changes flow downstream
+        self.live_state = LiveStateStore()
+
+        # Typed match events (kickoff, score_change, ...) derived from each live-state delta
+        self.event_detector = EventDetector(self.config.get('events', {}).get('odds_move_threshold', 0.05))
+        self.events = EventStream.from_config(self.config)
+
+        # Push feed for dashboards; served by the optional embedded HTTP service
+        self.feed = LiveFeed(self.config.get('service', {}).get('client_queue_size', 256))
+
+        # The predictor reads the analytics copy when configured, otherwise the live
+        # database through the archive tier so old ranges stay available
+        reader = self.analytics or TieredMatchReader(self.db_manager, self.archive)
+        # Rolling team results, bootstrapped per sport on first use and fed by finished matches
+        self.team_stats = TeamAggregateStore(reader, window_days=30)
+        self.head_to_head = HeadToHeadIndex(self.db_manager, reader, window_days=365)
+        self.predictor = MatchPredictor(reader, self.team_stats, self.config.get('analysis', {}).get('cache'),
+                                        self.head_to_head)
+        self.exporter = DataExporter.from_config(self.db_manager, self.config)
+
+        # Optimize, vacuum, retention, export and analytics sync jobs run between collection cycles
+        self.maintenance = MaintenanceScheduler.from_config(
+            self.db_manager, self.config, archive=self.archive, exporter=self.exporter,
+            analytics=self.analytics, entities=self.entities
+        )
+
+        # Cached read API over the database and live store; invalidated after every write
+        self.query = QueryService.from_config(self.db_manager, self.live_state, self.predictor, self.config)
+        self.service = self._start_service()
 
         # Sports to monitor (prioritizing working ones)
         self.sports_config = {
@@ -202,6 +245,37 @@ class SportsDataCollector:
             }
         }
 
+    def _start_service(self):
+        """Start the optional embedded HTTP service (live feed and query endpoints)"""
+        service_config = self.config.get('service', {})
+        if not service_config.get('enabled'):
+            return None
+
+        try:
+            from service.server import create_app, ServiceThread
+            app = create_app(self.feed, self.live_state, service_config.get('heartbeat_seconds', 15), self.query)
+            service = ServiceThread(app, service_config.get('host', '127.0.0.1'), service_config.get('port', 8000))
+            service.start()
+            return service
+        except ImportError as e:
+            logging.warning(f"WARNING: HTTP service unavailable: {e}")
+            return None
+
+    def _open_analytics_backend(self):
+        """Open the optional columnar analytics backend and bring it up to date"""
+        db_config = self.config.get('database', {})
+        kind = db_config.get('analytics_backend')
+        if not kind:
+            return None
+
+        try:
+            analytics = create_backend(kind, db_config.get('analytics_path'))
+            analytics.sync_from(self.db_manager)
+            return analytics
+        except ImportError as e:
+            logging.warning(f"WARNING: Analytics backend '{kind}' unavailable, reading from SQLite: {e}")
+            return None
+
     def collect_all_sports(self) -> Dict:
         """Collect data from all active sports"""
         logging.info("STARTING: Comprehensive sports data collection")
@@ -234,6 +308,9 @@ class SportsDataCollector:
                     logging.error(error_msg)
                     results['errors'].append(error_msg)
 
+        # Per-cycle write counts, including rows skipped because nothing changed
+        results['writes'] = self.db_manager.get_write_metrics(reset=True)
+
         logging.info(f"COMPLETE: Collection complete: {results['sports_processed']} sports, {results['total_matches']} matches")
         return results
 
@@ -269,13 +346,15 @@ class SportsDataCollector:
                 # Get from 1xBet
                 xbet_id = config.get('xbet_id', config.get('id', 1))
                 xbet_matches = self.xbet_api.get_live_matches(str(xbet_id))
+                fetched_at = {'xbet': time.time()}
 
                 # Get from ISCJXXQGMB
                 iscjxxqgmb_id = config.get('iscjxxqgmb_id', config.get('id', 1))
                 iscjxxqgmb_matches = self.iscjxxqgmb_api.get_live_matches(str(iscjxxqgmb_id))
+                fetched_at['iscjxxqgmb'] = time.time()
 
                 # Combine and deduplicate
-                matches = self._merge_api_results(xbet_matches, iscjxxqgmb_matches)
+                matches = self._merge_api_results(xbet_matches or [], iscjxxqgmb_matches or [], sport_name, fetched_at)
                 api_used = 'both'
 
             # If preferred API failed, try fallback
@@ -295,11 +374,27 @@ class SportsDataCollector:
                     api_used = 'iscjxxqgmb' if matches else None
 
             if matches:
-                # Store in day-by-day table
-                inserted = self.db_manager.insert_match_data(sport_name, matches)
-
-                # Generate predictions for upcoming matches
-                predictions = self._generate_predictions(matches, sport_name)
+                # Fold the poll into the live state; failed or empty polls are skipped so a provider
+                # outage does not evict matches. Only matches reported final count as results.
+                delta = self.live_state.apply(sport_name, matches)
+                events = self.event_detector.detect(sport_name, delta, self.live_state)
+                self.team_stats.record_results(sport_name, delta['finished'])
+                self.head_to_head.record_results(sport_name, delta['finished'])
+                self.predictor.invalidate_results(sport_name, delta['finished'])
+
+                # Store new and changed matches in the day-by-day table
+                inserted = self.db_manager.insert_match_data(sport_name, delta['upserts'])
+
+                # Events and feed updates go out once the write they describe is committed
+                self.query.invalidate(sport_name)
+                self.events.publish(events)
+                self.feed.publish(match_updates(sport_name, delta, self.live_state) + events)
+
+                # Rescore every pregame match: odds and team form move until kick-off
+                # (unchanged matches are answered from the prediction and score caches)
+                predictions = self._generate_predictions(
+                    self.live_state.get_matches(sport_name, status='pregame'), sport_name
+                )
 
                 api_name = api_used.upper() if api_used else "UNKNOWN"
                 logging.info(f"SUCCESS: {sport_name}: {len(matches)} matches from {api_name}")
@@ -308,6 +403,9 @@ class SportsDataCollector:
                     'sport': sport_name,
                     'matches_collected': len(matches),
                     'matches_stored': inserted,
+                    'matches_changed': len(delta['upserts']),
+                    'matches_finished': len(delta['finished']),
+                    'events': len(events),
                     'predictions_generated': len(predictions),
                     'api_used': api_used
                 }
@@ -325,104 +423,47 @@ class SportsDataCollector:
             logging.error(f"Error collecting {sport_name}: {e}")
             raise
 
-    def _merge_api_results(self, xbet_matches: List[Dict], iscjxxqgmb_matches: List[Dict]) -> List[Dict]:
-        """Intelligently merge and deduplicate results from both APIs for football, normalizing keys and merging all relevant fields.
+    def _merge_api_results(self, xbet_matches: List[Dict], iscjxxqgmb_matches: List[Dict],
+                           sport: str = '', fetched_at: Dict[str, float] = None) -> List[Dict]:
+        """Intelligently merge and deduplicate results from both APIs (see merge.merger.MatchMerger).
 
         WARNING: This function should ONLY process data from real API endpoints.
         DO NOT add mock, fake, or test data here as it will contaminate the production database.
         All data must come from legitimate API sources only.
         """
-        def norm(val):
-            return str(val).strip().lower() if val is not None else ''
-        def match_key(match):
-            return (
-                norm(match.get('home_team', '')),
-                norm(match.get('away_team', '')),
-                norm(match.get('tournament', '')),
-                str(match.get('start_time', '')).strip()
-            )
-        match_dict = {}
-
-        # Only include fields that exist in the optimized database schema (17 columns)
-        merge_fields = [
-            'match_id', 'home_team', 'away_team', 'score', 'status', 'period', 'tournament',
-            'event_count', 'start_time', 'odds_home', 'odds_away', 'odds_draw',
-            'home_team_id', 'away_team_id', 'stoppage_time', 'half_time'
-        ]
-
-
-        # Add all 1xBet matches first
-        for match in xbet_matches:
-            key = match_key(match)
-            match_copy = {k: match.get(k) for k in merge_fields if k in match}
-            match_copy['data_source'] = 'xbet'
-            # Debug: Log event_count for 1xBet matches
-            if match.get('event_count', 0) > 0:
-                logging.info(f"1xBet match {match.get('match_id')} has event_count: {match.get('event_count')}")
-            # Debug: Log all fields for first few matches
-            if len(match_dict) < 3:
-                logging.info(f"1xBet match fields: {list(match.keys())}")
-            match_dict[key] = match_copy
-
-        # Merge ISCJXXQGMB matches
-        for match in iscjxxqgmb_matches:
-            key = match_key(match)
-            if key in match_dict:
-                existing = match_dict[key]
-                for k in merge_fields:
-                    v = match.get(k)
-                    if k == 'event_count':
-                        # Special handling for event_count: take the maximum value
-                        existing_ec = existing.get('event_count', 0) or 0
-                        new_ec = v or 0
-                        if new_ec > existing_ec:
-                            existing[k] = new_ec
-                            logging.info(f"Updated event_count for match {match.get('match_id')} from {existing_ec} to {new_ec}")
-                    elif (k not in existing or existing[k] in [None, '', []]) and v not in [None, '', []]:
-                        existing[k] = v
-                # Optionally, record both sources
-                if 'data_source' in existing and existing['data_source'] != 'both':
-                    existing['data_source'] = 'both'
-            else:
-                match_copy = {k: match.get(k) for k in merge_fields if k in match}
-                match_copy['data_source'] = 'iscjxxqgmb'
-                # Debug: Log event_count for ISCJXXQGMB matches
-                if match.get('event_count', 0) > 0:
-                    logging.info(f"ISCJXXQGMB match {match.get('match_id')} has event_count: {match.get('event_count')}")
-                # Debug: Log all fields for first few matches
-                if len([m for m in match_dict.values() if m.get('data_source') == 'iscjxxqgmb']) < 3:
-                    logging.info(f"ISCJXXQGMB match fields: {list(match.keys())}, event_count: {match.get('event_count')}")
-                match_dict[key] = match_copy
-
-        merged_matches = list(match_dict.values())
+        fetched_at = fetched_at or {}
+        merged_matches = self.merger.merge(sport, [
+            ProviderBatch('xbet', xbet_matches, fetched_at.get('xbet')),
+            ProviderBatch('iscjxxqgmb', iscjxxqgmb_matches, fetched_at.get('iscjxxqgmb'))
+        ])
 
         # Debug: Check event_count in final merged matches
-        event_counts = [m.get('event_count', 0) for m in merged_matches]
+        event_counts = [m.get('event_count', 0) or 0 for m in merged_matches]
         non_zero_events = sum(1 for ec in event_counts if ec > 0)
-        logging.info(f"MERGED: Intelligently merged (normalized): {len(xbet_matches)} from 1xBet + {len(iscjxxqgmb_matches)} from ISCJXXQGMB = {len(merged_matches)} total")
+        merge_stats = self.merger.stats.get(sport, {})
+        logging.info(f"MERGED: Intelligently merged (normalized): {len(xbet_matches)} from 1xBet + {len(iscjxxqgmb_matches)} from ISCJXXQGMB = {len(merged_matches)} total "
+                     f"({merge_stats.get('unchanged', 0)} unchanged, {merge_stats.get('resolved', 0)} resolved, {merge_stats.get('refolded', 0)} refolded)")
         logging.info(f"STATS: Event counts: {non_zero_events}/{len(merged_matches)} matches have event_count > 0, values: {sorted(set(event_counts))}")
 
         return merged_matches
 
     def _generate_predictions(self, matches: List[Dict], sport: str) -> List[Dict]:
-        """Generate predictions for matches"""
-        predictions = []
-
-        for match in matches:
-            try:
-                # Only predict for non-live matches
-                if not match.get('is_live', False):
-                    prediction = self.predictor.predict_match_outcome(
-                        match['home_team'],
-                        match['away_team'],
-                        sport
-                    )
-                    predictions.append(prediction)
+        """Generate predictions for matches (one batched predictor call per sport)"""
+        # Only predict for matches that have not started
+        pregame = [match for match in matches
+                   if not match.get('is_live', False) and match.get('status', 'pregame') == 'pregame']
 
-            except Exception as e:
-                logging.warning(f"Could not generate prediction for {match.get('home_team', 'Unknown')} vs {match.get('away_team', 'Unknown')}: {e}")
-
-        return predictions
+        try:
+            predictions = self.predictor.predict_many(pregame, sport)
+            # Pair by match_id: either call may skip matches, so list positions need not line up
+            scores = {str(score['match_id']): score
+                      for score in self.predictor.predict_scores(pregame, sport) if 'match_id' in score}
+            for prediction in predictions:
+                prediction['score'] = scores.get(str(prediction.get('match_id')))
+            return predictions
+        except Exception as e:
+            logging.warning(f"Could not generate predictions for {len(pregame)} {sport} matches: {e}")
+            return []
 
     def get_system_status(self) -> Dict:
         """Get comprehensive system status"""
@@ -433,6 +474,15 @@ class SportsDataCollector:
                 'iscjxxqgmb': self.iscjxxqgmb_api.get_request_stats()
             },
             'database_stats': self.db_manager.get_database_stats(),
+            'live_state': self.live_state.get_stats(),
+            'maintenance': self.maintenance.get_metrics(),
+            'events': self.events.get_stats(),
+            'feed': self.feed.get_stats(),
+            'query_cache': self.query.get_stats(),
+            'entities': self.entities.get_stats(),
+            'team_stats': self.team_stats.get_stats(),
+            'head_to_head': self.head_to_head.get_stats(),
+            'prediction_cache': self.predictor.get_cache_stats(),
             'predictions_available': True
         }
 
@@ -442,19 +492,27 @@ class SportsDataCollector:
         """Run continuous data collection"""
         logging.info(f"CONTINUOUS: Starting continuous collection (interval: {interval_minutes} minutes)")
 
+        interval_seconds = interval_minutes * 60
+        window_seconds = min(self.config.get('database', {}).get('maintenance_window_seconds', 60),
+                             interval_seconds)
+
         while True:
             try:
+                cycle_start = time.monotonic()
+
                 # Collect data
                 results = self.collect_all_sports()
 
                 # Log summary
-                logging.info(f"CYCLE: Collection cycle complete: {results['total_matches']} matches from {results['sports_processed']} sports")
+                writes = results['writes']
+                logging.info(f"CYCLE: Collection cycle complete: {results['total_matches']} matches from {results['sports_processed']} sports "
+                             f"({writes['new']} new, {writes['updated']} updated, {writes['unchanged']} unchanged)")
 
-                # Clean up old data (keep 90 days)
-                self.db_manager.cleanup_old_data(90)
+                # Low-priority maintenance in the idle window before the next cycle
+                self.maintenance.run_pending(window_seconds)
 
                 # Wait for next cycle
-                time.sleep(interval_minutes * 60)
+                time.sleep(max(interval_seconds - (time.monotonic() - cycle_start), 0))
 
             except KeyboardInterrupt:
                 logging.info("STOPPED: Collection stopped by user")
@@ -0,0 +1 @@
+# Cross-provider merge modules
\ No newline at end of file
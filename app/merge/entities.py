@@ -0,0 +1,201 @@
+"""
+Persistent cross-provider entity resolution
+Maps provider team, tournament and match identifiers to canonical entities,
+learned from successful merges and kept in the main SQLite database, so later
+cycles resolve known IDs with a dictionary lookup instead of string matching
+"""
+import time
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# Match mappings seen within this many days are loaded into memory at startup
+MATCH_CACHE_DAYS = 7
+
+
+class EntityResolver:
+    """(provider, provider id) -> canonical id for teams, tournaments and matches.
+
+    Teams and tournaments get integer canonical ids; a match's canonical id is
+    the match_id it was first stored under, so it stays stable when the set of
+    providers offering it changes. New mappings are buffered and written by
+    flush() in one transaction, which also refreshes last_seen for every known
+    match mapping seen since the previous flush.
+    """
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self._lock = threading.Lock()
+        self._teams: Dict[Tuple[str, str], int] = {}
+        self._tournaments: Dict[Tuple[str, str], int] = {}
+        self._matches: Dict[Tuple[str, str], str] = {}
+        self._pending = {'team': [], 'tournament': [], 'match': []}
+        self._seen = set()  # unchanged match mappings seen since the last flush
+        self._next_team = 1
+        self._next_tournament = 1
+        self.stats = {'match_hits': 0, 'team_links': 0, 'match_links': 0}
+        self._init_tables()
+        self._load()
+
+    def _init_tables(self):
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS entity_teams (
+                    provider TEXT NOT NULL,
+                    provider_id TEXT NOT NULL,
+                    canonical_id INTEGER NOT NULL,
+                    sport TEXT,
+                    name TEXT,
+                    PRIMARY KEY (provider, provider_id)
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS entity_tournaments (
+                    provider TEXT NOT NULL,
+                    provider_id TEXT NOT NULL,
+                    canonical_id INTEGER NOT NULL,
+                    sport TEXT,
+                    name TEXT,
+                    PRIMARY KEY (provider, provider_id)
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS entity_matches (
+                    provider TEXT NOT NULL,
+                    provider_id TEXT NOT NULL,
+                    canonical_id TEXT NOT NULL,
+                    sport TEXT,
+                    last_seen INTEGER NOT NULL,
+                    PRIMARY KEY (provider, provider_id)
+                ) WITHOUT ROWID
+            ''')
+            conn.commit()
+
+    def _load(self):
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT provider, provider_id, canonical_id FROM entity_teams")
+            self._teams = {(provider, provider_id): canonical for provider, provider_id, canonical in cursor}
+            cursor.execute("SELECT provider, provider_id, canonical_id FROM entity_tournaments")
+            self._tournaments = {(provider, provider_id): canonical for provider, provider_id, canonical in cursor}
+            cursor.execute("SELECT provider, provider_id, canonical_id FROM entity_matches WHERE last_seen >= ?",
+                           (int(time.time()) - MATCH_CACHE_DAYS * 86400,))
+            self._matches = {(provider, provider_id): canonical for provider, provider_id, canonical in cursor}
+        self._next_team = max(self._teams.values(), default=0) + 1
+        self._next_tournament = max(self._tournaments.values(), default=0) + 1
+
+    # Lookups
+
+    def match_for(self, provider: str, provider_id) -> Optional[str]:
+        """Canonical match id for a provider match id, or None when it was never merged"""
+        canonical = self._matches.get((provider, str(provider_id)))
+        if canonical is not None:
+            self.stats['match_hits'] += 1
+        return canonical
+
+    def team_for(self, provider: str, provider_id) -> Optional[int]:
+        if provider_id in (None, ''):
+            return None
+        return self._teams.get((provider, str(provider_id)))
+
+    def tournament_for(self, provider: str, provider_id) -> Optional[int]:
+        if provider_id in (None, ''):
+            return None
+        return self._tournaments.get((provider, str(provider_id)))
+
+    # Learning
+
+    def link_matches(self, sport: str, canonical_id: str, provider_ids: List[Tuple[str, str]]):
+        """Map every (provider, match id) of one merged match to canonical_id"""
+        now = int(time.time())
+        with self._lock:
+            for provider, provider_id in provider_ids:
+                key = (provider, str(provider_id))
+                if self._matches.get(key) != canonical_id:
+                    self._matches[key] = canonical_id
+                    self._pending['match'].append((provider, str(provider_id), canonical_id, sport, now))
+                    self.stats['match_links'] += 1
+                else:
+                    self._seen.add(key)
+
+    def link_teams(self, sport: str, provider_teams: List[Tuple[str, str, str]]) -> Optional[int]:
+        """Map (provider, team id, name) entries that are one team to a shared canonical id"""
+        return self._link(self._teams, 'team', sport, provider_teams)
+
+    def link_tournaments(self, sport: str, provider_tournaments: List[Tuple[str, str, str]]) -> Optional[int]:
+        return self._link(self._tournaments, 'tournament', sport, provider_tournaments)
+
+    def _link(self, mapping: Dict, kind: str, sport: str, entries: List[Tuple[str, str, str]]) -> Optional[int]:
+        entries = [(provider, str(provider_id), name) for provider, provider_id, name in entries
+                   if provider_id not in (None, '')]
+        if not entries:
+            return None
+
+        with self._lock:
+            known = [mapping[(provider, provider_id)] for provider, provider_id, _ in entries
+                     if (provider, provider_id) in mapping]
+            if known:
+                # The oldest canonical id wins; conflicting links are left alone
+                canonical = min(known)
+            elif kind == 'team':
+                canonical, self._next_team = self._next_team, self._next_team + 1
+            else:
+                canonical, self._next_tournament = self._next_tournament, self._next_tournament + 1
+
+            for provider, provider_id, name in entries:
+                if (provider, provider_id) not in mapping:
+                    mapping[(provider, provider_id)] = canonical
+                    self._pending[kind].append((provider, provider_id, canonical, sport, name))
+                    if kind == 'team':
+                        self.stats['team_links'] += 1
+            return canonical
+
+    def flush(self) -> int:
+        """Write the mappings learned since the last flush; returns the number of new mappings written"""
+        with self._lock:
+            pending, self._pending = self._pending, {'team': [], 'tournament': [], 'match': []}
+            seen, self._seen = self._seen, set()
+        total = sum(len(rows) for rows in pending.values())
+        if not total and not seen:
+            return 0
+
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT OR IGNORE INTO entity_teams (provider, provider_id, canonical_id, sport, name)
+                VALUES (?, ?, ?, ?, ?)
+            ''', pending['team'])
+            cursor.executemany('''
+                INSERT OR IGNORE INTO entity_tournaments (provider, provider_id, canonical_id, sport, name)
+                VALUES (?, ?, ?, ?, ?)
+            ''', pending['tournament'])
+            cursor.executemany('''
+                INSERT INTO entity_matches (provider, provider_id, canonical_id, sport, last_seen)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (provider, provider_id) DO UPDATE SET
+                    canonical_id = excluded.canonical_id, last_seen = excluded.last_seen
+            ''', pending['match'])
+            # Keep mappings of matches still on offer from being pruned
+            now = int(time.time())
+            cursor.executemany("UPDATE entity_matches SET last_seen = ? WHERE provider = ? AND provider_id = ?",
+                               [(now, provider, provider_id) for provider, provider_id in seen])
+            conn.commit()
+        return total
+
+    def prune(self, retention_days: int = 90) -> int:
+        """Forget match mappings not refreshed within the retention period"""
+        cutoff = int(time.time()) - retention_days * 86400
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM entity_matches WHERE last_seen < ?", (cutoff,))
+            deleted = cursor.rowcount
+            conn.commit()
+        if deleted:
+            logging.info(f"CLEANUP: Pruned {deleted} stale match mappings")
+        return deleted
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats, teams=len(self._teams), tournaments=len(self._tournaments),
+                        matches=len(self._matches))
@@ -0,0 +1,168 @@
+"""
+Fuzzy identification of the same match across providers
+Records are blocked by kickoff-time bucket and normalized team token, so each
+lookup only scores the handful of candidates that share a block with it
+"""
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Kickoff times are bucketed at this width; lookups also probe the neighbouring buckets
+TIME_BUCKET_SECONDS = 1800
+# Providers' kickoff times for the same match may differ by up to this much
+MAX_KICKOFF_DIFF_SECONDS = 900
+
+# Both team names must be at least this similar, and the weighted match score must reach MATCH_THRESHOLD
+TEAM_THRESHOLD = 0.6
+MATCH_THRESHOLD = 0.75
+
+# Club-form words that carry no identity ("FC Porto" == "Porto")
+STOPWORDS = frozenset({'fc', 'cf', 'sc', 'afc', 'ac', 'fk', 'sk', 'cd', 'club', 'the'})
+
+# Common abbreviations, expanded before comparing; women's and reserve-side markers
+# are reduced to one spelling each ('Getafe B' == 'Getafe II', 'Real Madrid Castilla')
+ALIASES = {
+    'man': 'manchester', 'utd': 'united', 'st': 'saint', 'intl': 'international',
+    'int': 'inter', 'ath': 'athletic', 'atl': 'atletico', 'dep': 'deportivo', 'univ': 'university',
+    'w': 'women', 'womens': 'women', 'ladies': 'women', 'fem': 'women', 'femenino': 'women', 'feminino': 'women',
+    'b': 'ii', 'reserve': 'ii', 'reserves': 'ii', 'res': 'ii', 'castilla': 'ii'
+}
+
+# Tokens that tell a club's sides apart: they must agree for two names to match
+QUALIFIERS = frozenset({'women', 'ii', 'iii', 'youth', 'academy'})
+
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+# 'U-21', 'U 21' -> 'u21' before tokenizing
+_AGE_GROUP = re.compile(r'\bu[\s\-]?(\d{2})\b')
+_AGE_TOKEN = re.compile(r'u\d{2}')
+
+
+@lru_cache(maxsize=65536)
+def normalize_name(name: str) -> Tuple[str, ...]:
+    """'Man. Utd FC' -> ('manchester', 'united'): lowercased ASCII tokens, aliases expanded, stopwords dropped"""
+    ascii_name = unicodedata.normalize('NFKD', name or '').encode('ascii', 'ignore').decode('ascii')
+    ascii_name = _AGE_GROUP.sub(r'u\1', ascii_name.lower())
+    tokens = [ALIASES.get(token, token) for token in _NON_WORD.split(ascii_name) if token]
+    meaningful = tuple(token for token in tokens if token not in STOPWORDS)
+    return meaningful or tuple(tokens)
+
+
+def qualifiers(tokens: Iterable[str]) -> Set[str]:
+    """Age-group, women's and reserve-side tokens of a normalized name"""
+    return {token for token in tokens if token in QUALIFIERS or _AGE_TOKEN.fullmatch(token)}
+
+
+def name_similarity(a: Tuple[str, ...], b: Tuple[str, ...]) -> float:
+    """Similarity of two normalized names in [0, 1]; 0 when their qualifiers differ"""
+    if a == b:
+        return 1.0 if a else 0.0
+    if not a or not b:
+        return 0.0
+    set_a, set_b = set(a), set(b)
+    # "Arsenal U21" and "Arsenal Women" are not "Arsenal"
+    if qualifiers(set_a) != qualifiers(set_b):
+        return 0.0
+    # "City" vs "Manchester City": one name is contained in the other
+    if set_a <= set_b or set_b <= set_a:
+        return 0.9
+    jaccard = len(set_a & set_b) / len(set_a | set_b)
+    ratio = SequenceMatcher(None, ' '.join(a), ' '.join(b)).ratio()
+    return max(jaccard, ratio)
+
+
+def _kickoff(record: Dict) -> Optional[int]:
+    try:
+        start_time = int(record.get('start_time') or 0)
+    except (TypeError, ValueError):
+        return None
+    return start_time if start_time > 0 else None
+
+
+def same_kickoff(a: Dict, b: Dict) -> bool:
+    """Kickoff times agree within tolerance (a missing time agrees with anything)"""
+    kickoff_a, kickoff_b = _kickoff(a), _kickoff(b)
+    return kickoff_a is None or kickoff_b is None or abs(kickoff_a - kickoff_b) <= MAX_KICKOFF_DIFF_SECONDS
+
+
+def match_similarity(a: Dict, b: Dict) -> float:
+    """Score two match records as the same fixture (0 when kickoffs or either team disagree)"""
+    if not same_kickoff(a, b):
+        return 0.0
+
+    home = name_similarity(normalize_name(a.get('home_team', '')), normalize_name(b.get('home_team', '')))
+    away = name_similarity(normalize_name(a.get('away_team', '')), normalize_name(b.get('away_team', '')))
+    if home < TEAM_THRESHOLD or away < TEAM_THRESHOLD:
+        return 0.0
+    tournament = name_similarity(normalize_name(a.get('tournament', '')), normalize_name(b.get('tournament', '')))
+    return 0.45 * home + 0.45 * away + 0.1 * tournament
+
+
+class BlockingIndex:
+    """Candidate index over match records keyed by (kickoff bucket, team token).
+
+    Records without a kickoff time are only reachable through the time-less
+    blocks that every record is also filed under. Pairing is one-to-one per
+    provider: an indexed record already paired with a provider's record is
+    not offered to that provider again until it is unpaired.
+    """
+
+    def __init__(self):
+        self._blocks: Dict[Tuple[Optional[int], str], List] = {}
+        self._records: Dict = {}
+        self._paired: Dict = {}  # key -> providers with a record paired to it
+
+    @staticmethod
+    def _tokens(record: Dict) -> Set[str]:
+        return set(normalize_name(record.get('home_team', ''))) | set(normalize_name(record.get('away_team', '')))
+
+    def _keys(self, record: Dict) -> Iterable[Tuple[Optional[int], str]]:
+        kickoff = _kickoff(record)
+        for token in self._tokens(record):
+            yield (None, token)
+            if kickoff is not None:
+                yield (kickoff // TIME_BUCKET_SECONDS, token)
+
+    def add(self, key, record: Dict, provider: Optional[str] = None):
+        """File a provider's record under an identifier of the caller's choosing"""
+        self._records[key] = record
+        self._paired[key] = {provider} if provider is not None else set()
+        for block in self._keys(record):
+            self._blocks.setdefault(block, []).append(key)
+
+    def pair(self, key, provider: str):
+        """Record that a provider's record was matched to an indexed record"""
+        self._paired.setdefault(key, set()).add(provider)
+
+    def unpair(self, key, provider: str):
+        self._paired.get(key, set()).discard(provider)
+
+    def discard(self, key):
+        """Remove a record from future candidate sets (its block entries are skipped lazily)"""
+        self._records.pop(key, None)
+        self._paired.pop(key, None)
+
+    def candidates(self, record: Dict) -> Set:
+        kickoff = _kickoff(record)
+        if kickoff is None:
+            blocks = [(None, token) for token in self._tokens(record)]
+        else:
+            bucket = kickoff // TIME_BUCKET_SECONDS
+            blocks = [(b, token) for token in self._tokens(record) for b in (bucket - 1, bucket, bucket + 1)]
+        return {key for block in blocks for key in self._blocks.get(block, ()) if key in self._records}
+
+    def find(self, record: Dict, threshold: float = MATCH_THRESHOLD, provider: Optional[str] = None):
+        """Key of the most similar indexed record scoring at least threshold, or None.
+        Records already paired with (or filed by) provider are skipped"""
+        best_key, best_score = None, 0.0
+        for key in self.candidates(record):
+            if provider is not None and provider in self._paired.get(key, ()):
+                continue
+            score = match_similarity(record, self._records[key])
+            if score >= threshold and score > best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    def __len__(self) -> int:
+        return len(self._records)
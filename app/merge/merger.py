@@ -0,0 +1,339 @@
+"""
+N-provider match merge with per-field source precedence
+Provider batches are folded over a union keyed by canonical id: each record
+is resolved to a merged match (entity tables first, fuzzy matcher for new
+ids) and its fields are combined by configurable rules. The union lives
+across cycles, so only new, changed or vanished provider records cost work
+"""
+import time
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
+
+from .matching import BlockingIndex, same_kickoff
+
+# One provider's poll: provider name, its processed matches and when they were fetched
+ProviderBatch = namedtuple('ProviderBatch', ['provider', 'matches', 'fetched_at'])
+
+# Fields taken from provider records (the columns of the daily tables)
+MERGE_FIELDS = (
+    'match_id', 'home_team', 'away_team', 'score', 'status', 'period', 'tournament',
+    'event_count', 'start_time', 'odds_home', 'odds_away', 'odds_draw',
+    'home_team_id', 'away_team_id', 'stoppage_time', 'half_time'
+)
+
+# Fields that decide which merged match a record belongs to; a change re-resolves it
+IDENTITY_FIELDS = ('home_team', 'away_team', 'start_time')
+
+# Field rules: 'first' (first non-empty value in provider order), 'max', 'freshest'
+# (non-empty value from the most recently fetched batch) or 'prefer:<provider>'
+DEFAULT_RULE = 'first'
+DEFAULT_FIELD_RULES = {'event_count': 'max'}
+
+EMPTY = (None, '', [])
+
+# Provenance code character for a field no provider supplied
+NO_SOURCE = '-'
+
+
+class MergedMatch:
+    """Union entry: the merged record, its provider records and which provider supplied each field"""
+
+    __slots__ = ('record', 'members', 'field_source', 'field_fetched', 'canonical', 'teams')
+
+    def __init__(self):
+        self.record = {}
+        self.members = {}        # (provider, provider match id) -> (raw record, fetched_at)
+        self.field_source = {}   # field -> provider index
+        self.field_fetched = {}  # field -> fetched_at of the supplying batch
+        self.canonical = None    # canonical match id registered for lookups
+        self.teams = None        # canonical (home, away) team ids registered for lookups
+
+    @property
+    def sources(self) -> List[str]:
+        return list(dict.fromkeys(provider for provider, _ in self.members))
+
+    def has_provider(self, provider: str) -> bool:
+        return any(member_provider == provider for member_provider, _ in self.members)
+
+
+class MergeState:
+    """Cross-cycle union for one sport"""
+
+    def __init__(self):
+        self.index = BlockingIndex()
+        self.groups: Dict[int, MergedMatch] = {}
+        self.members: Dict[Tuple[str, str], Tuple[int, tuple]] = {}  # member key -> (group id, fingerprint)
+        self.by_canonical: Dict[str, int] = {}
+        self.by_teams: Dict[tuple, set] = {}
+        self.next_group = 0
+
+
+def decode_provenance(code: str, providers: List[str]) -> Dict[str, Optional[str]]:
+    """Provenance code of a merged record -> {field: provider}"""
+    return {field: (providers[int(char)] if char != NO_SOURCE else None)
+            for field, char in zip(MERGE_FIELDS, code)}
+
+
+def _fingerprint(match: Dict) -> tuple:
+    return tuple(match.get(field) for field in MERGE_FIELDS)
+
+
+class MatchMerger:
+    """Merges any number of provider batches into one record per match"""
+
+    def __init__(self, providers: List[str], field_rules: Optional[Dict[str, str]] = None, entities=None):
+        # Precedence order; a field's provenance is its provider's position here (unknown
+        # providers are appended as they appear)
+        self.providers = list(providers)
+        self.field_rules = dict(DEFAULT_FIELD_RULES, **(field_rules or {}))
+        self.entities = entities
+        self._states: Dict[str, MergeState] = {}
+        self.stats = {}
+        for field, rule in self.field_rules.items():
+            if rule not in ('first', 'max', 'freshest') and not rule.startswith('prefer:'):
+                raise ValueError(f"Unknown merge rule for {field}: {rule}")
+
+    @classmethod
+    def from_config(cls, config: Dict, entities=None) -> 'MatchMerger':
+        """Build the merger from the 'merge' section of config.yaml"""
+        merge_config = config.get('merge', {})
+        return cls(merge_config.get('providers', ['xbet', 'iscjxxqgmb']),
+                   merge_config.get('field_rules'), entities)
+
+    def merge(self, sport: str, batches: List[ProviderBatch]) -> List[Dict]:
+        """Merge one poll of every provider for a sport into the sport's union.
+
+        Each batch is the provider's full current list: records absent from it
+        leave their merged match. Unchanged records are skipped, changed ones
+        are refolded into their merged match and only new ids (or records whose
+        teams/kickoff changed) are resolved again.
+        """
+        for batch in batches:
+            if batch.provider not in self.providers:
+                self.providers.append(batch.provider)
+        rank = {provider: index for index, provider in enumerate(self.providers)}
+        batches = sorted(batches, key=lambda batch: rank[batch.provider])
+
+        state = self._states.setdefault(sport, MergeState())
+        seen = set()
+        dirty = set()
+        stats = {'records': 0, 'unchanged': 0, 'resolved': 0}
+
+        for batch in batches:
+            fetched_at = batch.fetched_at or time.time()
+            for match in batch.matches or []:
+                key = (batch.provider, str(match.get('match_id')))
+                seen.add(key)
+                stats['records'] += 1
+                fingerprint = _fingerprint(match)
+                known = state.members.get(key)
+
+                if known is not None:
+                    group_id, previous = known
+                    if previous == fingerprint:
+                        stats['unchanged'] += 1
+                        continue
+                    group = state.groups[group_id]
+                    if all(group.members[key][0].get(f) == match.get(f) for f in IDENTITY_FIELDS):
+                        group.members[key] = (match, fetched_at)
+                        state.members[key] = (group_id, fingerprint)
+                        dirty.add(group_id)
+                        continue
+                    self._detach(state, key, dirty)
+
+                stats['resolved'] += 1
+                group_id = self._resolve(state, batch.provider, match)
+                if group_id is None:
+                    group_id = self._new_group(state, batch.provider, match)
+                state.groups[group_id].members[key] = (match, fetched_at)
+                state.members[key] = (group_id, fingerprint)
+                state.index.pair(group_id, batch.provider)
+                dirty.add(group_id)
+
+        for key in [key for key in state.members if key not in seen]:
+            self._detach(state, key, dirty)
+
+        for group_id in dirty:
+            group = state.groups.get(group_id)
+            if group is None:
+                continue
+            if not group.members:
+                self._drop_group(state, group_id)
+            else:
+                self._refold(group, rank)
+
+        if self.entities is not None:
+            self._learn(sport, state, dirty)
+
+        for group_id in dirty:
+            if group_id in state.groups:
+                self._finish(state.groups[group_id])
+
+        stats['refolded'] = len(dirty)
+        stats['matches'] = len(state.groups)
+        self.stats[sport] = stats
+        # Unchanged matches keep the record built in an earlier cycle
+        return [group.record for group in state.groups.values()]
+
+    def reset(self, sport: Optional[str] = None):
+        """Forget the cross-cycle union of a sport (or all sports)"""
+        if sport is None:
+            self._states.clear()
+        else:
+            self._states.pop(sport, None)
+
+    # Union maintenance
+
+    def _resolve(self, state: MergeState, provider: str, match: Dict) -> Optional[int]:
+        """Group a record belongs to, or None for a new match.
+
+        A group holds at most one record per provider: groups that already have
+        a member from this provider are never candidates, so distinct fixtures
+        listed by one provider stay distinct matches.
+        """
+        if self.entities is not None:
+            canonical = self.entities.match_for(provider, match.get('match_id'))
+            if canonical is not None:
+                # Known ids never go through fuzzy matching
+                group_id = state.by_canonical.get(canonical)
+                if group_id is None or state.groups[group_id].has_provider(provider):
+                    return None
+                return group_id
+            teams = (self.entities.team_for(provider, match.get('home_team_id')),
+                     self.entities.team_for(provider, match.get('away_team_id')))
+            for group_id in state.by_teams.get(teams, ()):
+                group = state.groups[group_id]
+                if not group.has_provider(provider) and same_kickoff(match, group.record):
+                    return group_id
+        return state.index.find(match, provider=provider)
+
+    def _new_group(self, state: MergeState, provider: str, match: Dict) -> int:
+        group_id = state.next_group
+        state.next_group += 1
+        group = state.groups[group_id] = MergedMatch()
+        state.index.add(group_id, match, provider)
+
+        if self.entities is not None:
+            self._register_canonical(state, group_id, self.entities.match_for(provider, match.get('match_id')))
+            teams = (self.entities.team_for(provider, match.get('home_team_id')),
+                     self.entities.team_for(provider, match.get('away_team_id')))
+            if None not in teams:
+                group.teams = teams
+                state.by_teams.setdefault(teams, set()).add(group_id)
+        return group_id
+
+    @staticmethod
+    def _owned_elsewhere(state: MergeState, group_id: int, canonical: str) -> bool:
+        """Canonical id already registered by another live group"""
+        owner = state.by_canonical.get(canonical, group_id)
+        return owner != group_id and owner in state.groups
+
+    def _register_canonical(self, state: MergeState, group_id: int, canonical: Optional[str]):
+        group = state.groups[group_id]
+        if canonical is None or canonical == group.canonical or self._owned_elsewhere(state, group_id, canonical):
+            return
+        if group.canonical is not None and state.by_canonical.get(group.canonical) == group_id:
+            del state.by_canonical[group.canonical]
+        group.canonical = canonical
+        state.by_canonical[canonical] = group_id
+
+    def _detach(self, state: MergeState, key: Tuple[str, str], dirty: set):
+        group_id, _ = state.members.pop(key)
+        state.groups[group_id].members.pop(key, None)
+        state.index.unpair(group_id, key[0])
+        dirty.add(group_id)
+
+    def _drop_group(self, state: MergeState, group_id: int):
+        group = state.groups.pop(group_id)
+        state.index.discard(group_id)
+        if group.canonical is not None and state.by_canonical.get(group.canonical) == group_id:
+            del state.by_canonical[group.canonical]
+        if group.teams is not None:
+            state.by_teams.get(group.teams, set()).discard(group_id)
+
+    def _refold(self, group: MergedMatch, rank: Dict[str, int]):
+        """Rebuild a merged record from its provider records in precedence order"""
+        group.record = {}
+        group.field_source = {}
+        group.field_fetched = {}
+        for (provider, _), (match, fetched_at) in sorted(group.members.items(), key=lambda item: rank[item[0][0]]):
+            self._fold(group, provider, match, fetched_at)
+
+    def _fold(self, entry: MergedMatch, provider: str, match: Dict, fetched_at: float):
+        """Combine one provider record into a merged match, field by field"""
+        source = self.providers.index(provider)
+        record = entry.record
+
+        for field in MERGE_FIELDS:
+            if field not in match:
+                continue
+            value = match[field]
+            current = record.get(field)
+            rule = self.field_rules.get(field, DEFAULT_RULE)
+
+            if value in EMPTY:
+                # Empty values only keep the field present; they are never a field's source
+                record.setdefault(field, value)
+                continue
+            if current in EMPTY:
+                take = True
+            elif rule == 'max':
+                try:
+                    take = value > current
+                except TypeError:
+                    take = False
+            elif rule == 'freshest':
+                take = fetched_at > entry.field_fetched.get(field, 0)
+            elif rule.startswith('prefer:'):
+                preferred = rule[len('prefer:'):]
+                take = provider == preferred and self.providers[entry.field_source[field]] != preferred
+            else:
+                take = False
+
+            if take:
+                record[field] = value
+                entry.field_source[field] = source
+                entry.field_fetched[field] = fetched_at
+
+    def _learn(self, sport: str, state: MergeState, dirty: set):
+        """Link the provider ids of changed matches several providers agreed on; apply canonical ids"""
+        for group_id in dirty:
+            group = state.groups.get(group_id)
+            if group is None:
+                continue
+            members = [(provider, match) for (provider, _), (match, _) in group.members.items()]
+            # A canonical id another match holds (e.g. a mapping learned before a split) is not reused
+            canonical = next((c for c in (self.entities.match_for(provider, match.get('match_id'))
+                                          for provider, match in members)
+                              if c is not None and not self._owned_elsewhere(state, group_id, c)), None)
+
+            if len({provider for provider, _ in members}) > 1:
+                canonical = canonical or str(members[0][1].get('match_id'))
+                self.entities.link_matches(sport, canonical,
+                                           [(provider, match.get('match_id')) for provider, match in members])
+                for side in ('home', 'away'):
+                    self.entities.link_teams(sport, [(provider, match.get(f'{side}_team_id'), match.get(f'{side}_team'))
+                                                     for provider, match in members])
+                # Providers without tournament ids are keyed by their tournament label
+                self.entities.link_tournaments(sport, [
+                    (provider, match.get('tournament_id') or match.get('tournament'), match.get('tournament'))
+                    for provider, match in members
+                ])
+
+            self._register_canonical(state, group_id, canonical)
+
+        self.entities.flush()
+
+    def _finish(self, group: MergedMatch):
+        """Set the canonical id, data_source and provenance code of a refolded record"""
+        record = group.record
+        if group.canonical is not None:
+            record['match_id'] = group.canonical
+        sources = group.sources
+        if len(sources) == 1:
+            record['data_source'] = sources[0]
+        else:
+            # 'both' is what the two-provider setup has always stored
+            record['data_source'] = 'both' if len(sources) == 2 else '+'.join(sources)
+        record['provenance'] = ''.join(str(group.field_source[field]) if field in group.field_source else NO_SOURCE
+                                       for field in MERGE_FIELDS)
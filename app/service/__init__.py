@@ -0,0 +1 @@
+# Service modules
\ No newline at end of file
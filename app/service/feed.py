@@ -0,0 +1,114 @@
+"""
+Push feed of live match updates for the embedded HTTP service
+The collector publishes from its worker threads; delivery happens on the
+server's event loop into one bounded queue per client, and a client whose
+queue fills up is dropped instead of slowing everyone else down
+"""
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Optional
+
+# Message types that are not match events
+MATCH_UPDATE = 'match'
+SNAPSHOT = 'snapshot'
+DROPPED = 'dropped'
+
+
+class FeedClient:
+    """One connected SSE/WebSocket consumer with its filters and queue"""
+
+    def __init__(self, client_id: int, queue_size: int, sports: Optional[List[str]] = None,
+                 match_ids: Optional[List[str]] = None):
+        self.client_id = client_id
+        self.sports = set(sports) if sports else None
+        self.match_ids = {str(match_id) for match_id in match_ids} if match_ids else None
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.delivered = 0
+        self.dropped = False
+
+    def wants(self, message: Dict) -> bool:
+        return ((self.sports is None or message.get('sport') in self.sports)
+                and (self.match_ids is None or str(message.get('match_id')) in self.match_ids))
+
+
+class LiveFeed:
+    """Fan-out hub between the collector and the connected feed clients"""
+
+    def __init__(self, queue_size: int = 256):
+        self.queue_size = queue_size
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._clients: Dict[int, FeedClient] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.stats = {'published': 0, 'delivered': 0, 'dropped_clients': 0}
+
+    def attach(self, loop: Optional[asyncio.AbstractEventLoop]):
+        """Bind the hub to the server's event loop (None detaches it)"""
+        self._loop = loop
+
+    def register(self, sports: Optional[List[str]] = None,
+                 match_ids: Optional[List[str]] = None) -> FeedClient:
+        """Add a client; must be called on the server's event loop"""
+        with self._lock:
+            self._next_id += 1
+            client = FeedClient(self._next_id, self.queue_size, sports, match_ids)
+            self._clients[client.client_id] = client
+            return client
+
+    def unregister(self, client: FeedClient):
+        with self._lock:
+            self._clients.pop(client.client_id, None)
+
+    def publish(self, messages: List[Dict]):
+        """Queue messages for delivery; safe to call from any thread, a no-op while no server runs"""
+        loop = self._loop
+        if not messages or loop is None or not self._clients:
+            return
+        try:
+            loop.call_soon_threadsafe(self._deliver, messages)
+        except RuntimeError:
+            # Loop already closed (server shutting down)
+            self._loop = None
+
+    def _deliver(self, messages: List[Dict]):
+        with self._lock:
+            clients = list(self._clients.values())
+            self.stats['published'] += len(messages)
+
+        for client in clients:
+            for message in messages:
+                if not client.wants(message):
+                    continue
+                try:
+                    client.queue.put_nowait(message)
+                    client.delivered += 1
+                    self.stats['delivered'] += 1
+                except asyncio.QueueFull:
+                    self._drop(client)
+                    break
+
+    def _drop(self, client: FeedClient):
+        """Disconnect a slow consumer: discard its backlog and leave only a final notice"""
+        client.dropped = True
+        while not client.queue.empty():
+            client.queue.get_nowait()
+        client.queue.put_nowait({'type': DROPPED, 'reason': 'slow consumer'})
+        self.unregister(client)
+        self.stats['dropped_clients'] += 1
+        logging.warning(f"FEED: Dropped slow feed client {client.client_id}")
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats, clients=len(self._clients))
+
+
+def match_updates(sport: str, delta: Dict, live_state) -> List[Dict]:
+    """Feed messages for the new and changed matches of a LiveStateStore delta"""
+    messages = []
+    for match_id in list(delta['new']) + list(delta['changed']):
+        record = live_state.get(match_id)
+        if record is not None:
+            messages.append({'type': MATCH_UPDATE, 'sport': sport, 'match_id': match_id,
+                             'changed': delta['changed'].get(match_id, []), 'data': record})
+    return messages
@@ -0,0 +1,165 @@
+"""
+Read-optimized queries for the HTTP service
+Results are cached as pre-serialized JSON (and lazily gzipped) bytes, keyed by
+query and sport, and invalidated when the collector commits that sport
+"""
+import gzip
+import json
+import hashlib
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class CachedResponse:
+    """Serialized response body with its ETag and a lazily built gzip variant"""
+
+    __slots__ = ('body', 'etag', 'compress_min_bytes', '_gzipped')
+
+    def __init__(self, payload, compress_min_bytes: int = 512):
+        self.body = json.dumps(payload, default=str, separators=(',', ':')).encode('utf-8')
+        self.etag = '"' + hashlib.blake2b(self.body, digest_size=8).hexdigest() + '"'
+        self.compress_min_bytes = compress_min_bytes
+        self._gzipped = None
+
+    @property
+    def gzipped(self) -> Optional[bytes]:
+        """gzip body, or None when the body is too small to be worth compressing"""
+        if len(self.body) < self.compress_min_bytes:
+            return None
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6)
+        return self._gzipped
+
+
+class QueryService:
+    """Today's matches, live matches, team results and predictions behind an LRU response cache"""
+
+    def __init__(self, db, live_state, predictor=None, max_entries: int = 512,
+                 page_size: int = 100, compress_min_bytes: int = 512):
+        self.db = db
+        self.live_state = live_state
+        self.predictor = predictor
+        self.max_entries = max_entries
+        self.page_size = page_size
+        self.compress_min_bytes = compress_min_bytes
+        self._cache: 'OrderedDict[tuple, CachedResponse]' = OrderedDict()
+        self._day_rows: Dict[Tuple[str, date], Tuple[List[str], List[Dict]]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    @classmethod
+    def from_config(cls, db, live_state, predictor, config: Dict) -> 'QueryService':
+        """Build the query service from the 'service' section of config.yaml"""
+        service_config = config.get('service', {})
+        return cls(db, live_state, predictor,
+                   max_entries=service_config.get('cache_entries', 512),
+                   page_size=service_config.get('page_size', 100),
+                   compress_min_bytes=service_config.get('compress_min_bytes', 512))
+
+    # Cache
+
+    def invalidate(self, sport: Optional[str] = None):
+        """Drop cached results for a sport (and all cross-sport results); None clears everything"""
+        with self._lock:
+            self._generation += 1
+            self.stats['invalidations'] += 1
+            for key in [key for key in self._cache if sport is None or key[1] in (sport, None)]:
+                del self._cache[key]
+            for key in [key for key in self._day_rows if sport is None or key[0] == sport]:
+                del self._day_rows[key]
+
+    def _cached(self, key: tuple, build: Callable[[], object]) -> CachedResponse:
+        """Cached response for key = (query, sport, ...), building and storing it on a miss"""
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.stats['hits'] += 1
+                return cached
+            self.stats['misses'] += 1
+            generation = self._generation
+
+        cached = CachedResponse(build(), self.compress_min_bytes)
+
+        with self._lock:
+            # A commit during the build may have made the result stale; serve it but don't keep it
+            if generation == self._generation:
+                self._cache[key] = cached
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return cached
+
+    def _today_rows(self, sport: str, day: date) -> Tuple[List[str], List[Dict]]:
+        """A day's matches sorted by match_id (the keyset), shared by all pages"""
+        with self._lock:
+            rows = self._day_rows.get((sport, day))
+            generation = self._generation
+        if rows is None:
+            matches = sorted(self.db.iter_matches(sport, day, day), key=lambda m: m['match_id'])
+            rows = ([m['match_id'] for m in matches], matches)
+            with self._lock:
+                if generation == self._generation:
+                    self._day_rows[(sport, day)] = rows
+        return rows
+
+    # Queries
+
+    def todays_matches(self, sport: str, after: Optional[str] = None,
+                       limit: Optional[int] = None) -> CachedResponse:
+        """One page of today's matches; pass the previous page's 'next' as after"""
+        limit = min(limit or self.page_size, self.page_size)
+        day = date.today()
+
+        def build():
+            ids, matches = self._today_rows(sport, day)
+            start = bisect_right(ids, after) if after is not None else 0
+            page = matches[start:start + limit]
+            more = start + limit < len(matches)
+            return {'sport': sport, 'date': day.isoformat(), 'matches': page,
+                    'next': page[-1]['match_id'] if page and more else None}
+
+        return self._cached(('today', sport, day, after, limit), build)
+
+    def live_matches(self, sport: Optional[str] = None) -> CachedResponse:
+        """Live matches straight from the live-state store"""
+        return self._cached(('live', sport), lambda: {
+            'sport': sport,
+            'matches': sorted(self.live_state.get_matches(sport=sport, status='live'),
+                              key=lambda m: m['match_id'])
+        })
+
+    def team_results(self, sport: str, team: str, days: int = 30, limit: int = 20) -> CachedResponse:
+        """A team's most recent matches, newest first"""
+        def build():
+            end = date.today()
+            matches = []
+            for match in self.db.iter_matches(sport, end - timedelta(days=days - 1), end,
+                                              where="lower(home_team) = ? OR lower(away_team) = ?",
+                                              params=(team.lower(), team.lower()), ordered=True):
+                matches.append(match)
+                if len(matches) >= limit:
+                    break
+            return {'sport': sport, 'team': team, 'matches': matches}
+
+        return self._cached(('team', sport, team.lower(), days, limit), build)
+
+    def predictions(self, sport: str) -> CachedResponse:
+        """Outcome predictions for the sport's pregame matches in the live store"""
+        def build():
+            results = []
+            if self.predictor is not None:
+                # One batched call; matches without both teams are dropped by predict_many
+                results = self.predictor.predict_many(
+                    sorted(self.live_state.get_matches(sport=sport, status='pregame'), key=lambda m: m['match_id']),
+                    sport)
+            return {'sport': sport, 'predictions': results}
+
+        return self._cached(('predictions', sport), build)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats, entries=len(self._cache))
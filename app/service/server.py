@@ -0,0 +1,150 @@
+"""
+Optional embedded HTTP service (FastAPI + uvicorn) running next to the collector
+Serves the live feed as Server-Sent Events (/feed/stream) and WebSocket (/feed/ws)
+and, with a QueryService, cached read endpoints under /matches, /teams and /predictions
+"""
+import json
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+try:
+    from fastapi import FastAPI, Query, Request, Response, WebSocket, WebSocketDisconnect
+    from fastapi.responses import StreamingResponse
+except ImportError:
+    FastAPI = None
+
+try:
+    import uvicorn
+except ImportError:
+    uvicorn = None
+
+from .feed import LiveFeed, FeedClient, SNAPSHOT, DROPPED
+from .query import QueryService, CachedResponse
+
+
+def _snapshot(client: FeedClient, live_state) -> Dict:
+    """Current state of the matches a client is subscribed to"""
+    matches = live_state.get_matches() if live_state is not None else []
+    return {'type': SNAPSHOT, 'matches': [m for m in matches if client.wants(m)]}
+
+
+def _send_cached(request: 'Request', cached: CachedResponse) -> 'Response':
+    """Serve pre-serialized bytes: 304 on a matching ETag, gzip when the client accepts it"""
+    headers = {'ETag': cached.etag, 'Vary': 'Accept-Encoding', 'Cache-Control': 'no-cache'}
+    if request.headers.get('if-none-match') == cached.etag:
+        return Response(status_code=304, headers=headers)
+
+    body = cached.body
+    if 'gzip' in request.headers.get('accept-encoding', ''):
+        gzipped = cached.gzipped
+        if gzipped is not None:
+            body = gzipped
+            headers['Content-Encoding'] = 'gzip'
+    return Response(content=body, media_type='application/json', headers=headers)
+
+
+def create_app(feed: LiveFeed, live_state=None, heartbeat_seconds: float = 15.0,
+               query: Optional[QueryService] = None) -> 'FastAPI':
+    """Build the FastAPI application serving the live feed and, with query, the read API"""
+    if FastAPI is None:
+        raise ImportError("fastapi is required for the HTTP service")
+
+    @asynccontextmanager
+    async def lifespan(app):
+        feed.attach(asyncio.get_running_loop())
+        yield
+        feed.attach(None)
+
+    app = FastAPI(title="Sports Data Service", lifespan=lifespan)
+
+    @app.get("/feed/stream")
+    async def feed_stream(sport: Optional[List[str]] = Query(None), match_id: Optional[List[str]] = Query(None)):
+        client = feed.register(sport, match_id)
+
+        async def events():
+            try:
+                yield f"event: {SNAPSHOT}\ndata: {json.dumps(_snapshot(client, live_state), default=str)}\n\n"
+                while True:
+                    try:
+                        message = await asyncio.wait_for(client.queue.get(), heartbeat_seconds)
+                    except asyncio.TimeoutError:
+                        yield ": heartbeat\n\n"
+                        continue
+                    yield f"event: {message['type']}\ndata: {json.dumps(message, default=str)}\n\n"
+                    if message['type'] == DROPPED:
+                        break
+            finally:
+                feed.unregister(client)
+
+        return StreamingResponse(events(), media_type="text/event-stream",
+                                 headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+    @app.websocket("/feed/ws")
+    async def feed_ws(websocket: WebSocket, sport: Optional[List[str]] = Query(None),
+                      match_id: Optional[List[str]] = Query(None)):
+        await websocket.accept()
+        client = feed.register(sport, match_id)
+        try:
+            await websocket.send_text(json.dumps(_snapshot(client, live_state), default=str))
+            while True:
+                message = await client.queue.get()
+                await websocket.send_text(json.dumps(message, default=str))
+                if message['type'] == DROPPED:
+                    await websocket.close(code=1013)  # try again later
+                    break
+        except WebSocketDisconnect:
+            pass
+        finally:
+            feed.unregister(client)
+
+    @app.get("/feed/stats")
+    async def feed_stats():
+        return feed.get_stats()
+
+    if query is not None:
+        # Plain (sync) handlers: cache misses hit SQLite, so they run in the threadpool
+
+        @app.get("/matches/today/{sport}")
+        def todays_matches(request: Request, sport: str, after: Optional[str] = None,
+                           limit: Optional[int] = Query(None, ge=1)):
+            return _send_cached(request, query.todays_matches(sport, after, limit))
+
+        @app.get("/matches/live")
+        def live_matches(request: Request, sport: Optional[str] = None):
+            return _send_cached(request, query.live_matches(sport))
+
+        @app.get("/teams/{sport}/{team}/recent")
+        def team_results(request: Request, sport: str, team: str, days: int = Query(30, ge=1, le=365),
+                         limit: int = Query(20, ge=1, le=200)):
+            return _send_cached(request, query.team_results(sport, team, days, limit))
+
+        @app.get("/predictions/{sport}")
+        def predictions(request: Request, sport: str):
+            return _send_cached(request, query.predictions(sport))
+
+        @app.get("/cache/stats")
+        def cache_stats():
+            return query.get_stats()
+
+    return app
+
+
+class ServiceThread:
+    """Runs the HTTP service with uvicorn on a daemon thread alongside the collector"""
+
+    def __init__(self, app, host: str = '127.0.0.1', port: int = 8000):
+        if uvicorn is None:
+            raise ImportError("uvicorn is required for the HTTP service")
+        self.server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level='warning'))
+        self.thread = threading.Thread(target=self.server.run, name='http-service', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        logging.info(f"SERVICE: HTTP service listening on {self.server.config.host}:{self.server.config.port}")
+
+    def stop(self, timeout: float = 5.0):
+        self.server.should_exit = True
+        self.thread.join(timeout)
@@ -0,0 +1,99 @@
+"""
+Configuration loader for config.yaml with built-in defaults
+"""
+import os
+import copy
+import logging
+from typing import Dict, Optional
+
+try:
+    import yaml
+except ImportError:  # PyYAML is optional - defaults are used without it
+    yaml = None
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), 'config.yaml')
+
+# Defaults for the settings the application reads; config.yaml overrides them
+DEFAULT_CONFIG = {
+    'database': {
+        'path': 'sports_data_v2.db',
+        'retention_days': 90,
+        'retention_interval_hours': 24,
+        'archive_dir': 'archive',
+        'optimize_interval_hours': 24,
+        'maintenance_window_seconds': 60,
+        'maintenance_budget_seconds': 10,
+        'analytics_backend': None,
+        'analytics_path': 'sports_analytics.duckdb'
+    },
+    'export': {
+        'formats': ['parquet'],
+        'compression': 'gzip',
+        'auto_export': False,
+        'export_interval_hours': 24,
+        'directory': 'exports',
+        'chunk_size': 5000
+    },
+    'events': {
+        'log_dir': 'events',
+        'odds_move_threshold': 0.05
+    },
+    'analysis': {
+        'cache': {
+            'team_stats_hours': 1,
+            'predictions_hours': 6,
+            'team_stats_entries': 2048,
+            'prediction_entries': 4096
+        }
+    },
+    'merge': {
+        'providers': ['xbet', 'iscjxxqgmb'],
+        'field_rules': {'event_count': 'max'}
+    },
+    'logging': {
+        'level': 'INFO',
+        'file': 'sports_collector_v2.log',
+        'max_file_size_mb': 100,
+        'backup_count': 5,
+        'format': 'json',
+        'rate_limit_per_minute': 60,
+        'sampling': {'DB Insert': 0.01}
+    },
+    'service': {
+        'enabled': False,
+        'host': '127.0.0.1',
+        'port': 8000,
+        'client_queue_size': 256,
+        'heartbeat_seconds': 15,
+        'cache_entries': 512,
+        'page_size': 100,
+        'compress_min_bytes': 512
+    }
+}
+
+
+def _merge(base: Dict, override: Dict) -> Dict:
+    """Recursively merge override into a copy of base"""
+    merged = copy.deepcopy(base)
+    for key, value in (override or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def load_config(path: Optional[str] = None) -> Dict:
+    """Load config.yaml merged over the defaults"""
+    path = path or CONFIG_PATH
+
+    if yaml is None:
+        logging.warning("WARNING: PyYAML not installed, using default configuration")
+        return copy.deepcopy(DEFAULT_CONFIG)
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return _merge(DEFAULT_CONFIG, yaml.safe_load(f) or {})
+    except (OSError, yaml.YAMLError) as e:
+        logging.warning(f"WARNING: Could not read {path}, using default configuration: {e}")
+        return copy.deepcopy(DEFAULT_CONFIG)
@@ -0,0 +1,218 @@
+"""
+Cold-tier archival of aged daily tables
+Tables past the retention window are compacted into compressed columnar files
+before they are dropped, and stay readable through TieredMatchReader
+"""
+import os
+import gzip
+import json
+import sqlite3
+import logging
+from datetime import datetime, date, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from .database import DatabaseManager, READ_COLUMNS
+from .export import DataExporter, pq
+from .frames import frame_from_batches, arrays_from_frame
+
+
+class ArchiveManager:
+    """Writes aged daily tables to the archive tier and keeps a catalog of them"""
+
+    def __init__(self, db_manager: DatabaseManager, archive_dir: str = 'archive',
+                 compression: str = 'gzip', chunk_size: int = 5000):
+        self.db = db_manager
+
+        # Parquet when pyarrow is available, otherwise gzip'd JSON lines (never lose data)
+        self.format = 'parquet' if pq is not None else 'json'
+        self.writer = DataExporter(db_manager, export_dir=archive_dir, formats=[self.format],
+                                   compression=compression, chunk_size=chunk_size)
+        self._init_catalog()
+
+    @classmethod
+    def from_config(cls, db_manager: DatabaseManager, config: Dict) -> 'ArchiveManager':
+        """Build an archive manager from the 'database' section of config.yaml"""
+        db_config = config.get('database', {})
+        return cls(
+            db_manager,
+            archive_dir=db_config.get('archive_dir', 'archive'),
+            compression=config.get('export', {}).get('compression', 'gzip')
+        )
+
+    def _init_catalog(self):
+        """Create the catalog of archived partitions"""
+        with self.db.get_connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS archive_catalog (
+                    table_name TEXT PRIMARY KEY,
+                    sport TEXT NOT NULL,
+                    table_date DATE NOT NULL,
+                    format TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    row_count INTEGER,
+                    archived_at DATETIME
+                )
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_archive_catalog_sport_date
+                ON archive_catalog (sport, table_date)
+            ''')
+            conn.commit()
+
+    def archive_table(self, table_name: str, sport: str, table_date: str) -> bool:
+        """Archive one daily table; returns True when it is safe to drop"""
+        try:
+            row_count, path = self.writer.write_partition(table_name, sport, table_date, self.format)
+
+            with self.db.get_connection() as conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO archive_catalog
+                    (table_name, sport, table_date, format, path, row_count, archived_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (table_name, sport, table_date, self.format, path, row_count, datetime.now()))
+                conn.commit()
+
+            logging.info(f"ARCHIVE: {table_name} -> {path} ({row_count} rows)")
+            return True
+
+        except Exception as e:
+            logging.error(f"Failed to archive {table_name}, keeping table: {e}")
+            return False
+
+    def run_retention(self, retention_days: int = 90):
+        """Archive and drop every daily table older than the retention window"""
+        self.db.cleanup_old_data(retention_days, archiver=self)
+
+    def find_archived(self, sport: str, start_date: date, end_date: date) -> List[Dict]:
+        """Catalog entries for a sport within [start_date, end_date]"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT table_name, table_date, format, path FROM archive_catalog
+                WHERE sport = ? AND table_date BETWEEN ? AND ?
+                ORDER BY table_date DESC
+            ''', (sport, start_date.isoformat(), end_date.isoformat()))
+            return [dict(zip(('table_name', 'table_date', 'format', 'path'), row))
+                    for row in cursor.fetchall()]
+
+    def read_archived(self, entry: Dict) -> List[Dict]:
+        """Load the rows of one archived partition"""
+        path = entry['path']
+        if not os.path.exists(path):
+            logging.warning(f"WARNING: Archived file missing: {path}")
+            return []
+
+        if entry['format'] == 'parquet':
+            if pq is None:
+                logging.warning(f"WARNING: pyarrow not installed, cannot read {path}")
+                return []
+            return pq.read_table(path).to_pylist()
+
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def iter_archived(self, entry: Dict, columns: Optional[List[str]] = None,
+                      where: Optional[str] = None, params: tuple = (),
+                      batch_size: Optional[int] = None, row_factory: str = 'dict') -> Iterator:
+        """Query one archived partition with the same arguments as DatabaseManager.iter_matches"""
+        columns = list(columns or READ_COLUMNS)
+        rows = self.read_archived(entry)
+        if not rows:
+            return
+
+        # Load the partition into a scratch in-memory table so `where` keeps its SQL meaning
+        conn = sqlite3.connect(':memory:')
+        try:
+            if row_factory == 'row':
+                conn.row_factory = sqlite3.Row
+            conn.execute(f"CREATE TABLE archived ({', '.join(READ_COLUMNS)})")
+            conn.executemany(
+                f"INSERT INTO archived VALUES ({', '.join('?' for _ in READ_COLUMNS)})",
+                [tuple(row.get(column) for column in READ_COLUMNS) for row in rows]
+            )
+            condition = f" WHERE {where}" if where else ''
+            cursor = conn.execute(
+                f"SELECT {', '.join(columns)} FROM archived{condition} ORDER BY timestamp DESC", tuple(params)
+            )
+
+            keys = tuple(columns)
+            while True:
+                batch = cursor.fetchmany(batch_size or 1000)
+                if not batch:
+                    return
+                if row_factory == 'dict':
+                    batch = [dict(zip(keys, row)) for row in batch]
+
+                if batch_size:
+                    yield batch
+                else:
+                    yield from batch
+        finally:
+            conn.close()
+
+
+class TieredMatchReader:
+    """Read facade over live daily tables and the archive tier.
+
+    Exposes the DatabaseManager read methods, so it can be handed to the
+    predictor or backtests in place of the database manager.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, archive: ArchiveManager):
+        self.db = db_manager
+        self.archive = archive
+
+    def get_matches_by_date(self, sport: str, target_date: date) -> List[Dict]:
+        """Matches for one day from the live table, or from the archive once it was tiered out"""
+        matches = self.db.get_matches_by_date(sport, target_date)
+        if matches:
+            return matches
+
+        for entry in self.archive.find_archived(sport, target_date, target_date):
+            matches.extend(self.archive.read_archived(entry))
+        return matches
+
+    def get_matches_in_range(self, sport: str, start_date: date, end_date: date) -> List[Dict]:
+        """Matches between two dates (inclusive, newest day first) across both tiers"""
+        return list(self.iter_matches(sport, start_date, end_date, ordered=True))
+
+    def get_recent_matches(self, sport: str, days: int = 7) -> List[Dict]:
+        """Get recent matches across multiple days, including archived ones"""
+        end_date = date.today()
+        return self.get_matches_in_range(sport, end_date - timedelta(days=days - 1), end_date)
+
+    def iter_matches(self, sport: str, start_date: date, end_date: date,
+                     columns: Optional[List[str]] = None, where: Optional[str] = None,
+                     params: tuple = (), ordered: bool = False, batch_size: Optional[int] = None,
+                     row_factory: str = 'dict', chunk_size: int = 1000) -> Iterator:
+        """DatabaseManager.iter_matches over live tables, followed by archived days"""
+        yield from self.db.iter_matches(sport, start_date, end_date, columns=columns, where=where,
+                                        params=params, ordered=ordered, batch_size=batch_size,
+                                        row_factory=row_factory, chunk_size=chunk_size)
+
+        # Archived days are older than any live table, so newest-first order is kept
+        live_days = {day.isoformat() for day, _ in self.db.get_daily_tables(sport, start_date, end_date)}
+        for entry in self.archive.find_archived(sport, start_date, end_date):
+            if entry['table_date'] not in live_days:
+                yield from self.archive.iter_archived(entry, columns=columns, where=where, params=params,
+                                                      batch_size=batch_size, row_factory=row_factory)
+
+    def load_matches_frame(self, sport: str, start_date: date, end_date: date,
+                           columns: Optional[List[str]] = None, where: Optional[str] = None,
+                           params: tuple = (), chunk_size: int = 5000):
+        """DatabaseManager.load_matches_frame across both tiers"""
+        columns = list(columns or READ_COLUMNS)
+        batches = self.iter_matches(sport, start_date, end_date, columns=columns, where=where,
+                                    params=params, row_factory='tuple', batch_size=chunk_size)
+        return frame_from_batches(batches, columns)
+
+    def load_matches_arrays(self, sport: str, start_date: date, end_date: date,
+                            columns: Optional[List[str]] = None, where: Optional[str] = None,
+                            params: tuple = ()) -> Dict:
+        """DatabaseManager.load_matches_arrays across both tiers"""
+        return arrays_from_frame(self.load_matches_frame(sport, start_date, end_date, columns, where, params))
+
+    def __getattr__(self, name):
+        # Everything else (writes, stats, history) goes straight to the database manager
+        return getattr(self.db, name)
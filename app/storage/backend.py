@@ -0,0 +1,201 @@
+"""
+Storage backend interface for match data
+DatabaseManager (SQLite) is the default backend; storage.duckdb_backend adds an
+embedded columnar one for analytical reads
+"""
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from .frames import frame_from_batches, arrays_from_frame
+
+# Odds are stored in match_history as integers scaled by this factor (2.15 -> 2150)
+ODDS_SCALE = 1000
+
+# Small-int status codes used by the compact history encoding
+STATUS_CODES = {'pregame': 0, 'live': 1, 'finished': 2}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
+# Match columns every backend can read (iter_matches projections, exports, frames)
+MATCH_COLUMNS = (
+    'match_id', 'timestamp', 'home_team', 'away_team', 'score', 'status', 'period',
+    'tournament', 'sport', 'odds_home', 'odds_away', 'odds_draw', 'event_count', 'start_time',
+    'home_team_id', 'away_team_id', 'stoppage_time', 'half_time', 'data_source'
+)
+
+
+class StorageBackend(ABC):
+    """Abstract base class for match storage backends.
+
+    Covers the write path (batched upserts plus change history), range reads
+    and statistics. Row normalization and the columnar readers are shared.
+    """
+
+    # Write path
+
+    @abstractmethod
+    def insert_match_data(self, sport: str, matches: List[Dict], target_date: Optional[date] = None) -> int:
+        """Upsert a batch of matches for a sport/day and append changed history rows"""
+        pass
+
+    @abstractmethod
+    def get_match_history(self, match_id: str) -> List[Dict]:
+        """Change history (line movement, score and status changes) for a match"""
+        pass
+
+    # Reads
+
+    @abstractmethod
+    def iter_matches(self, sport: str, start_date: date, end_date: date,
+                     columns: Optional[List[str]] = None, where: Optional[str] = None,
+                     params: tuple = (), ordered: bool = False, batch_size: Optional[int] = None,
+                     row_factory: str = 'dict', chunk_size: int = 1000) -> Iterator:
+        """Stream matches for a sport and date range (see DatabaseManager.iter_matches)"""
+        pass
+
+    @abstractmethod
+    def get_matches_by_date(self, sport: str, target_date: date) -> List[Dict]:
+        """All matches for a sport on one day"""
+        pass
+
+    @abstractmethod
+    def get_database_stats(self) -> Dict:
+        """Table/record counts, sports covered and date range"""
+        pass
+
+    @abstractmethod
+    def cleanup_old_data(self, retention_days: int = 90, archiver=None):
+        """Remove data older than the retention period"""
+        pass
+
+    def get_recent_matches(self, sport: str, days: int = 7) -> List[Dict]:
+        """Get recent matches across multiple days"""
+        end_date = date.today()
+        return list(self.iter_matches(sport, end_date - timedelta(days=days - 1), end_date, ordered=True))
+
+    def load_matches_frame(self, sport: str, start_date: date, end_date: date,
+                           columns: Optional[List[str]] = None, where: Optional[str] = None,
+                           params: tuple = (), chunk_size: int = 5000):
+        """Load a sport/date range as a typed pandas DataFrame in one query.
+
+        Adds integer home_score/away_score columns parsed from score and makes
+        home_team/away_team categoricals over a shared team dictionary.
+        """
+        columns = list(columns or MATCH_COLUMNS)
+        batches = self.iter_matches(sport, start_date, end_date, columns=columns, where=where,
+                                    params=params, row_factory='tuple', batch_size=chunk_size)
+        return frame_from_batches(batches, columns)
+
+    def load_matches_arrays(self, sport: str, start_date: date, end_date: date,
+                            columns: Optional[List[str]] = None, where: Optional[str] = None,
+                            params: tuple = ()) -> Dict:
+        """load_matches_frame() as a dict of NumPy arrays (teams as integer codes)"""
+        return arrays_from_frame(self.load_matches_frame(sport, start_date, end_date, columns, where, params))
+
+    # Shared row normalization
+
+    def _clean_match_data(self, match: Dict) -> Dict:
+        """Clean and validate match data with optimized fields (18 columns), providing defaults for missing fields"""
+        # Validate status field
+        status = match.get('status', 'pregame')
+        if status not in STATUS_CODES:
+            status = 'pregame'  # Default to pregame for unknown statuses
+
+        # Create a completely new dictionary with ONLY the fields that exist in the optimized database schema (18 columns)
+        # This ensures no extra fields from the API response are included and matches the optimized schema
+        cleaned_data = {
+            # Core match data (columns 1-14)
+            'match_id': str(match.get('match_id', '')),
+            'home_team': match.get('home_team', '').strip(),
+            'away_team': match.get('away_team', '').strip(),
+            'score': match.get('score', ''),
+            'status': status,
+            'period': int(match.get('period', 1)),
+            'tournament': match.get('tournament', ''),
+            'sport': match.get('sport', ''),  # This will be set by the calling function
+            'odds_home': match.get('odds_home'),
+            'odds_away': match.get('odds_away'),
+            'odds_draw': match.get('odds_draw'),
+            'event_count': int(match.get('event_count', 0)),
+            'start_time': match.get('start_time', 0),
+            'data_source': match.get('data_source', 'iscjxxqgmb'),
+
+            # Team information (columns 15-16) - only IDs, removed logos
+            'home_team_id': match.get('home_team_id'),
+            'away_team_id': match.get('away_team_id'),
+
+            # Essential match metadata (columns 17-18) - kept only essential ones
+            'stoppage_time': bool(match.get('stoppage_time', False)),
+            'half_time': bool(match.get('half_time', False))
+        }
+
+        return cleaned_data
+
+    def _row_values(self, sport: str, match_data: Dict, timestamp: str) -> Dict:
+        """Column values for a row-layout (v2) daily table"""
+        return {
+            'match_id': match_data['match_id'],
+            'timestamp': timestamp,
+            'home_team': match_data['home_team'],
+            'away_team': match_data['away_team'],
+            'score': match_data['score'],
+            'status': match_data['status'],
+            'period': match_data['period'],
+            'tournament': match_data['tournament'],
+            'sport': sport,
+            'odds_home': match_data['odds_home'],
+            'odds_away': match_data['odds_away'],
+            'odds_draw': match_data['odds_draw'],
+            'event_count': match_data['event_count'],
+            'start_time': match_data['start_time'],
+            'data_source': match_data['data_source'],
+            # Team information (only IDs)
+            'home_team_id': match_data.get('home_team_id'),
+            'away_team_id': match_data.get('away_team_id'),
+            # Essential match metadata
+            'stoppage_time': match_data.get('stoppage_time', False),
+            'half_time': match_data.get('half_time', False)
+        }
+
+    def _history_snapshot(self, match_data: Dict) -> tuple:
+        """Encode the tracked fields of a match into the compact history form"""
+        def scale(odds):
+            return int(round(float(odds) * ODDS_SCALE)) if odds is not None else None
+
+        return (
+            match_data.get('score') or '',
+            STATUS_CODES.get(match_data.get('status'), 0),
+            int(match_data.get('period') or 1),
+            scale(match_data.get('odds_home')),
+            scale(match_data.get('odds_away')),
+            scale(match_data.get('odds_draw'))
+        )
+
+    def _decode_history(self, match_id: str, rows: List[tuple]) -> List[Dict]:
+        """Decode (seq, ts, sport, score, status, period, odds...) history rows"""
+        def unscale(odds):
+            return odds / ODDS_SCALE if odds is not None else None
+
+        return [{
+            'match_id': str(match_id),
+            'seq': seq,
+            'timestamp': datetime.fromtimestamp(ts).isoformat(),
+            'sport': sport,
+            'score': score,
+            'status': STATUS_NAMES.get(status, 'pregame'),
+            'period': period,
+            'odds_home': unscale(odds_home),
+            'odds_away': unscale(odds_away),
+            'odds_draw': unscale(odds_draw)
+        } for seq, ts, sport, score, status, period, odds_home, odds_away, odds_draw in rows]
+
+
+def create_backend(kind: str = 'sqlite', path: Optional[str] = None, **kwargs) -> StorageBackend:
+    """Open a storage backend by name ('sqlite' or 'duckdb')"""
+    if kind == 'sqlite':
+        from .database import DatabaseManager
+        return DatabaseManager(path or 'sports_data_v2.db', **kwargs)
+    if kind == 'duckdb':
+        from .duckdb_backend import DuckDBBackend
+        return DuckDBBackend(path or 'sports_analytics.duckdb', **kwargs)
+    raise ValueError(f"Unknown storage backend: {kind}")
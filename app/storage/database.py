@@ -5,15 +5,76 @@ Eliminates null columns and provides efficient data storage
 import sqlite3
 import logging
 import json
+import threading
+import time
+import hashlib
 from datetime import datetime, date, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Any
 from contextlib import contextmanager
 
-class DatabaseManager:
-    """Manages day-by-day table structure for efficient data storage"""
+from .backend import StorageBackend, ODDS_SCALE, STATUS_CODES, STATUS_NAMES, MATCH_COLUMNS
 
-    def __init__(self, db_path: str = 'sports_data_v2.db'):
+# Key of the global row in metadata_summary
+SUMMARY_ALL = '*'
+
+# Columns every daily table must have; tables missing any of them are rebuilt
+DAILY_COLUMNS = ('id',) + MATCH_COLUMNS + ('row_hash',)
+
+# Columns readable from every daily table layout (row tables and compact views)
+READ_COLUMNS = MATCH_COLUMNS
+
+# Compact (v3) daily tables store their rows in '<table>_v3' behind a view named '<table>'
+COMPACT_SUFFIX = '_v3'
+
+# Dictionary tables used by the compact layout
+DIMENSION_TABLES = ('dim_team', 'dim_tournament', 'dim_source')
+
+# Daily table layouts: 1 = legacy (is_live/confidence), 2 = row layout, 3 = compact,
+# 4 = row layout with row_hash (compact tables gain the column in place).
+# PRAGMA user_version holds the version every daily table has been migrated to.
+SCHEMA_VERSION = 4
+COMPACT_SCHEMA_VERSION = 3
+
+# Fields covered by row_hash; a match whose hash is unchanged is not rewritten
+HASHED_FIELDS = ('score', 'status', 'period', 'odds_home', 'odds_away', 'odds_draw',
+                 'event_count', 'stoppage_time', 'half_time')
+
+# Matches daily table names ('<sport>_YYYY_MM_DD') and nothing else in sqlite_master
+DAILY_TABLE_GLOB = '*_[0-9][0-9][0-9][0-9]_[0-9][0-9]_[0-9][0-9]'
+
+# Log migration progress every this many tables
+MIGRATION_PROGRESS_EVERY = 100
+
+# Daily tables per UNION ALL statement in iter_matches (SQLite allows 500 compound terms)
+TABLES_PER_QUERY = 400
+
+class DatabaseManager(StorageBackend):
+    """Manages day-by-day table structure for efficient data storage (the SQLite backend)"""
+
+    def __init__(self, db_path: str = 'sports_data_v2.db', compact: bool = False):
         self.db_path = db_path
+
+        # Create new daily tables in the compact (v3) layout
+        self.compact = compact
+
+        # name -> integer key caches for the dictionary tables
+        self._dimension_cache = {dim: {} for dim in DIMENSION_TABLES}
+        self._dimension_lock = threading.Lock()
+
+        # Last history snapshot per match: match_id -> (seq, snapshot tuple)
+        self._history_state = {}
+        self._history_lock = threading.Lock()
+
+        # Daily tables already created or verified by this process -> is compact
+        self._known_tables = {}
+
+        # Stored row_hash per daily table: table_name -> {match_id: hash}
+        self._row_hashes = {}
+
+        # Write counters since the last get_write_metrics(reset=True), i.e. per cycle
+        self._write_metrics = {'new': 0, 'updated': 0, 'unchanged': 0, 'history': 0}
+        self._metrics_lock = threading.Lock()
+
         self._init_database()
 
     @contextmanager
@@ -30,6 +91,14 @@ class DatabaseManager:
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
+            # Lets the maintenance scheduler reclaim space in small steps instead of a
+            # full VACUUM (only takes effect on new files; see optimize_database)
+            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
+            # Readers no longer block the writer; the maintenance scheduler checkpoints the log
+            # in the idle window (the mode is stored in the file, so this sticks)
+            cursor.execute("PRAGMA journal_mode = WAL")
+
             # Create metadata table for tracking table information
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS table_metadata (
@@ -37,7 +106,8 @@ class DatabaseManager:
                     sport TEXT,
                     date_created DATE,
                     last_updated DATETIME,
-                    record_count INTEGER DEFAULT 0
+                    record_count INTEGER DEFAULT 0,
+                    schema_version INTEGER
                 )
             ''')
 
@@ -47,8 +117,59 @@ class DatabaseManager:
                 ON table_metadata (sport, date_created)
             ''')
 
+            # Append-only odds/score history, one row per observed change
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS match_history (
+                    match_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    ts INTEGER NOT NULL,
+                    sport TEXT NOT NULL,
+                    score TEXT,
+                    status INTEGER,
+                    period INTEGER,
+                    odds_home INTEGER,
+                    odds_away INTEGER,
+                    odds_draw INTEGER,
+                    PRIMARY KEY (match_id, seq)
+                ) WITHOUT ROWID
+            ''')
+
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_match_history_match_ts
+                ON match_history (match_id, ts)
+            ''')
+
+            # Pre-aggregated per-sport rows plus one global row keyed SUMMARY_ALL
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS metadata_summary (
+                    sport TEXT PRIMARY KEY,
+                    table_count INTEGER DEFAULT 0,
+                    record_count INTEGER DEFAULT 0,
+                    oldest DATE,
+                    newest DATE,
+                    last_updated DATETIME
+                )
+            ''')
+
+            # Dictionary tables for the compact layout (small integer keys)
+            for dim in DIMENSION_TABLES:
+                cursor.execute(f'''
+                    CREATE TABLE IF NOT EXISTS {dim} (
+                        id INTEGER PRIMARY KEY,
+                        name TEXT UNIQUE NOT NULL
+                    )
+                ''')
+
+            # Seed the summary once for databases created before it existed
+            cursor.execute("SELECT 1 FROM metadata_summary LIMIT 1")
+            if not cursor.fetchone():
+                self._rebuild_metadata_summary(cursor)
+
             conn.commit()
 
+        # O(1) when every daily table is already at SCHEMA_VERSION
+        self.migrate_all_tables()
+
     def get_table_name(self, sport: str, target_date: Optional[date] = None) -> str:
         """Generate table name for sport and date"""
         if target_date is None:
@@ -60,15 +181,65 @@ class DatabaseManager:
         """Create optimized daily table for a sport with expanded fields"""
         table_name = self.get_table_name(sport, target_date)
 
+        # Tables already verified by this process need no further checks
+        if table_name in self._known_tables:
+            return table_name
+
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            kind = self.table_kind(cursor, table_name)
 
-            # Check if table exists and drop it if schema might be wrong
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-            if cursor.fetchone():
-                logging.info(f"INFO: Dropping existing table {table_name} to ensure correct schema")
-                cursor.execute(f"DROP TABLE {table_name}")
+            # Keep an existing table, upgrading it if its schema is out of date
+            if kind == 'table':
+                cursor.execute(f"PRAGMA table_info({table_name})")
+                existing_columns = {col[1] for col in cursor.fetchall()}
+                if not set(DAILY_COLUMNS) <= existing_columns:
+                    logging.info(f"INFO: Upgrading existing table {table_name} to the current schema")
+                    cursor.execute("BEGIN")
+                    self._upgrade_row_table(cursor, table_name, existing_columns)
+
+            if kind is None:
+                if self.compact:
+                    self._create_compact_table(cursor, table_name)
+                    self._create_compact_view(cursor, table_name, sport)
+                    kind = 'view'
+                else:
+                    self._create_row_table(cursor, table_name)
+                    kind = 'table'
+
+                # Register the new (empty) table in metadata and the summary rows
+                table_date = (target_date or date.today()).isoformat()
+                self._unregister_table(cursor, table_name)
+                cursor.execute('''
+                    INSERT INTO table_metadata
+                    (table_name, sport, date_created, last_updated, record_count, schema_version)
+                    VALUES (?, ?, ?, ?, 0, ?)
+                ''', (table_name, sport, table_date, datetime.now(),
+                      COMPACT_SCHEMA_VERSION if kind == 'view' else SCHEMA_VERSION))
+                self._adjust_summary(cursor, sport, tables=1, table_date=table_date)
+                logging.info(f"SUCCESS: Created table: {table_name}{' (compact)' if kind == 'view' else ''}")
+
+            conn.commit()
+
+        # Compact tables are exposed through a view of the same name
+        self._known_tables[table_name] = kind == 'view'
+        return table_name
 
+    def table_kind(self, cursor, name: str) -> Optional[str]:
+        """Return 'table', 'view' or None for a daily table name"""
+        cursor.execute("SELECT type FROM sqlite_master WHERE name = ? AND type IN ('table', 'view')", (name,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def _drop_daily_table(self, cursor, table_name: str):
+        """Drop a daily table in either layout (row table, or compact data table plus view)"""
+        if self.table_kind(cursor, table_name) == 'view':
+            cursor.execute(f"DROP VIEW {table_name}")
+        cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
+        cursor.execute(f"DROP TABLE IF EXISTS {table_name}{COMPACT_SUFFIX}")
+
+    def _create_row_table(self, cursor, table_name: str):
+        """Create a daily table in the row (v2) layout"""
         # Optimized schema - only essential columns (20 total)
         schema = f'''
             CREATE TABLE {table_name} (
@@ -101,7 +272,10 @@ class DatabaseManager:
                 half_time BOOLEAN DEFAULT 0,
 
                 -- Metadata
-                data_source TEXT DEFAULT 'iscjxxqgmb'
+                data_source TEXT DEFAULT 'iscjxxqgmb',
+
+                -- Content hash of HASHED_FIELDS (change detection)
+                row_hash INTEGER
             )
         '''
 
@@ -113,26 +287,143 @@ class DatabaseManager:
             CREATE INDEX IF NOT EXISTS idx_{table_name}_match_id ON {table_name} (match_id);
         '''
 
+        cursor.execute(schema)
+
+        # Create indexes separately
+        for index_stmt in index_sql.strip().split(';'):
+            if index_stmt.strip():
+                cursor.execute(index_stmt.strip())
+
+    def _create_compact_table(self, cursor, table_name: str):
+        """Create the data table of a compact (v3) daily table"""
+        data_table = f"{table_name}{COMPACT_SUFFIX}"
+
+        # Teams, tournament and source are dictionary-encoded; flags packs the booleans
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {data_table} (
+                match_id TEXT PRIMARY KEY,
+                ts INTEGER NOT NULL,
+                home_key INTEGER NOT NULL,
+                away_key INTEGER NOT NULL,
+                tournament_key INTEGER,
+                score TEXT,
+                status INTEGER DEFAULT 0,
+                period INTEGER DEFAULT 1,
+                odds_home REAL,
+                odds_away REAL,
+                odds_draw REAL,
+                event_count INTEGER DEFAULT 0,
+                start_time INTEGER,
+                home_team_id INTEGER,
+                away_team_id INTEGER,
+                flags INTEGER DEFAULT 0,
+                source INTEGER,
+                row_hash INTEGER
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{data_table}_ts ON {data_table} (ts)")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{data_table}_teams ON {data_table} (home_key, away_key)")
+
+    def _create_compact_view(self, cursor, table_name: str, sport: str):
+        """Expose a compact table under the daily table name with the v2 columns"""
+        sport_literal = sport.replace("'", "''")
+        cursor.execute(f'''
+            CREATE VIEW IF NOT EXISTS {table_name} AS
+            SELECT m.match_id AS match_id,
+                   datetime(m.ts, 'unixepoch') AS timestamp,
+                   h.name AS home_team,
+                   a.name AS away_team,
+                   m.score AS score,
+                   CASE m.status WHEN {STATUS_CODES['live']} THEN 'live'
+                                 WHEN {STATUS_CODES['finished']} THEN 'finished' ELSE 'pregame' END AS status,
+                   m.period AS period,
+                   t.name AS tournament,
+                   '{sport_literal}' AS sport,
+                   m.odds_home AS odds_home,
+                   m.odds_away AS odds_away,
+                   m.odds_draw AS odds_draw,
+                   m.event_count AS event_count,
+                   m.start_time AS start_time,
+                   m.home_team_id AS home_team_id,
+                   m.away_team_id AS away_team_id,
+                   (m.flags & 1) AS stoppage_time,
+                   ((m.flags >> 1) & 1) AS half_time,
+                   s.name AS data_source
+            FROM {table_name}{COMPACT_SUFFIX} m
+            JOIN dim_team h ON h.id = m.home_key
+            JOIN dim_team a ON a.id = m.away_key
+            LEFT JOIN dim_tournament t ON t.id = m.tournament_key
+            LEFT JOIN dim_source s ON s.id = m.source
+        ''')
+
+    def _adjust_summary(self, cursor, sport: str, tables: int = 0, records: int = 0,
+                        table_date: Optional[str] = None):
+        """Apply table/record deltas to the per-sport and global ('*') summary rows"""
+        now = datetime.now()
+        for key in (sport, SUMMARY_ALL):
+            cursor.execute('''
+                INSERT INTO metadata_summary
+                (sport, table_count, record_count, oldest, newest, last_updated)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(sport) DO UPDATE SET
+                    table_count = table_count + excluded.table_count,
+                    record_count = record_count + excluded.record_count,
+                    oldest = CASE WHEN excluded.oldest IS NOT NULL AND (oldest IS NULL OR excluded.oldest < oldest)
+                                  THEN excluded.oldest ELSE oldest END,
+                    newest = CASE WHEN excluded.newest IS NOT NULL AND (newest IS NULL OR excluded.newest > newest)
+                                  THEN excluded.newest ELSE newest END,
+                    last_updated = excluded.last_updated
+            ''', (key, tables, records, table_date, table_date, now))
+
+    def _unregister_table(self, cursor, table_name: str):
+        """Remove a table from metadata and subtract it from the summary rows"""
+        cursor.execute("SELECT sport, record_count FROM table_metadata WHERE table_name = ?", (table_name,))
+        row = cursor.fetchone()
+        if not row:
+            return
+
+        sport, record_count = row
+        cursor.execute("DELETE FROM table_metadata WHERE table_name = ?", (table_name,))
+        self._adjust_summary(cursor, sport, tables=-1, records=-(record_count or 0))
+
+        # Date bounds can only shrink here; re-read them from the (sport, date_created) index
+        cursor.execute('''
+            SELECT MIN(date_created), MAX(date_created) FROM table_metadata WHERE sport = ?
+        ''', (sport,))
+        oldest, newest = cursor.fetchone()
+        if oldest is None:
+            cursor.execute("DELETE FROM metadata_summary WHERE sport = ?", (sport,))
+        else:
+            cursor.execute('''
+                UPDATE metadata_summary SET oldest = ?, newest = ? WHERE sport = ?
+            ''', (oldest, newest, sport))
+
+        cursor.execute('''
+            UPDATE metadata_summary SET
+                oldest = (SELECT MIN(oldest) FROM metadata_summary WHERE sport != ?),
+                newest = (SELECT MAX(newest) FROM metadata_summary WHERE sport != ?)
+            WHERE sport = ?
+        ''', (SUMMARY_ALL, SUMMARY_ALL, SUMMARY_ALL))
+
+    def rebuild_metadata_summary(self):
+        """Recompute the summary rows from table_metadata (one-off O(n) repair)"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(schema)
-
-            # Create indexes separately
-            for index_stmt in index_sql.strip().split(';'):
-                if index_stmt.strip():
-                    cursor.execute(index_stmt.strip())
-
-            # Update metadata
-            cursor.execute('''
-                INSERT OR REPLACE INTO table_metadata
-                (table_name, sport, date_created, last_updated, record_count)
-                VALUES (?, ?, ?, ?, COALESCE((SELECT record_count FROM table_metadata WHERE table_name = ?), 0))
-            ''', (table_name, sport, date.today(), datetime.now(), table_name))
-
+            self._rebuild_metadata_summary(cursor)
             conn.commit()
 
-        logging.info(f"SUCCESS: Created/verified table: {table_name}")
-        return table_name
+    def _rebuild_metadata_summary(self, cursor):
+        cursor.execute("DELETE FROM metadata_summary")
+        cursor.execute('''
+            INSERT INTO metadata_summary (sport, table_count, record_count, oldest, newest, last_updated)
+            SELECT sport, COUNT(*), COALESCE(SUM(record_count), 0), MIN(date_created), MAX(date_created), ?
+            FROM table_metadata GROUP BY sport
+        ''', (datetime.now(),))
+        cursor.execute('''
+            INSERT INTO metadata_summary (sport, table_count, record_count, oldest, newest, last_updated)
+            SELECT ?, COALESCE(SUM(table_count), 0), COALESCE(SUM(record_count), 0), MIN(oldest), MAX(newest), ?
+            FROM metadata_summary
+        ''', (SUMMARY_ALL, datetime.now()))
 
     def insert_match_data(self, sport: str, matches: List[Dict], target_date: Optional[date] = None) -> int:
         """Insert match data into appropriate daily table"""
@@ -142,9 +433,19 @@ class DatabaseManager:
         table_name = self.create_daily_table(sport, target_date)
 
         inserted_count = 0
+        new_count = 0
+        updated_count = 0
+        unchanged_count = 0
+        history_count = 0
+        snapshot_ts = int(time.time())
+        snapshot_utc = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(snapshot_ts))
+
+        compact = self._known_tables[table_name]
+        target_table = f"{table_name}{COMPACT_SUFFIX}" if compact else table_name
 
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            stored_hashes = self._stored_row_hashes(cursor, table_name, target_table)
 
             for match in matches:
                 try:
@@ -155,101 +456,180 @@ class DatabaseManager:
                     if inserted_count < 5 and match_data.get('event_count', 0) > 0:
                         logging.info(f"DB Insert: Match {match_data['match_id']} has event_count: {match_data['event_count']}")
 
-                    # Insert or update match data with optimized fields (18 columns including sport)
-                    values = (
-                        match_data['match_id'],
-                        match_data['home_team'],
-                        match_data['away_team'],
-                        match_data['score'],
-                        match_data['status'],
-                        match_data['period'],
-                        match_data['tournament'],
-                        sport,
-                        match_data['odds_home'],
-                        match_data['odds_away'],
-                        match_data['odds_draw'],
-                        match_data['event_count'],
-                        match_data['start_time'],
-                        match_data['data_source'],
-                        # Team information (only IDs)
-                        match_data.get('home_team_id'),
-                        match_data.get('away_team_id'),
-                        # Essential match metadata
-                        match_data.get('stoppage_time', False),
-                        match_data.get('half_time', False)
-                    )
-
-                    # Verify the values count matches columns before insertion
-                    expected_columns = 18
-                    if len(values) != expected_columns:
-                        logging.error(f"Column count mismatch: expected {expected_columns}, got {len(values)}")
+                    # Unchanged since the last write: no row update, index churn or history
+                    row_hash = self._row_hash(match_data)
+                    if stored_hashes.get(match_data['match_id']) == row_hash:
+                        unchanged_count += 1
+                        inserted_count += 1
                         continue
 
-                    cursor.execute(f'''
-                        INSERT OR REPLACE INTO {table_name}
-                        (match_id, home_team, away_team, score, status, period, tournament, sport,
-                         odds_home, odds_away, odds_draw, event_count, start_time, data_source,
-                         home_team_id, away_team_id, stoppage_time, half_time)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', values)
-
+                    # Build the row for the table's layout (row or compact)
+                    if compact:
+                        row = self._compact_row(cursor, match_data, snapshot_ts)
+                    else:
+                        row = self._row_values(sport, match_data, snapshot_utc)
+                    row['row_hash'] = row_hash
+
+                    # Insert new matches; existing ones are updated in place so the
+                    # insert/update split is known without recounting the table
+                    if self._upsert_row(cursor, target_table, row):
+                        new_count += 1
+                    else:
+                        updated_count += 1
+
+                    stored_hashes[match_data['match_id']] = row_hash
                     inserted_count += 1
 
+                    if self._append_history(cursor, sport, match_data, snapshot_ts):
+                        history_count += 1
+
                 except Exception as e:
                     logging.error(f"Failed to insert match {match.get('match_id', 'unknown')}: {e}")
                     continue
 
-            # Update metadata with new count
-            cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-            new_count = cursor.fetchone()[0]
-
-            cursor.execute('''
-                UPDATE table_metadata
-                SET last_updated = ?, record_count = ?
-                WHERE table_name = ?
-            ''', (datetime.now(), new_count, table_name))
+            # Only newly inserted rows change the record counts; a batch with no
+            # changes leaves last_updated alone so maintenance and syncs skip the table
+            if new_count or updated_count:
+                cursor.execute('''
+                    UPDATE table_metadata
+                    SET last_updated = ?, record_count = record_count + ?
+                    WHERE table_name = ?
+                ''', (datetime.now(), new_count, table_name))
+            if new_count:
+                self._adjust_summary(cursor, sport, records=new_count)
 
             conn.commit()
 
-        logging.info(f"SUCCESS: Inserted {inserted_count} matches into {table_name}")
+        with self._metrics_lock:
+            self._write_metrics['new'] += new_count
+            self._write_metrics['updated'] += updated_count
+            self._write_metrics['unchanged'] += unchanged_count
+            self._write_metrics['history'] += history_count
+
+        logging.info(f"SUCCESS: Inserted {inserted_count} matches into {table_name} "
+                     f"({new_count} new, {updated_count} updated, {unchanged_count} unchanged, "
+                     f"{history_count} history changes)")
         return inserted_count
 
-    def _clean_match_data(self, match: Dict) -> Dict:
-        """Clean and validate match data with optimized fields (18 columns), providing defaults for missing fields"""
-        # Validate status field
-        status = match.get('status', 'pregame')
-        if status not in ['pregame', 'live']:
-            status = 'pregame'  # Default to pregame for unknown statuses
-
-        # Create a completely new dictionary with ONLY the fields that exist in the optimized database schema (18 columns)
-        # This ensures no extra fields from the API response are included and matches the optimized schema
-        cleaned_data = {
-            # Core match data (columns 1-14)
-            'match_id': str(match.get('match_id', '')),
-            'home_team': match.get('home_team', '').strip(),
-            'away_team': match.get('away_team', '').strip(),
-            'score': match.get('score', ''),
-            'status': status,
-            'period': int(match.get('period', 1)),
-            'tournament': match.get('tournament', ''),
-            'sport': match.get('sport', ''),  # This will be set by the calling function
-            'odds_home': match.get('odds_home'),
-            'odds_away': match.get('odds_away'),
-            'odds_draw': match.get('odds_draw'),
-            'event_count': int(match.get('event_count', 0)),
-            'start_time': match.get('start_time', 0),
-            'data_source': match.get('data_source', 'iscjxxqgmb'),
-
-            # Team information (columns 15-16) - only IDs, removed logos
-            'home_team_id': match.get('home_team_id'),
-            'away_team_id': match.get('away_team_id'),
-
-            # Essential match metadata (columns 17-18) - kept only essential ones
-            'stoppage_time': bool(match.get('stoppage_time', False)),
-            'half_time': bool(match.get('half_time', False))
+    def _row_hash(self, match_data: Dict) -> int:
+        """64-bit content hash of the mutable match fields (HASHED_FIELDS), as a signed SQLite integer"""
+        payload = repr(tuple(match_data.get(field) for field in HASHED_FIELDS)).encode('utf-8')
+        return int.from_bytes(hashlib.blake2b(payload, digest_size=8).digest(), 'big', signed=True)
+
+    def _stored_row_hashes(self, cursor, table_name: str, target_table: str) -> Dict[str, int]:
+        """match_id -> row_hash for a daily table, loaded once per process"""
+        hashes = self._row_hashes.get(table_name)
+        if hashes is None:
+            cursor.execute(f"SELECT match_id, row_hash FROM {target_table} WHERE row_hash IS NOT NULL")
+            hashes = self._row_hashes.setdefault(table_name, dict(cursor.fetchall()))
+        return hashes
+
+    def get_write_metrics(self, reset: bool = False) -> Dict[str, int]:
+        """Rows written new/updated, skipped as unchanged, and history rows appended"""
+        with self._metrics_lock:
+            metrics = dict(self._write_metrics)
+            if reset:
+                self._write_metrics = dict.fromkeys(metrics, 0)
+        return metrics
+
+    def _compact_row(self, cursor, match_data: Dict, ts: int) -> Dict:
+        """Column values for a compact (v3) daily table"""
+        flags = (1 if match_data.get('stoppage_time') else 0) | (2 if match_data.get('half_time') else 0)
+        return {
+            'match_id': match_data['match_id'],
+            'ts': ts,
+            'home_key': self._dimension_key(cursor, 'dim_team', match_data['home_team']),
+            'away_key': self._dimension_key(cursor, 'dim_team', match_data['away_team']),
+            'tournament_key': self._dimension_key(cursor, 'dim_tournament', match_data['tournament']),
+            'score': match_data['score'],
+            'status': STATUS_CODES.get(match_data['status'], 0),
+            'period': match_data['period'],
+            'odds_home': match_data['odds_home'],
+            'odds_away': match_data['odds_away'],
+            'odds_draw': match_data['odds_draw'],
+            'event_count': match_data['event_count'],
+            'start_time': match_data['start_time'],
+            'home_team_id': match_data.get('home_team_id'),
+            'away_team_id': match_data.get('away_team_id'),
+            'flags': flags,
+            'source': self._dimension_key(cursor, 'dim_source', match_data['data_source'])
         }
 
-        return cleaned_data
+    def _upsert_row(self, cursor, table: str, row: Dict) -> bool:
+        """Insert a row keyed on match_id or update it in place; returns True if it was new"""
+        columns = list(row)
+        cursor.execute(f'''
+            INSERT OR IGNORE INTO {table} ({', '.join(columns)})
+            VALUES ({', '.join('?' for _ in columns)})
+        ''', tuple(row.values()))
+        if cursor.rowcount:
+            return True
+
+        updates = [column for column in columns if column != 'match_id']
+        cursor.execute(f'''
+            UPDATE {table} SET {', '.join(f'{column} = ?' for column in updates)}
+            WHERE match_id = ?
+        ''', tuple(row[column] for column in updates) + (row['match_id'],))
+        return False
+
+    def _dimension_key(self, cursor, dim: str, name: Optional[str]) -> Optional[int]:
+        """Integer key for a team/tournament/source name, creating it on first use"""
+        if name is None:
+            return None
+
+        cache = self._dimension_cache[dim]
+        key = cache.get(name)
+        if key is not None:
+            return key
+
+        with self._dimension_lock:
+            cursor.execute(f"INSERT OR IGNORE INTO {dim} (name) VALUES (?)", (name,))
+            cursor.execute(f"SELECT id FROM {dim} WHERE name = ?", (name,))
+            key = cursor.fetchone()[0]
+            cache[name] = key
+        return key
+
+    def _append_history(self, cursor, sport: str, match_data: Dict, ts: int) -> bool:
+        """Append a history row if odds, score, status or period changed since the last one"""
+        match_id = match_data['match_id']
+        snapshot = self._history_snapshot(match_data)
+
+        with self._history_lock:
+            last = self._history_state.get(match_id)
+            if last is None:
+                # Not seen by this process yet - resume from the latest stored row
+                cursor.execute('''
+                    SELECT seq, score, status, period, odds_home, odds_away, odds_draw
+                    FROM match_history WHERE match_id = ? ORDER BY seq DESC LIMIT 1
+                ''', (match_id,))
+                row = cursor.fetchone()
+                if row:
+                    last = (row[0], tuple(row[1:]))
+
+            if last is not None and last[1] == snapshot:
+                return False
+
+            seq = last[0] + 1 if last is not None else 1
+            cursor.execute('''
+                INSERT INTO match_history
+                (match_id, seq, ts, sport, score, status, period, odds_home, odds_away, odds_draw)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (match_id, seq, ts, sport) + snapshot)
+            self._history_state[match_id] = (seq, snapshot)
+
+        return True
+
+    def get_match_history(self, match_id: str) -> List[Dict]:
+        """Get the change history (line movement, score and status changes) for a match"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT seq, ts, sport, score, status, period, odds_home, odds_away, odds_draw
+                FROM match_history WHERE match_id = ? ORDER BY seq
+            ''', (str(match_id),))
+            rows = cursor.fetchall()
+
+        return self._decode_history(match_id, rows)
 
     def get_matches_by_date(self, sport: str, target_date: date) -> List[Dict]:
         """Get all matches for a specific sport and date"""
@@ -258,9 +638,8 @@ class DatabaseManager:
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
-            # Check if table exists
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-            if not cursor.fetchone():
+            # Check if table (or compact view) exists
+            if self.table_kind(cursor, table_name) is None:
                 return []
 
             cursor.execute(f"SELECT * FROM {table_name} ORDER BY timestamp DESC")
@@ -269,170 +648,378 @@ class DatabaseManager:
 
             return [dict(zip(columns, row)) for row in rows]
 
-    def get_recent_matches(self, sport: str, days: int = 7) -> List[Dict]:
-        """Get recent matches across multiple days"""
-        all_matches = []
+    def get_daily_tables(self, sport: str, start_date: date, end_date: date) -> List[Tuple[date, str]]:
+        """Existing daily tables (row or compact) for a sport between two dates, newest first"""
+        candidates = {}
+        current = end_date
+        while current >= start_date:
+            candidates[self.get_table_name(sport, current)] = current
+            current -= timedelta(days=1)
 
-        for i in range(days):
-            target_date = date.today() - timedelta(days=i)
-            matches = self.get_matches_by_date(sport, target_date)
-            all_matches.extend(matches)
+        if not candidates:
+            return []
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT name FROM sqlite_master
+                WHERE type IN ('table', 'view') AND name IN ({', '.join('?' for _ in candidates)})
+            ''', tuple(candidates))
+            existing = {row[0] for row in cursor.fetchall()}
+
+        return [(day, name) for name, day in candidates.items() if name in existing]
+
+    def iter_matches(self, sport: str, start_date: date, end_date: date,
+                     columns: Optional[List[str]] = None, where: Optional[str] = None,
+                     params: tuple = (), ordered: bool = False, batch_size: Optional[int] = None,
+                     row_factory: str = 'dict', chunk_size: int = 1000) -> Iterator:
+        """Stream matches for a sport and date range from a single cursor.
+
+        columns projects a subset of READ_COLUMNS; where is an SQL condition applied
+        to every daily table with params bound for each of them. ordered=True returns
+        newest day first, each day by timestamp DESC (like get_recent_matches).
+        Rows are dicts, tuples or sqlite3.Row objects depending on row_factory; with
+        batch_size, lists of up to batch_size rows are yielded instead of single rows.
+        """
+        columns = list(columns or READ_COLUMNS)
+        unknown = [column for column in columns if column not in READ_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown match columns: {unknown}")
+        if row_factory not in ('dict', 'tuple', 'row'):
+            raise ValueError(f"Unsupported row_factory: {row_factory}")
+
+        tables = self.get_daily_tables(sport, start_date, end_date)
+        if not tables:
+            return
+
+        projection = ', '.join(columns)
+        condition = f" WHERE {where}" if where else ''
 
-        return all_matches
+        with self.get_connection() as conn:
+            if row_factory == 'row':
+                conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            keys = tuple(columns)
+
+            # Tables are read TABLES_PER_QUERY at a time; groups follow the newest-first table order
+            for offset in range(0, len(tables), TABLES_PER_QUERY):
+                group = tables[offset:offset + TABLES_PER_QUERY]
+                parts = [f"SELECT {projection}, timestamp AS _ts, {index} AS _part FROM {name}{condition}"
+                         for index, (_, name) in enumerate(group)]
+                query = f"SELECT {projection} FROM ({' UNION ALL '.join(parts)})"
+                if ordered:
+                    query += " ORDER BY _part, _ts DESC"
+                cursor.execute(query, tuple(params) * len(group))
+
+                while True:
+                    rows = cursor.fetchmany(batch_size or chunk_size)
+                    if not rows:
+                        break
+                    if row_factory == 'dict':
+                        rows = [dict(zip(keys, row)) for row in rows]
+
+                    if batch_size:
+                        yield rows
+                    else:
+                        yield from rows
 
     def get_database_stats(self) -> Dict:
-        """Get comprehensive database statistics"""
+        """Get comprehensive database statistics from the pre-aggregated summary rows"""
         stats = {
             'total_tables': 0,
             'total_records': 0,
-            'sports_covered': set(),
-            'date_range': {'oldest': None, 'newest': None}
+            'sports_covered': [],
+            'date_range': {'oldest': None, 'newest': None},
+            'per_sport': {}
         }
 
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute("SELECT sport, table_count, record_count, oldest, newest FROM metadata_summary")
+            summary_rows = cursor.fetchall()
+
+        for sport, table_count, record_count, oldest, newest in summary_rows:
+            if sport == SUMMARY_ALL:
+                stats['total_tables'] = table_count or 0
+                stats['total_records'] = record_count or 0
+                stats['date_range'] = {'oldest': oldest, 'newest': newest}
+            else:
+                stats['sports_covered'].append(sport)
+                stats['per_sport'][sport] = {
+                    'tables': table_count or 0,
+                    'records': record_count or 0,
+                    'oldest': oldest,
+                    'newest': newest
+                }
 
-            # Get table metadata
-            cursor.execute("SELECT * FROM table_metadata ORDER BY date_created")
-            metadata_rows = cursor.fetchall()
-
-            if metadata_rows:
-                stats['total_tables'] = len(metadata_rows)
-
-                for row in metadata_rows:
-                    table_name, sport, date_created, last_updated, record_count = row
-                    stats['total_records'] += record_count or 0
-                    stats['sports_covered'].add(sport)
-
-                    if stats['date_range']['oldest'] is None or date_created < stats['date_range']['oldest']:
-                        stats['date_range']['oldest'] = date_created
-                    if stats['date_range']['newest'] is None or date_created > stats['date_range']['newest']:
-                        stats['date_range']['newest'] = date_created
-
-        stats['sports_covered'] = list(stats['sports_covered'])
         return stats
 
-    def cleanup_old_data(self, retention_days: int = 90):
-        """Remove tables older than retention period"""
+    def cleanup_old_data(self, retention_days: int = 90, archiver=None):
+        """Remove tables older than retention period.
+
+        With an archiver (see storage.archive.ArchiveManager) each table is written
+        to the cold tier first; tables that fail to archive are kept.
+        """
         cutoff_date = date.today() - timedelta(days=retention_days)
 
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
             # Find old tables
-            cursor.execute("SELECT table_name FROM table_metadata WHERE date_created < ?", (cutoff_date,))
+            cursor.execute('''
+                SELECT table_name, sport, date_created FROM table_metadata WHERE date_created < ?
+            ''', (cutoff_date.isoformat(),))
             old_tables = cursor.fetchall()
 
-            for (table_name,) in old_tables:
+        if archiver is not None:
+            old_tables = [table for table in old_tables if archiver.archive_table(*table)]
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+
+            for table_name, _, _ in old_tables:
                 try:
-                    cursor.execute(f"DROP TABLE {table_name}")
-                    cursor.execute("DELETE FROM table_metadata WHERE table_name = ?", (table_name,))
+                    self._drop_daily_table(cursor, table_name)
+                    self._unregister_table(cursor, table_name)
+                    self._known_tables.pop(table_name, None)
+                    self._row_hashes.pop(table_name, None)
                     logging.info(f"CLEANUP: Dropped old table: {table_name}")
                 except Exception as e:
                     logging.error(f"Failed to drop table {table_name}: {e}")
 
+            # History rows share the same retention window
+            cutoff_ts = int(datetime.combine(cutoff_date, datetime.min.time()).timestamp())
+            cursor.execute("DELETE FROM match_history WHERE ts < ?", (cutoff_ts,))
+            if cursor.rowcount > 0:
+                logging.info(f"CLEANUP: Removed {cursor.rowcount} old history rows")
+
             conn.commit()
 
-    def migrate_table_schema(self, table_name: str):
-        """Migrate existing table to new schema (replace is_live and confidence with event_count)"""
+    def migrate_table_schema(self, table_name: str) -> bool:
+        """Upgrade one row-layout daily table to the current (v2) schema; True if it was migrated"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
             try:
-                # Check if table exists and has old schema
                 cursor.execute(f"PRAGMA table_info({table_name})")
-                columns = cursor.fetchall()
-                column_names = [col[1] for col in columns]
-
-                if 'is_live' in column_names and 'confidence' in column_names:
-                    logging.info(f"🔄 Migrating table {table_name} to new schema...")
-
-                    # Create temporary table with new schema
-                    temp_table = f"{table_name}_temp_migration"
-                    new_schema = f'''
-                        CREATE TABLE {temp_table} (
-                            id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            match_id TEXT UNIQUE NOT NULL,
-                            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                            home_team TEXT NOT NULL,
-                            away_team TEXT NOT NULL,
-                            score TEXT,
-                            status TEXT,
-                            period INTEGER DEFAULT 1,
-                            tournament TEXT,
-                            sport TEXT NOT NULL,
-                            odds_home REAL,
-                            odds_away REAL,
-                            odds_draw REAL,
-                            event_count INTEGER DEFAULT 0,
-                            start_time INTEGER,
-                            data_source TEXT DEFAULT '1xbet'
-                        )
-                    '''
-
-                    cursor.execute(new_schema)
-
-                    # Copy data from old table to new table, converting status values
-                    cursor.execute(f'''
-                        INSERT INTO {temp_table}
-                        (id, match_id, timestamp, home_team, away_team, score, status, period,
-                         tournament, sport, odds_home, odds_away, odds_draw, event_count,
-                         start_time, data_source)
-                        SELECT id, match_id, timestamp, home_team, away_team, score,
-                               CASE
-                                   WHEN status = 'scheduled' THEN 'pregame'
-                                   WHEN status IN ('pregame', 'live') THEN status
-                                   ELSE 'pregame'
-                               END as status,
-                               period, tournament, sport, odds_home, odds_away, odds_draw, 0,
-                               start_time, data_source
-                        FROM {table_name}
-                    ''')
-
-                    # Drop old table and rename new table
-                    cursor.execute(f"DROP TABLE {table_name}")
-                    cursor.execute(f"ALTER TABLE {temp_table} RENAME TO {table_name}")
-
-                    # Recreate indexes
-                    index_sql = f'''
-                        CREATE INDEX IF NOT EXISTS idx_{table_name}_timestamp ON {table_name} (timestamp);
-                        CREATE INDEX IF NOT EXISTS idx_{table_name}_teams ON {table_name} (home_team, away_team);
-                        CREATE INDEX IF NOT EXISTS idx_{table_name}_status ON {table_name} (status);
-                        CREATE INDEX IF NOT EXISTS idx_{table_name}_match_id ON {table_name} (match_id);
-                    '''
-                    for index_stmt in index_sql.strip().split(';'):
-                        if index_stmt.strip():
-                            cursor.execute(index_stmt.strip())
+                column_names = {col[1] for col in cursor.fetchall()}
 
-                    conn.commit()
-                    logging.info(f"✅ Successfully migrated table {table_name}")
-                else:
+                if not column_names or set(DAILY_COLUMNS) <= column_names:
                     logging.info(f"ℹ️ Table {table_name} already has new schema or doesn't exist")
+                    return False
+
+                cursor.execute("BEGIN")
+                self._upgrade_row_table(cursor, table_name, column_names)
+                conn.commit()
+                logging.info(f"✅ Successfully migrated table {table_name}")
+                return True
 
             except Exception as e:
                 logging.error(f"❌ Failed to migrate table {table_name}: {e}")
                 conn.rollback()
+                return False
+
+    def _upgrade_row_table(self, cursor, table_name: str, column_names: set):
+        """Rebuild a daily table in the current row layout, keeping its rows"""
+        if set(DAILY_COLUMNS) - column_names == {'row_hash'}:
+            # v2 tables only lack the hash column, which can be added in place
+            cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN row_hash INTEGER")
+            cursor.execute("UPDATE table_metadata SET schema_version = ? WHERE table_name = ?",
+                           (SCHEMA_VERSION, table_name))
+            return
+
+        legacy_table = f"{table_name}_legacy_migration"
+        cursor.execute(f"ALTER TABLE {table_name} RENAME TO {legacy_table}")
+
+        # Indexes keep their names across a rename; drop them so the new table gets its own
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                       (legacy_table,))
+        for (index_name,) in cursor.fetchall():
+            cursor.execute(f"DROP INDEX {index_name}")
+
+        self._create_row_table(cursor, table_name)
+
+        # Copy the columns both layouts share; the rest take their defaults
+        columns = [column for column in DAILY_COLUMNS if column in column_names]
+        expressions = list(columns)
+        if 'is_live' in column_names and 'status' in columns:
+            # Legacy (v1) tables used 'scheduled' and other free-form status values
+            expressions[columns.index('status')] = '''
+                CASE
+                    WHEN status = 'scheduled' THEN 'pregame'
+                    WHEN status IN ('pregame', 'live', 'finished') THEN status
+                    ELSE 'pregame'
+                END'''
+
+        cursor.execute(f'''
+            INSERT INTO {table_name} ({', '.join(columns)})
+            SELECT {', '.join(expressions)} FROM {legacy_table}
+        ''')
+        cursor.execute(f"DROP TABLE {legacy_table}")
+        cursor.execute("UPDATE table_metadata SET schema_version = ? WHERE table_name = ?",
+                       (SCHEMA_VERSION, table_name))
+
+    def migrate_all_tables(self, progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """Bring every daily table up to SCHEMA_VERSION; returns the number migrated.
+
+        PRAGMA user_version records the version all daily tables were last brought
+        to, so when nothing changed this is a single PRAGMA read. Otherwise the
+        outdated tables are found with one catalog query and upgraded together in
+        one transaction, reporting progress through logging and progress(done, total).
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("PRAGMA user_version")
+            if cursor.fetchone()[0] >= SCHEMA_VERSION:
+                return 0
+
+            # Databases from before per-table versions
+            cursor.execute("PRAGMA table_info(table_metadata)")
+            if 'schema_version' not in {col[1] for col in cursor.fetchall()}:
+                cursor.execute("ALTER TABLE table_metadata ADD COLUMN schema_version INTEGER")
+                conn.commit()
+
+            # Daily row tables missing any current column, with their column lists
+            cursor.execute(f'''
+                SELECT m.name, (SELECT group_concat(c.name) FROM pragma_table_info(m.name) c)
+                FROM sqlite_master m
+                WHERE m.type = 'table' AND m.name GLOB '{DAILY_TABLE_GLOB}'
+                  AND (SELECT COUNT(*) FROM pragma_table_info(m.name) c
+                       WHERE c.name IN ({', '.join('?' for _ in DAILY_COLUMNS)})) < ?
+                ORDER BY m.name
+            ''', DAILY_COLUMNS + (len(DAILY_COLUMNS),))
+            outdated = [(name, set(columns.split(','))) for name, columns in cursor.fetchall()]
+
+            # Compact data tables created before row_hash existed
+            cursor.execute(f'''
+                SELECT m.name FROM sqlite_master m
+                WHERE m.type = 'table' AND m.name GLOB '{DAILY_TABLE_GLOB}{COMPACT_SUFFIX}'
+                  AND NOT EXISTS (SELECT 1 FROM pragma_table_info(m.name) c WHERE c.name = 'row_hash')
+            ''')
+            compact_outdated = [row[0] for row in cursor.fetchall()]
+
+            try:
+                cursor.execute("BEGIN")
+                for data_table in compact_outdated:
+                    cursor.execute(f"ALTER TABLE {data_table} ADD COLUMN row_hash INTEGER")
+
+                for index, (table_name, column_names) in enumerate(outdated, 1):
+                    self._upgrade_row_table(cursor, table_name, column_names)
+                    if index == len(outdated) or index % MIGRATION_PROGRESS_EVERY == 0:
+                        logging.info(f"MIGRATE: [{index}/{len(outdated)}] tables upgraded to schema v{SCHEMA_VERSION}")
+                    if progress:
+                        progress(index, len(outdated))
+
+                # Record versions for tables registered before they were tracked
+                cursor.execute(f'''
+                    UPDATE table_metadata SET schema_version = CASE
+                        WHEN EXISTS (SELECT 1 FROM sqlite_master
+                                     WHERE type = 'view' AND name = table_metadata.table_name)
+                        THEN {COMPACT_SCHEMA_VERSION} ELSE {SCHEMA_VERSION} END
+                    WHERE schema_version IS NULL
+                ''')
+                cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                conn.commit()
+
+            except Exception as e:
+                # Nothing is half-applied; the next startup retries
+                conn.rollback()
+                logging.error(f"Failed to migrate daily tables: {e}")
+                return 0
+
+        if outdated:
+            logging.info(f"SUCCESS: Migrated {len(outdated)} tables to schema v{SCHEMA_VERSION}")
+        return len(outdated)
+
+    def migrate_to_compact(self, table_names: Optional[List[str]] = None) -> int:
+        """Convert row-layout daily tables to the compact (v3) layout.
+
+        Each table is copied into '<table>_v3' and replaced by a view of the same
+        name, so get_matches_by_date and existing queries keep working.
+        """
+        migrated = 0
 
-    def migrate_all_tables(self):
-        """Migrate all existing tables to new schema"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute("SELECT table_name, sport FROM table_metadata ORDER BY date_created")
+            tables = [(name, sport) for name, sport in cursor.fetchall()
+                      if table_names is None or name in table_names]
+
+            for index, (table_name, sport) in enumerate(tables, 1):
+                if self.table_kind(cursor, table_name) != 'table':
+                    continue
+
+                try:
+                    cursor.execute("BEGIN")
+                    self._create_compact_table(cursor, table_name)
+
+                    # Fill the dictionaries, then copy rows with their integer keys
+                    cursor.execute(f'''
+                        INSERT OR IGNORE INTO dim_team (name)
+                        SELECT home_team FROM {table_name} UNION SELECT away_team FROM {table_name}
+                    ''')
+                    cursor.execute(f'''
+                        INSERT OR IGNORE INTO dim_tournament (name)
+                        SELECT DISTINCT tournament FROM {table_name} WHERE tournament IS NOT NULL
+                    ''')
+                    cursor.execute(f'''
+                        INSERT OR IGNORE INTO dim_source (name)
+                        SELECT DISTINCT data_source FROM {table_name} WHERE data_source IS NOT NULL
+                    ''')
+                    cursor.execute(f'''
+                        INSERT OR REPLACE INTO {table_name}{COMPACT_SUFFIX}
+                        (match_id, ts, home_key, away_key, tournament_key, score, status, period,
+                         odds_home, odds_away, odds_draw, event_count, start_time,
+                         home_team_id, away_team_id, flags, source, row_hash)
+                        SELECT m.match_id,
+                               CAST(strftime('%s', COALESCE(m.timestamp, 'now')) AS INTEGER),
+                               h.id, a.id, t.id, m.score,
+                               CASE m.status WHEN 'live' THEN {STATUS_CODES['live']}
+                                             WHEN 'finished' THEN {STATUS_CODES['finished']}
+                                             ELSE {STATUS_CODES['pregame']} END,
+                               m.period, m.odds_home, m.odds_away, m.odds_draw, m.event_count, m.start_time,
+                               m.home_team_id, m.away_team_id,
+                               (CASE WHEN m.stoppage_time THEN 1 ELSE 0 END) | (CASE WHEN m.half_time THEN 2 ELSE 0 END),
+                               s.id, m.row_hash
+                        FROM {table_name} m
+                        JOIN dim_team h ON h.name = m.home_team
+                        JOIN dim_team a ON a.name = m.away_team
+                        LEFT JOIN dim_tournament t ON t.name = m.tournament
+                        LEFT JOIN dim_source s ON s.name = m.data_source
+                    ''')
+
+                    cursor.execute(f"DROP TABLE {table_name}")
+                    self._create_compact_view(cursor, table_name, sport)
+                    cursor.execute("UPDATE table_metadata SET schema_version = ? WHERE table_name = ?",
+                                   (COMPACT_SCHEMA_VERSION, table_name))
+                    conn.commit()
+
+                    self._known_tables[table_name] = True
+                    migrated += 1
+                    logging.info(f"MIGRATE: [{index}/{len(tables)}] {table_name} converted to compact layout")
+
+                except Exception as e:
+                    conn.rollback()
+                    logging.error(f"Failed to convert {table_name} to compact layout: {e}")
 
-            # Get all sport tables (excluding metadata tables)
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE '%_%'")
-            tables = cursor.fetchall()
+        logging.info(f"SUCCESS: Converted {migrated} tables to compact layout")
+        return migrated
 
-            for (table_name,) in tables:
-                if not table_name.startswith('table_metadata') and not table_name.startswith('sqlite'):
-                    self.migrate_table_schema(table_name)
+    def optimize_database(self, full_vacuum: bool = False):
+        """Optimize database performance.
 
-    def optimize_database(self):
-        """Optimize database performance"""
+        Routine upkeep runs through storage.maintenance.MaintenanceScheduler. A full
+        VACUUM locks the database for its whole duration, so it is opt-in; it also
+        switches older files to auto_vacuum=INCREMENTAL.
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
-            # Run optimization commands
-            cursor.execute("VACUUM")
+            if full_vacuum:
+                cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                cursor.execute("VACUUM")
             cursor.execute("ANALYZE")
+            cursor.execute("PRAGMA optimize")
 
             logging.info("SUCCESS: Database optimized")
\ No newline at end of file
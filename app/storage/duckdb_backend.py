@@ -0,0 +1,342 @@
+"""
+Embedded columnar (DuckDB) storage backend for analytical reads
+A single local file, no server. Kept in sync from the SQLite collector database so
+heavy aggregation for predictions and exports does not compete with live writes
+"""
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import duckdb
+except ImportError:  # duckdb is only needed for the analytics backend
+    duckdb = None
+
+from .backend import StorageBackend, MATCH_COLUMNS
+
+# Rows per multi-row INSERT statement
+INSERT_BATCH_ROWS = 500
+
+HISTORY_COLUMNS = ('match_id', 'seq', 'ts', 'sport', 'score', 'status', 'period',
+                   'odds_home', 'odds_away', 'odds_draw')
+
+
+class DuckDBBackend(StorageBackend):
+    """All sports and days in one columnar 'matches' table keyed on (sport, match_date, match_id)"""
+
+    def __init__(self, db_path: str = 'sports_analytics.duckdb', chunk_size: int = 5000):
+        if duckdb is None:
+            raise ImportError("duckdb is required for the DuckDB storage backend")
+
+        self.db_path = db_path
+        self.chunk_size = chunk_size
+        self.conn = duckdb.connect(db_path)
+
+        # Last history snapshot per match: match_id -> (seq, snapshot tuple)
+        self._history_state = {}
+        self._write_lock = threading.Lock()
+
+        self._init_database()
+
+    @contextmanager
+    def get_connection(self):
+        """A cursor on the shared DuckDB connection (one per thread)"""
+        cursor = self.conn.cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _init_database(self):
+        with self.get_connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS matches (
+                    match_date DATE NOT NULL,
+                    match_id VARCHAR NOT NULL,
+                    timestamp TIMESTAMP,
+                    home_team VARCHAR,
+                    away_team VARCHAR,
+                    score VARCHAR,
+                    status VARCHAR,
+                    period INTEGER,
+                    tournament VARCHAR,
+                    sport VARCHAR NOT NULL,
+                    odds_home DOUBLE,
+                    odds_away DOUBLE,
+                    odds_draw DOUBLE,
+                    event_count INTEGER,
+                    start_time BIGINT,
+                    home_team_id BIGINT,
+                    away_team_id BIGINT,
+                    stoppage_time BOOLEAN,
+                    half_time BOOLEAN,
+                    data_source VARCHAR,
+                    PRIMARY KEY (sport, match_date, match_id)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS match_history (
+                    match_id VARCHAR NOT NULL,
+                    seq INTEGER NOT NULL,
+                    ts BIGINT NOT NULL,
+                    sport VARCHAR NOT NULL,
+                    score VARCHAR,
+                    status INTEGER,
+                    period INTEGER,
+                    odds_home INTEGER,
+                    odds_away INTEGER,
+                    odds_draw INTEGER,
+                    PRIMARY KEY (match_id, seq)
+                )
+            ''')
+            # How far each source database has been copied
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    source VARCHAR PRIMARY KEY,
+                    synced_at TIMESTAMP,
+                    history_ts BIGINT
+                )
+            ''')
+
+    # Write path
+
+    def insert_match_data(self, sport: str, matches: List[Dict], target_date: Optional[date] = None) -> int:
+        """Upsert a batch of matches for one day and append changed history rows"""
+        if not matches:
+            return 0
+
+        match_date = target_date or date.today()
+        snapshot_ts = int(time.time())
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(snapshot_ts))
+
+        rows = []
+        cleaned = []
+        for match in matches:
+            try:
+                match_data = self._clean_match_data(match)
+                row = self._row_values(sport, match_data, timestamp)
+                rows.append((match_date,) + tuple(row[column] for column in MATCH_COLUMNS))
+                cleaned.append(match_data)
+            except Exception as e:
+                logging.error(f"Failed to insert match {match.get('match_id', 'unknown')}: {e}")
+
+        with self._write_lock, self.get_connection() as conn:
+            conn.execute("BEGIN TRANSACTION")
+            try:
+                self._upsert_matches(conn, rows)
+                history_count = self._append_history(conn, sport, cleaned, snapshot_ts)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        logging.info(f"SUCCESS: Inserted {len(rows)} {sport} matches into analytics store "
+                     f"({history_count} history changes)")
+        return len(rows)
+
+    def _upsert_matches(self, conn, rows: List[tuple]):
+        """Multi-row upsert; a key may only appear once per statement, the last row wins"""
+        latest = {}
+        for row in rows:
+            latest[(row[MATCH_COLUMNS.index('sport') + 1], row[0], row[1])] = row
+        rows = list(latest.values())
+
+        columns = ('match_date',) + MATCH_COLUMNS
+        updates = [column for column in MATCH_COLUMNS if column not in ('match_id', 'sport')]
+        placeholders = f"({', '.join('?' for _ in columns)})"
+        for start in range(0, len(rows), INSERT_BATCH_ROWS):
+            batch = rows[start:start + INSERT_BATCH_ROWS]
+            conn.execute(f'''
+                INSERT INTO matches ({', '.join(columns)})
+                VALUES {', '.join(placeholders for _ in batch)}
+                ON CONFLICT (sport, match_date, match_id) DO UPDATE SET
+                {', '.join(f'{column} = excluded.{column}' for column in updates)}
+            ''', [value for row in batch for value in row])
+
+    def _append_history(self, conn, sport: str, matches: List[Dict], ts: int) -> int:
+        """Append history rows for matches whose tracked fields changed"""
+        unseen = [m['match_id'] for m in matches if m['match_id'] not in self._history_state]
+        if unseen:
+            # Resume from the latest stored row of matches this process has not seen yet
+            conn.execute(f'''
+                SELECT match_id, seq, score, status, period, odds_home, odds_away, odds_draw
+                FROM match_history
+                WHERE match_id IN ({', '.join('?' for _ in unseen)})
+                QUALIFY seq = max(seq) OVER (PARTITION BY match_id)
+            ''', unseen)
+            for row in conn.fetchall():
+                self._history_state[row[0]] = (row[1], tuple(row[2:]))
+
+        history = []
+        for match_data in matches:
+            match_id = match_data['match_id']
+            snapshot = self._history_snapshot(match_data)
+            last = self._history_state.get(match_id)
+            if last is not None and last[1] == snapshot:
+                continue
+            seq = last[0] + 1 if last is not None else 1
+            history.append((match_id, seq, ts, sport) + snapshot)
+            self._history_state[match_id] = (seq, snapshot)
+
+        self._insert_history(conn, history)
+        return len(history)
+
+    def _insert_history(self, conn, rows: List[tuple]):
+        placeholders = f"({', '.join('?' for _ in HISTORY_COLUMNS)})"
+        for start in range(0, len(rows), INSERT_BATCH_ROWS):
+            batch = rows[start:start + INSERT_BATCH_ROWS]
+            conn.execute(f'''
+                INSERT INTO match_history ({', '.join(HISTORY_COLUMNS)})
+                VALUES {', '.join(placeholders for _ in batch)}
+                ON CONFLICT DO NOTHING
+            ''', [value for row in batch for value in row])
+
+    def get_match_history(self, match_id: str) -> List[Dict]:
+        with self.get_connection() as conn:
+            conn.execute('''
+                SELECT seq, ts, sport, score, status, period, odds_home, odds_away, odds_draw
+                FROM match_history WHERE match_id = ? ORDER BY seq
+            ''', [str(match_id)])
+            rows = conn.fetchall()
+        return self._decode_history(match_id, rows)
+
+    def sync_from(self, source, full: bool = False) -> Dict:
+        """Copy daily tables and history changed since the last sync from a DatabaseManager"""
+        with self.get_connection() as conn:
+            conn.execute("SELECT synced_at, history_ts FROM sync_state WHERE source = ?", [source.db_path])
+            state = conn.fetchone()
+        synced_at, history_ts = (None, 0) if full or state is None else state
+
+        started = datetime.now()
+        with source.get_connection() as src:
+            cursor = src.cursor()
+            if synced_at is None:
+                cursor.execute("SELECT table_name, sport, date_created FROM table_metadata")
+            else:
+                cursor.execute('''
+                    SELECT table_name, sport, date_created FROM table_metadata WHERE last_updated >= ?
+                ''', (synced_at,))
+            tables = cursor.fetchall()
+
+        results = {'tables_synced': 0, 'rows_synced': 0, 'history_synced': 0}
+        with self._write_lock, self.get_connection() as conn:
+            for table_name, sport, table_date in tables:
+                day = date.fromisoformat(str(table_date))
+                for batch in source.iter_matches(sport, day, day, row_factory='tuple',
+                                                 batch_size=self.chunk_size):
+                    self._upsert_matches(conn, [(day,) + tuple(row) for row in batch])
+                    results['rows_synced'] += len(batch)
+                results['tables_synced'] += 1
+
+            with source.get_connection() as src:
+                cursor = src.cursor()
+                cursor.execute(f'''
+                    SELECT {', '.join(HISTORY_COLUMNS)} FROM match_history WHERE ts >= ? ORDER BY ts
+                ''', (history_ts or 0,))
+                while True:
+                    rows = cursor.fetchmany(self.chunk_size)
+                    if not rows:
+                        break
+                    self._insert_history(conn, rows)
+                    results['history_synced'] += len(rows)
+                    history_ts = max(history_ts or 0, rows[-1][2])
+
+            conn.execute('''
+                INSERT INTO sync_state (source, synced_at, history_ts) VALUES (?, ?, ?)
+                ON CONFLICT (source) DO UPDATE SET synced_at = excluded.synced_at, history_ts = excluded.history_ts
+            ''', [source.db_path, started, history_ts])
+
+            # History rows may have arrived from the source; reload snapshots lazily
+            self._history_state.clear()
+
+        logging.info(f"SYNC: {results['tables_synced']} tables, {results['rows_synced']} rows, "
+                     f"{results['history_synced']} history rows copied to {self.db_path}")
+        return results
+
+    # Reads
+
+    def iter_matches(self, sport: str, start_date: date, end_date: date,
+                     columns: Optional[List[str]] = None, where: Optional[str] = None,
+                     params: tuple = (), ordered: bool = False, batch_size: Optional[int] = None,
+                     row_factory: str = 'dict', chunk_size: int = 1000) -> Iterator:
+        """Same contract as DatabaseManager.iter_matches ('row' yields dicts)"""
+        columns = list(columns or MATCH_COLUMNS)
+        unknown = [column for column in columns if column not in MATCH_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown match columns: {unknown}")
+        if row_factory not in ('dict', 'tuple', 'row'):
+            raise ValueError(f"Unsupported row_factory: {row_factory}")
+
+        query = f'''
+            SELECT {', '.join(columns)} FROM matches
+            WHERE sport = ? AND match_date BETWEEN ? AND ?{f' AND ({where})' if where else ''}
+        '''
+        if ordered:
+            query += " ORDER BY match_date DESC, timestamp DESC"
+
+        with self.get_connection() as conn:
+            conn.execute(query, [sport, start_date, end_date] + list(params))
+
+            keys = tuple(columns)
+            while True:
+                rows = conn.fetchmany(batch_size or chunk_size)
+                if not rows:
+                    return
+                if row_factory != 'tuple':
+                    rows = [dict(zip(keys, row)) for row in rows]
+
+                if batch_size:
+                    yield rows
+                else:
+                    yield from rows
+
+    def get_matches_by_date(self, sport: str, target_date: date) -> List[Dict]:
+        return list(self.iter_matches(sport, target_date, target_date, ordered=True))
+
+    def get_database_stats(self) -> Dict:
+        """Same shape as DatabaseManager.get_database_stats; one 'table' per sport and day"""
+        stats = {
+            'total_tables': 0,
+            'total_records': 0,
+            'sports_covered': [],
+            'date_range': {'oldest': None, 'newest': None},
+            'per_sport': {}
+        }
+
+        with self.get_connection() as conn:
+            conn.execute('''
+                SELECT sport, COUNT(DISTINCT match_date), COUNT(*), MIN(match_date), MAX(match_date)
+                FROM matches GROUP BY sport ORDER BY sport
+            ''')
+            rows = conn.fetchall()
+
+        for sport, table_count, record_count, oldest, newest in rows:
+            oldest, newest = oldest.isoformat(), newest.isoformat()
+            stats['sports_covered'].append(sport)
+            stats['per_sport'][sport] = {'tables': table_count, 'records': record_count,
+                                         'oldest': oldest, 'newest': newest}
+            stats['total_tables'] += table_count
+            stats['total_records'] += record_count
+            range_ = stats['date_range']
+            range_['oldest'] = min(filter(None, (range_['oldest'], oldest)))
+            range_['newest'] = max(filter(None, (range_['newest'], newest)))
+
+        return stats
+
+    def cleanup_old_data(self, retention_days: int = 90, archiver=None):
+        """Delete rows and history older than the retention period"""
+        cutoff_date = date.today() - timedelta(days=retention_days)
+        cutoff_ts = int(datetime.combine(cutoff_date, datetime.min.time()).timestamp())
+
+        with self._write_lock, self.get_connection() as conn:
+            conn.execute("DELETE FROM matches WHERE match_date < ?", [cutoff_date])
+            conn.execute("DELETE FROM match_history WHERE ts < ?", [cutoff_ts])
+            self._history_state.clear()
+
+        logging.info(f"CLEANUP: Removed analytics rows older than {cutoff_date}")
@@ -0,0 +1,172 @@
+"""
+Typed match events derived from consecutive live-state snapshots
+(kickoff, score_change, period_change, odds_move, finished), delivered to
+in-process subscribers and an append-only JSON-lines event log
+"""
+import os
+import json
+import time
+import logging
+import threading
+from datetime import date
+from typing import Callable, Dict, Iterator, List, Optional
+
+from .live_state import LiveStateStore
+
+EVENT_TYPES = ('kickoff', 'score_change', 'period_change', 'odds_move', 'finished')
+
+ODDS_FIELDS = ('odds_home', 'odds_away', 'odds_draw')
+
+
+def _event(event_type: str, sport: str, match: Dict, ts: float, **data) -> Dict:
+    return {
+        'type': event_type,
+        'ts': ts,
+        'sport': sport,
+        'match_id': match['match_id'],
+        'home_team': match.get('home_team'),
+        'away_team': match.get('away_team'),
+        'data': data
+    }
+
+
+class EventDetector:
+    """Turns a LiveStateStore.apply() delta into typed events"""
+
+    def __init__(self, odds_move_threshold: float = 0.05):
+        # Relative odds change (0.05 = 5%) that counts as an odds_move
+        self.odds_move_threshold = odds_move_threshold
+
+    def detect(self, sport: str, delta: Dict, live_state: LiveStateStore) -> List[Dict]:
+        ts = time.time()
+        events = []
+
+        for match_id, previous in delta['previous'].items():
+            match = live_state.get(match_id)
+            if match is None:
+                continue
+
+            if previous.get('status') == 'pregame' and match['status'] == 'live':
+                events.append(_event('kickoff', sport, match, ts))
+            if 'score' in previous:
+                events.append(_event('score_change', sport, match, ts,
+                                     old=previous['score'], new=match['score']))
+            if 'period' in previous:
+                events.append(_event('period_change', sport, match, ts,
+                                     old=previous['period'], new=match['period']))
+
+            for field in ODDS_FIELDS:
+                if field not in previous:
+                    continue
+                old, new = previous[field], match[field]
+                move = self._odds_move(old, new)
+                if move is not None:
+                    events.append(_event('odds_move', sport, match, ts, side=field[len('odds_'):],
+                                         old=old, new=new, delta=round(float(new) - float(old), 4), relative=move))
+
+        for match in delta['finished']:
+            events.append(_event('finished', sport, match, ts, score=match.get('score')))
+
+        return events
+
+    def _odds_move(self, old, new) -> Optional[float]:
+        """Relative change when it reaches the threshold, else None"""
+        try:
+            old, new = float(old), float(new)
+        except (TypeError, ValueError):
+            return None
+        if old <= 0:
+            return None
+        relative = (new - old) / old
+        return round(relative, 4) if abs(relative) >= self.odds_move_threshold else None
+
+
+class EventLog:
+    """Append-only JSON-lines log, one file per day: <log_dir>/events_YYYY-MM-DD.jsonl"""
+
+    def __init__(self, log_dir: str = 'events'):
+        self.log_dir = log_dir
+        self._lock = threading.Lock()
+        os.makedirs(log_dir, exist_ok=True)
+
+    def path_for(self, day: date) -> str:
+        return os.path.join(self.log_dir, f"events_{day.isoformat()}.jsonl")
+
+    def append(self, events: List[Dict]):
+        if not events:
+            return
+        lines = ''.join(json.dumps(event, default=str) + '\n' for event in events)
+        with self._lock:
+            with open(self.path_for(date.today()), 'a', encoding='utf-8') as f:
+                f.write(lines)
+
+    def read(self, day: Optional[date] = None, since: Optional[float] = None) -> Iterator[Dict]:
+        """Replay one day's events, optionally only those after a time.time() timestamp"""
+        path = self.path_for(day or date.today())
+        if not os.path.exists(path):
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                if since is None or event['ts'] > since:
+                    yield event
+
+
+class EventStream:
+    """Publishes events to the event log, then to subscribers filtered by type and sport"""
+
+    def __init__(self, log: Optional[EventLog] = None):
+        self.log = log
+        self._subscribers = {}
+        self._next_token = 0
+        self._lock = threading.Lock()
+        self.published = {event_type: 0 for event_type in EVENT_TYPES}
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'EventStream':
+        """Build a stream from the 'events' section of config.yaml"""
+        events_config = config.get('events', {})
+        log_dir = events_config.get('log_dir')
+        return cls(EventLog(log_dir) if log_dir else None)
+
+    def subscribe(self, callback: Callable[[Dict], None], types: Optional[List[str]] = None,
+                  sport: Optional[str] = None) -> int:
+        """Register callback(event); returns a token for unsubscribe()"""
+        with self._lock:
+            self._next_token += 1
+            self._subscribers[self._next_token] = (callback, set(types) if types else None, sport)
+            return self._next_token
+
+    def unsubscribe(self, token: int):
+        with self._lock:
+            self._subscribers.pop(token, None)
+
+    def publish(self, events: List[Dict]):
+        if not events:
+            return
+
+        if self.log is not None:
+            try:
+                self.log.append(events)
+            except OSError as e:
+                logging.error(f"Failed to write event log: {e}")
+
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+            for event in events:
+                self.published[event['type']] = self.published.get(event['type'], 0) + 1
+
+        for event in events:
+            for callback, types, sport in subscribers:
+                if (types is None or event['type'] in types) and (sport is None or event['sport'] == sport):
+                    try:
+                        callback(event)
+                    except Exception as e:
+                        # A failing subscriber must not stop the collector or other subscribers
+                        logging.error(f"Event subscriber failed on {event['type']}: {e}")
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {'subscribers': len(self._subscribers), 'published': dict(self.published)}
@@ -0,0 +1,205 @@
+"""
+Incremental export of finished daily tables to partitioned columnar files
+Analysts read the exports instead of querying the live SQLite file
+"""
+import os
+import csv
+import gzip
+import json
+import logging
+from datetime import datetime, date
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is only needed for the parquet format
+    pa = None
+    pq = None
+
+from .database import DatabaseManager
+
+# Arrow types for the daily table columns; anything else is exported as a string
+COLUMN_TYPES = {
+    'id': 'int64',
+    'period': 'int64',
+    'odds_home': 'double',
+    'odds_away': 'double',
+    'odds_draw': 'double',
+    'event_count': 'int64',
+    'start_time': 'int64',
+    'home_team_id': 'int64',
+    'away_team_id': 'int64',
+    'stoppage_time': 'int64',
+    'half_time': 'int64',
+    'row_hash': 'int64'
+}
+
+FILE_EXTENSIONS = {'parquet': '.parquet', 'csv': '.csv', 'json': '.jsonl'}
+
+
+class DataExporter:
+    """Exports each finished daily table once per format, partitioned by sport and date"""
+
+    def __init__(self, db_manager: DatabaseManager, export_dir: str = 'exports',
+                 formats: Optional[List[str]] = None, compression: str = 'gzip',
+                 chunk_size: int = 5000):
+        self.db = db_manager
+        self.export_dir = export_dir
+        self.formats = [fmt for fmt in (formats or ['parquet']) if self._format_available(fmt)]
+        self.compression = compression
+        self.chunk_size = chunk_size
+        self._init_watermark()
+
+    @classmethod
+    def from_config(cls, db_manager: DatabaseManager, config: Dict) -> 'DataExporter':
+        """Build an exporter from the 'export' section of config.yaml"""
+        export_config = config.get('export', {})
+        return cls(
+            db_manager,
+            export_dir=export_config.get('directory', 'exports'),
+            formats=export_config.get('formats'),
+            compression=export_config.get('compression', 'gzip'),
+            chunk_size=export_config.get('chunk_size', 5000)
+        )
+
+    def _format_available(self, fmt: str) -> bool:
+        if fmt not in FILE_EXTENSIONS:
+            logging.warning(f"WARNING: Unsupported export format '{fmt}' ignored")
+            return False
+        if fmt == 'parquet' and pa is None:
+            logging.warning("WARNING: pyarrow not installed, parquet export disabled")
+            return False
+        return True
+
+    def _init_watermark(self):
+        """Create the table recording which partitions were exported"""
+        with self.db.get_connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS export_watermark (
+                    table_name TEXT NOT NULL,
+                    format TEXT NOT NULL,
+                    sport TEXT,
+                    table_date DATE,
+                    exported_at DATETIME,
+                    row_count INTEGER,
+                    path TEXT,
+                    PRIMARY KEY (table_name, format)
+                )
+            ''')
+            conn.commit()
+
+    def pending_tables(self, fmt: str, before: Optional[date] = None) -> List[Tuple[str, str, str]]:
+        """Finished daily tables (older than `before`, default today) not yet exported in fmt"""
+        before = before or date.today()
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT m.table_name, m.sport, m.date_created
+                FROM table_metadata m
+                LEFT JOIN export_watermark w ON w.table_name = m.table_name AND w.format = ?
+                WHERE w.table_name IS NULL AND m.date_created < ?
+                ORDER BY m.date_created
+            ''', (fmt, before.isoformat()))
+            return cursor.fetchall()
+
+    def export_pending(self, before: Optional[date] = None) -> Dict:
+        """Export every finished partition that is newer than the watermark"""
+        results = {'tables_exported': 0, 'rows_exported': 0, 'errors': []}
+
+        for fmt in self.formats:
+            for table_name, sport, table_date in self.pending_tables(fmt, before):
+                try:
+                    rows, path = self.export_table(table_name, sport, table_date, fmt)
+                    results['tables_exported'] += 1
+                    results['rows_exported'] += rows
+                    logging.info(f"EXPORT: {table_name} -> {path} ({rows} rows)")
+                except Exception as e:
+                    error_msg = f"Failed to export {table_name} as {fmt}: {e}"
+                    logging.error(error_msg)
+                    results['errors'].append(error_msg)
+
+        return results
+
+    def partition_path(self, sport: str, table_date: str, table_name: str, fmt: str) -> str:
+        """Hive-style partition path: <dir>/<fmt>/sport=<sport>/date=<date>/<table>.<ext>"""
+        extension = FILE_EXTENSIONS[fmt]
+        if fmt != 'parquet' and self.compression == 'gzip':
+            extension += '.gz'
+        return os.path.join(self.export_dir, fmt, f"sport={sport}", f"date={table_date}",
+                            f"{table_name}{extension}")
+
+    def export_table(self, table_name: str, sport: str, table_date: str, fmt: str) -> Tuple[int, str]:
+        """Stream one daily table into a partition file and advance the watermark"""
+        row_count, path = self.write_partition(table_name, sport, table_date, fmt)
+
+        with self.db.get_connection() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO export_watermark
+                (table_name, format, sport, table_date, exported_at, row_count, path)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (table_name, fmt, sport, table_date, datetime.now(), row_count, path))
+            conn.commit()
+
+        return row_count, path
+
+    def write_partition(self, table_name: str, sport: str, table_date: str, fmt: str) -> Tuple[int, str]:
+        """Stream one daily table into its partition file"""
+        path = self.partition_path(sport, table_date, table_name, fmt)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+
+        writer = {'parquet': self._write_parquet, 'csv': self._write_csv, 'json': self._write_json}[fmt]
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT * FROM {table_name}")
+            columns = [desc[0] for desc in cursor.description]
+            row_count = writer(tmp_path, columns, self._chunks(cursor))
+
+        # Only publish complete files
+        os.replace(tmp_path, path)
+        return row_count, path
+
+    def _chunks(self, cursor) -> Iterator[List[tuple]]:
+        """Yield fetchmany() batches so memory stays bounded by chunk_size"""
+        while True:
+            rows = cursor.fetchmany(self.chunk_size)
+            if not rows:
+                return
+            yield rows
+
+    def _open_text(self, path: str):
+        if self.compression == 'gzip':
+            return gzip.open(path, 'wt', encoding='utf-8', newline='')
+        return open(path, 'w', encoding='utf-8', newline='')
+
+    def _write_parquet(self, path: str, columns: List[str], chunks: Iterator[List[tuple]]) -> int:
+        schema = pa.schema([(column, pa.type_for_alias(COLUMN_TYPES.get(column, 'string')))
+                            for column in columns])
+        row_count = 0
+        with pq.ParquetWriter(path, schema, compression=self.compression or 'none') as writer:
+            for rows in chunks:
+                arrays = [pa.array([row[i] for row in rows], type=schema.field(i).type)
+                          for i in range(len(columns))]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                row_count += len(rows)
+        return row_count
+
+    def _write_csv(self, path: str, columns: List[str], chunks: Iterator[List[tuple]]) -> int:
+        row_count = 0
+        with self._open_text(path) as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for rows in chunks:
+                writer.writerows(rows)
+                row_count += len(rows)
+        return row_count
+
+    def _write_json(self, path: str, columns: List[str], chunks: Iterator[List[tuple]]) -> int:
+        row_count = 0
+        with self._open_text(path) as f:
+            for rows in chunks:
+                for row in rows:
+                    f.write(json.dumps(dict(zip(columns, row))) + '\n')
+                row_count += len(rows)
+        return row_count
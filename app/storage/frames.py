@@ -0,0 +1,85 @@
+"""
+Columnar (pandas / NumPy) views of match rows for analytics reads
+"""
+from typing import Dict, Iterable, List
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:  # only the analytics readers need numpy/pandas
+    np = None
+    pd = None
+
+# Match scores are stored as "home:away"
+SCORE_PATTERN = r'^\s*(\d+)\s*:\s*(\d+)\s*$'
+
+FLOAT_COLUMNS = ('odds_home', 'odds_away', 'odds_draw')
+INTEGER_COLUMNS = ('period', 'event_count', 'start_time', 'home_team_id', 'away_team_id')
+CATEGORY_COLUMNS = ('status', 'tournament', 'sport', 'data_source')
+
+
+def _require_pandas():
+    if pd is None:
+        raise ImportError("pandas and numpy are required for columnar match reads")
+
+
+def frame_from_batches(batches: Iterable[List[tuple]], columns: List[str]) -> 'pd.DataFrame':
+    """Build a typed DataFrame from tuple batches (iter_matches(..., row_factory='tuple', batch_size=n)).
+
+    Scores become nullable integer home_score/away_score columns, and
+    home_team/away_team share one categorical dictionary so their codes
+    can be compared and grouped directly.
+    """
+    _require_pandas()
+
+    frames = [pd.DataFrame.from_records(batch, columns=columns) for batch in batches]
+    frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+    for column in FLOAT_COLUMNS:
+        if column in frame:
+            frame[column] = pd.to_numeric(frame[column], errors='coerce').astype('float64')
+    for column in INTEGER_COLUMNS:
+        if column in frame:
+            frame[column] = pd.to_numeric(frame[column], errors='coerce').astype('Int64')
+    for column in CATEGORY_COLUMNS:
+        if column in frame:
+            frame[column] = frame[column].astype('category')
+    if 'timestamp' in frame:
+        frame['timestamp'] = pd.to_datetime(frame['timestamp'], errors='coerce')
+
+    if 'score' in frame:
+        goals = frame['score'].astype('string').str.extract(SCORE_PATTERN)
+        frame['home_score'] = pd.to_numeric(goals[0], errors='coerce').astype('Int64')
+        frame['away_score'] = pd.to_numeric(goals[1], errors='coerce').astype('Int64')
+
+    team_columns = [column for column in ('home_team', 'away_team') if column in frame]
+    if team_columns:
+        teams = pd.unique(pd.concat([frame[column] for column in team_columns], ignore_index=True).dropna())
+        for column in team_columns:
+            frame[column] = pd.Categorical(frame[column], categories=teams)
+
+    return frame
+
+
+def arrays_from_frame(frame: 'pd.DataFrame') -> Dict[str, 'np.ndarray']:
+    """Plain NumPy arrays for a match frame.
+
+    Categorical team columns become integer codes ('home_code'/'away_code',
+    -1 for missing) plus a 'teams' lookup array; nullable integers become
+    float arrays with NaN for missing values.
+    """
+    _require_pandas()
+
+    arrays = {}
+    for column in frame.columns:
+        series = frame[column]
+        if column in ('home_team', 'away_team'):
+            arrays[f"{column.split('_')[0]}_code"] = series.cat.codes.to_numpy(dtype=np.int32)
+            arrays['teams'] = np.asarray(series.cat.categories, dtype=object)
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            arrays[column] = series.astype(object).to_numpy()
+        elif isinstance(series.dtype, pd.Int64Dtype):
+            arrays[column] = series.astype('float64').to_numpy()
+        else:
+            arrays[column] = series.to_numpy()
+    return arrays
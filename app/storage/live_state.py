@@ -0,0 +1,174 @@
+"""
+Process-local live state: the current record of every pregame/live match
+Updated in place from each provider poll with per-field change flags, so
+downstream stages (storage, predictions, feeds) only handle what changed
+"""
+import time
+import threading
+from datetime import date
+from typing import Dict, List, Optional
+
+from .database import HASHED_FIELDS
+
+# Fields that can change during a match (the row-hash fields); each has a bit in LiveMatch.changed
+TRACKED_FIELDS = HASHED_FIELDS
+FIELD_BITS = {field: 1 << index for index, field in enumerate(TRACKED_FIELDS)}
+
+# Provider statuses that mean a match is over; its score is then the final result
+FINAL_STATUSES = ('finished',)
+
+# Descriptive fields, refreshed on every update but not change-tracked
+STATIC_FIELDS = ('sport', 'home_team', 'away_team', 'tournament', 'start_time',
+                 'data_source', 'home_team_id', 'away_team_id')
+
+
+class LiveMatch:
+    """Compact current-state record for one match"""
+
+    __slots__ = ('match_id',) + STATIC_FIELDS + TRACKED_FIELDS + (
+        'first_seen', 'last_seen', 'last_changed', 'misses', 'changed', 'day')
+
+    def __init__(self, match_id: str):
+        self.match_id = match_id
+        for field in STATIC_FIELDS + TRACKED_FIELDS:
+            setattr(self, field, None)
+        self.first_seen = self.last_seen = self.last_changed = time.time()
+        self.misses = 0  # consecutive polls of its sport the match was missing from
+        self.changed = 0  # FIELD_BITS of the fields changed by the last update
+        self.day = None  # date of the daily table the match was last passed on to
+
+    @property
+    def changed_fields(self) -> List[str]:
+        return [field for field in TRACKED_FIELDS if self.changed & FIELD_BITS[field]]
+
+    def to_dict(self) -> Dict:
+        record = {field: getattr(self, field) for field in ('match_id',) + STATIC_FIELDS + TRACKED_FIELDS}
+        record['last_changed'] = self.last_changed
+        return record
+
+
+def _normalize(match: Dict) -> Dict:
+    """Provider record -> the value types the store compares (mirrors the database cleaning)"""
+    status = match.get('status', 'pregame')
+    return {
+        'score': match.get('score', ''),
+        'status': status if status in ('pregame', 'live') + FINAL_STATUSES else 'pregame',
+        'period': int(match.get('period', 1) or 1),
+        'odds_home': match.get('odds_home'),
+        'odds_away': match.get('odds_away'),
+        'odds_draw': match.get('odds_draw'),
+        'event_count': int(match.get('event_count', 0) or 0),
+        'stoppage_time': bool(match.get('stoppage_time', False)),
+        'half_time': bool(match.get('half_time', False))
+    }
+
+
+class LiveStateStore:
+    """match_id -> LiveMatch for the matches currently offered by the providers.
+
+    apply() folds one sport's poll into the store and returns the delta:
+    new matches, changed matches (with their changed fields and previous
+    values), 'finished' matches (those a provider reported with a final
+    status, once each), the ids 'evicted' after missing from miss_limit
+    consecutive polls, and 'upserts', the provider records the storage
+    layer needs to write. Eviction says nothing about a match's result:
+    callers should only apply successful, non-empty polls.
+    """
+
+    def __init__(self, miss_limit: int = 3):
+        self.miss_limit = miss_limit
+        self._matches: Dict[str, LiveMatch] = {}
+        self._lock = threading.RLock()
+
+    def apply(self, sport: str, matches: List[Dict]) -> Dict:
+        """Update the store from one poll of a sport"""
+        now = time.time()
+        today = date.today()
+        delta = {'new': [], 'changed': {}, 'previous': {}, 'finished': [], 'evicted': [], 'upserts': []}
+        seen = set()
+
+        with self._lock:
+            for match in matches:
+                match_id = str(match.get('match_id', ''))
+                if not match_id:
+                    continue
+                seen.add(match_id)
+
+                record = self._matches.get(match_id)
+                is_new = record is None
+                if is_new:
+                    record = self._matches[match_id] = LiveMatch(match_id)
+
+                values = _normalize(match)
+                changed = 0
+                previous = {}
+                for field in TRACKED_FIELDS:
+                    value = values[field]
+                    if getattr(record, field) != value:
+                        previous[field] = getattr(record, field)
+                        setattr(record, field, value)
+                        changed |= FIELD_BITS[field]
+                for field in STATIC_FIELDS:
+                    value = match.get(field)
+                    if value is not None:
+                        setattr(record, field, value)
+                record.sport = sport
+
+                record.misses = 0
+                record.last_seen = now
+                record.changed = 0 if is_new else changed
+
+                if is_new:
+                    delta['new'].append(match_id)
+                elif changed:
+                    delta['changed'][match_id] = record.changed_fields
+                    delta['previous'][match_id] = previous
+                if is_new or changed:
+                    record.last_changed = now
+                if record.status in FINAL_STATUSES and (is_new or changed & FIELD_BITS['status']):
+                    delta['finished'].append(record.to_dict())
+                # Unchanged matches are still passed on once per day for the new daily table
+                if is_new or changed or record.day != today:
+                    record.day = today
+                    delta['upserts'].append(match)
+
+            # Matches of this sport missing from the poll; evicted once they stay gone
+            for match_id, record in list(self._matches.items()):
+                if record.sport != sport or match_id in seen:
+                    continue
+                record.misses += 1
+                if record.misses >= self.miss_limit:
+                    delta['evicted'].append(match_id)
+                    del self._matches[match_id]
+
+        return delta
+
+    def get(self, match_id: str) -> Optional[Dict]:
+        with self._lock:
+            record = self._matches.get(str(match_id))
+            return record.to_dict() if record else None
+
+    def get_matches(self, sport: Optional[str] = None, status: Optional[str] = None) -> List[Dict]:
+        """Current matches, optionally filtered by sport and status"""
+        with self._lock:
+            return [record.to_dict() for record in self._matches.values()
+                    if (sport is None or record.sport == sport)
+                    and (status is None or record.status == status)]
+
+    def changed_since(self, timestamp: float, sport: Optional[str] = None) -> List[Dict]:
+        """Matches created or changed after a time.time() timestamp"""
+        with self._lock:
+            return [record.to_dict() for record in self._matches.values()
+                    if record.last_changed > timestamp and (sport is None or record.sport == sport)]
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            per_sport = {}
+            live = 0
+            for record in self._matches.values():
+                per_sport[record.sport] = per_sport.get(record.sport, 0) + 1
+                live += record.status == 'live'
+            return {'matches': len(self._matches), 'live': live, 'per_sport': per_sport}
+
+    def __len__(self) -> int:
+        return len(self._matches)
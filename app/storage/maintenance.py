@@ -0,0 +1,233 @@
+"""
+Background database maintenance run in the idle window between collection cycles
+Replaces the blocking full VACUUM with short, budgeted jobs (PRAGMA optimize,
+targeted ANALYZE, incremental vacuum, WAL checkpoint, retention and export)
+"""
+import time
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from .database import DatabaseManager, COMPACT_SUFFIX
+
+# Pages released per PRAGMA incremental_vacuum step (the budget is checked between steps)
+VACUUM_STEP_PAGES = 256
+
+# Rows sampled per index by ANALYZE / PRAGMA optimize, keeps each run short
+ANALYSIS_LIMIT = 1000
+
+
+class MaintenanceJob:
+    """A periodic maintenance task; func(deadline) returns a dict of job metrics"""
+
+    def __init__(self, name: str, func: Callable[[float], Dict], interval_seconds: float,
+                 budget_seconds: float):
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self.budget_seconds = budget_seconds
+        self.last_run = None  # time.monotonic() of the last completed run
+
+        self.metrics = {
+            'runs': 0,
+            'errors': 0,
+            'last_run': None,
+            'last_duration': 0.0,
+            'total_duration': 0.0,
+            'last_result': None,
+            'last_error': None
+        }
+
+    def is_due(self, now: float) -> bool:
+        return self.last_run is None or now - self.last_run >= self.interval_seconds
+
+
+class MaintenanceScheduler:
+    """Runs due maintenance jobs within a time window, each within its own budget.
+
+    Jobs that can stop part-way (ANALYZE, incremental vacuum) check their
+    deadline between steps; retention and export process what is due and
+    return. Jobs that do not fit the remaining window wait for the next one.
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db = db_manager
+        self.jobs: List[MaintenanceJob] = []
+        self._analyzed_at = None
+        self._analyze_pending: List[str] = []  # tables an interrupted ANALYZE pass did not reach
+
+    @classmethod
+    def from_config(cls, db_manager: DatabaseManager, config: Dict, archive=None,
+                    exporter=None, analytics=None, entities=None) -> 'MaintenanceScheduler':
+        """Build the standard job set from the 'database' and 'export' sections of config.yaml"""
+        db_config = config.get('database', {})
+        export_config = config.get('export', {})
+        budget = db_config.get('maintenance_budget_seconds', 10)
+        optimize_interval = db_config.get('optimize_interval_hours', 24) * 3600
+
+        scheduler = cls(db_manager)
+        retention_days = db_config.get('retention_days', 90)
+
+        def retention(deadline: float) -> Dict:
+            # Archive before dropping when a cold tier is configured
+            if archive is not None:
+                archive.run_retention(retention_days)
+            else:
+                db_manager.cleanup_old_data(retention_days)
+            if entities is not None:
+                entities.prune(retention_days)
+            return {'retention_days': retention_days}
+
+        scheduler.add_job('retention', retention,
+                          db_config.get('retention_interval_hours', 24) * 3600, budget)
+
+        if exporter is not None and export_config.get('auto_export'):
+            scheduler.add_job('export', lambda deadline: exporter.export_pending(),
+                              export_config.get('export_interval_hours', 24) * 3600, budget)
+
+        if analytics is not None:
+            # Every window, so predictions see the latest cycle
+            scheduler.add_job('analytics_sync', lambda deadline: analytics.sync_from(db_manager), 0, budget)
+
+        # Registered after retention so dropped tables are reclaimed in the same window
+        scheduler.add_job('wal_checkpoint', scheduler.wal_checkpoint, 0, budget)
+        scheduler.add_job('optimize', scheduler.pragma_optimize, optimize_interval, budget)
+        scheduler.add_job('analyze', scheduler.analyze_changed, optimize_interval, budget)
+        scheduler.add_job('incremental_vacuum', scheduler.incremental_vacuum, optimize_interval, budget)
+
+        return scheduler
+
+    def add_job(self, name: str, func: Callable[[float], Dict], interval_seconds: float,
+                budget_seconds: float = 10) -> MaintenanceJob:
+        job = MaintenanceJob(name, func, interval_seconds, budget_seconds)
+        self.jobs.append(job)
+        return job
+
+    def run_pending(self, window_seconds: float) -> Dict:
+        """Run due jobs (least recently run first) until the window is used up"""
+        started = time.monotonic()
+        window_end = started + window_seconds
+        summary = {'ran': [], 'deferred': [], 'errors': []}
+
+        due = [job for job in self.jobs if job.is_due(started)]
+        due.sort(key=lambda job: job.last_run if job.last_run is not None else float('-inf'))
+
+        for job in due:
+            remaining = window_end - time.monotonic()
+            if remaining <= 0:
+                summary['deferred'].append(job.name)
+                continue
+
+            job_start = time.monotonic()
+            deadline = job_start + min(job.budget_seconds, remaining)
+            try:
+                job.metrics['last_result'] = job.func(deadline)
+                summary['ran'].append(job.name)
+            except Exception as e:
+                job.metrics['errors'] += 1
+                job.metrics['last_error'] = str(e)
+                summary['errors'].append(f"{job.name}: {e}")
+                logging.error(f"MAINTENANCE: {job.name} failed: {e}")
+
+            duration = time.monotonic() - job_start
+            job.last_run = time.monotonic()
+            job.metrics['runs'] += 1
+            job.metrics['last_run'] = datetime.now().isoformat()
+            job.metrics['last_duration'] = round(duration, 3)
+            job.metrics['total_duration'] = round(job.metrics['total_duration'] + duration, 3)
+            if duration > job.budget_seconds:
+                logging.warning(f"MAINTENANCE: {job.name} overran its budget ({duration:.1f}s)")
+
+        if summary['ran']:
+            logging.info(f"MAINTENANCE: ran {', '.join(summary['ran'])} in {time.monotonic() - started:.2f}s"
+                         + (f", deferred {', '.join(summary['deferred'])}" if summary['deferred'] else ''))
+        return summary
+
+    def get_metrics(self) -> Dict:
+        """Per-job run counts, durations and last results"""
+        return {job.name: dict(job.metrics) for job in self.jobs}
+
+    # Jobs
+
+    def pragma_optimize(self, deadline: float) -> Dict:
+        """PRAGMA optimize with a bounded analysis sample"""
+        with self.db.get_connection() as conn:
+            conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+            conn.execute("PRAGMA optimize")
+        return {}
+
+    def analyze_changed(self, deadline: float) -> Dict:
+        """ANALYZE only the daily tables written since the previous run.
+
+        A pass cut short by the deadline keeps the tables it did not reach and
+        resumes with them, so large databases finish over several windows.
+        """
+        since = self._analyzed_at
+        started = datetime.now()
+
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            if since is None:
+                cursor.execute("SELECT table_name FROM table_metadata")
+            else:
+                cursor.execute("SELECT table_name FROM table_metadata WHERE last_updated >= ?", (since,))
+            tables = list(dict.fromkeys(self._analyze_pending + [row[0] for row in cursor.fetchall()]
+                                        + ['match_history']))
+
+            cursor.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+            analyzed = 0
+            done = 0
+            for table_name in tables:
+                if time.monotonic() >= deadline:
+                    break
+                done += 1
+                # Compact tables are views over '<table>_v3'; analyze the storage table
+                kind = self.db.table_kind(cursor, table_name)
+                if kind == 'view':
+                    table_name += COMPACT_SUFFIX
+                elif kind is None:
+                    continue
+                cursor.execute(f"ANALYZE {table_name}")
+                analyzed += 1
+            conn.commit()
+
+        # Tables changed from now on are found through last_updated; the rest of this pass is kept
+        self._analyzed_at = started
+        self._analyze_pending = tables[done:]
+        return {'tables_analyzed': analyzed, 'complete': not self._analyze_pending,
+                'tables_pending': len(self._analyze_pending)}
+
+    def incremental_vacuum(self, deadline: float) -> Dict:
+        """Release free pages in small steps until none are left or the budget runs out"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("PRAGMA auto_vacuum")
+            if cursor.fetchone()[0] != 2:
+                # Databases created before auto_vacuum=INCREMENTAL need one
+                # optimize_database(full_vacuum=True) to switch modes
+                return {'pages_freed': 0, 'auto_vacuum': False}
+
+            freed = 0
+            while time.monotonic() < deadline:
+                cursor.execute("PRAGMA freelist_count")
+                free_pages = cursor.fetchone()[0]
+                if not free_pages:
+                    break
+                step = min(free_pages, VACUUM_STEP_PAGES)
+                cursor.execute(f"PRAGMA incremental_vacuum({step})")
+                cursor.fetchall()
+                freed += step
+            conn.commit()
+
+        return {'pages_freed': freed, 'auto_vacuum': True}
+
+    def wal_checkpoint(self, deadline: float) -> Dict:
+        """Passive WAL checkpoint (never waits on readers or writers); no-op outside WAL mode"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("PRAGMA journal_mode")
+            if cursor.fetchone()[0] != 'wal':
+                return {'wal': False}
+            cursor.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            busy, log_pages, checkpointed = cursor.fetchone()
+        return {'wal': True, 'busy': busy, 'log_pages': log_pages, 'checkpointed': checkpointed}
@@ -0,0 +1,8 @@
+"""
+Shared match rows for the root-level tests
+"""
+
+
+def make_match(match_id, home, away, score, status='finished'):
+    """Minimal match record as the collectors store it"""
+    return {'match_id': match_id, 'home_team': home, 'away_team': away, 'score': score, 'status': status}
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test the bounded TTL/LRU analysis cache and the predictor's use of it
+"""
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from storage.database import DatabaseManager
+from analysis.cache import TTLCache
+from analysis.predictor import MatchPredictor
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_lru_and_tags():
+    """Entries expire by age (also past a day), the LRU entry is evicted and tags invalidate"""
+    clock = _Clock()
+    cache = TTLCache(max_entries=2, ttl_seconds=3600, clock=clock)
+    cache.set('a', 1, tags=['arsenal'])
+    cache.set('b', 2, tags=['chelsea'])
+    assert cache.get('a') == 1          # 'a' is now the most recently used
+    cache.set('c', 3, tags=['arsenal', 'chelsea'])
+    assert 'b' not in cache and len(cache) == 2
+
+    assert cache.invalidate('arsenal') == 2
+    assert cache.get('a') is None and cache.get('c') is None
+
+    cache.set('d', 4)
+    clock.now = 25 * 3600               # timedelta.seconds would wrap to one hour here
+    assert cache.get('d') is None
+
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['expirations'], stats['invalidations']) == (1, 3, 1, 1, 2)
+
+
+def test_predictor_caches_until_results_arrive():
+    """Repeat predictions come from the cache; a stored result drops only its teams' entries"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'cache.db'))
+        db.insert_match_data('soccer', [{'match_id': 'a', 'home_team': 'Arsenal', 'away_team': 'Chelsea', 'score': '2:0'}])
+        predictor = MatchPredictor(db, cache_config={'prediction_entries': 8})
+
+        first = predictor.predict_match_outcome('Arsenal', 'Chelsea', 'soccer')
+        predictor.predict_many([{'match_id': 'u1', 'home_team': 'Spurs', 'away_team': 'Everton'}], 'soccer')
+        assert predictor.predict_match_outcome('Arsenal', 'Chelsea', 'soccer') == first
+        batch = predictor.predict_many([{'match_id': 'u2', 'home_team': 'arsenal', 'away_team': 'chelsea'}], 'soccer')
+        assert batch[0]['match_id'] == 'u2' and batch[0]['prediction'] == first['prediction']
+        assert predictor.prediction_cache.get_stats()['hits'] == 2
+
+        assert predictor.get_team_statistics('Chelsea', 'soccer')['losses'] == 1
+        # 'Chelsea FC' normalizes to the same team as 'Chelsea'
+        result = {'match_id': 'b', 'home_team': 'Chelsea FC', 'away_team': 'Fulham', 'score': '3:0'}
+        db.insert_match_data('soccer', [result])
+        assert predictor.invalidate_results('soccer', [result]) >= 1
+        assert ('soccer', 'arsenal', 'chelsea') not in predictor.prediction_cache
+        assert ('soccer', 'spurs', 'everton') in predictor.prediction_cache
+        assert ('soccer', 'chelsea', 30) not in predictor.team_stats_cache
+
+
+def test_cached_predictions_are_copies():
+    """Changing a returned prediction's nested factors leaves later cache hits intact"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'cache.db'))
+        db.insert_match_data('soccer', [{'match_id': 'a', 'home_team': 'Arsenal', 'away_team': 'Chelsea', 'score': '2:0'}])
+        predictor = MatchPredictor(db)
+
+        first = predictor.predict_match_outcome('Arsenal', 'Chelsea', 'soccer')
+        expected = dict(first['factors'])
+        first['factors']['home_form'] = -1
+        hit = predictor.predict_match_outcome('Arsenal', 'Chelsea', 'soccer')
+        assert hit['factors'] == expected
+        hit['factors'].clear()
+
+        batch = predictor.predict_many([{'match_id': 'u1', 'home_team': 'Arsenal', 'away_team': 'Chelsea'},
+                                        {'match_id': 'u2', 'home_team': 'Arsenal', 'away_team': 'Chelsea'}], 'soccer')
+        assert batch[0]['factors'] == expected and batch[0]['factors'] is not batch[1]['factors']
+        assert 'match_id' not in predictor.predict_match_outcome('Arsenal', 'Chelsea', 'soccer')
+
+
+if __name__ == "__main__":
+    test_ttl_lru_and_tags()
+    test_predictor_caches_until_results_arrive()
+    test_cached_predictions_are_copies()
+    print("SUCCESS: Analysis cache bounds, expiry and invalidation work!")
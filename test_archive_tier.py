@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Test cold-tier archival of aged daily tables
+"""
+import sys
+import os
+import tempfile
+from datetime import date, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from storage.database import DatabaseManager
+from storage.archive import ArchiveManager, TieredMatchReader
+
+
+def test_aged_tables_are_archived_then_readable():
+    """Retention must archive old tables before dropping them, and reads must still find them"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'archive.db'))
+        archive = ArchiveManager(db, archive_dir=os.path.join(tmp, 'archive'))
+        reader = TieredMatchReader(db, archive)
+
+        old_day = date.today() - timedelta(days=100)
+        db.insert_match_data('soccer', [
+            {'match_id': 'old_1', 'home_team': 'Arsenal', 'away_team': 'Chelsea', 'score': '2:0'}
+        ], target_date=old_day)
+        db.insert_match_data('soccer', [
+            {'match_id': 'new_1', 'home_team': 'Arsenal', 'away_team': 'Spurs', 'score': '1:1'}
+        ])
+
+        archive.run_retention(90)
+
+        assert db.get_matches_by_date('soccer', old_day) == []
+        assert db.get_database_stats()['total_tables'] == 1
+
+        archived = reader.get_matches_by_date('soccer', old_day)
+        assert [m['match_id'] for m in archived] == ['old_1']
+        assert archived[0]['score'] == '2:0'
+
+        ids = [m['match_id'] for m in reader.get_recent_matches('soccer', 120)]
+        assert ids == ['new_1', 'old_1']
+
+
+if __name__ == '__main__':
+    test_aged_tables_are_archived_then_readable()
+    print("SUCCESS: archive tier test passed")
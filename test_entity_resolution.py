@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test the persistent cross-provider entity tables
+"""
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from storage.database import DatabaseManager
+from merge.entities import EntityResolver
+
+
+def test_links_survive_restart():
+    """Mappings learned from a merge are flushed to SQLite and reloaded by a new resolver"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'entities.db'))
+        resolver = EntityResolver(db)
+        assert resolver.match_for('iscjxxqgmb', 'l1') is None
+
+        resolver.link_matches('soccer', 'x1', [('xbet', 'x1'), ('iscjxxqgmb', 'l1')])
+        city = resolver.link_teams('soccer', [('xbet', 101, 'Man City'), ('iscjxxqgmb', 'c7', 'Manchester City')])
+        arsenal = resolver.link_teams('soccer', [('xbet', 102, 'Arsenal'), ('iscjxxqgmb', None, 'Arsenal FC')])
+        assert city != arsenal
+        assert resolver.flush() == 5
+        assert resolver.flush() == 0
+
+        reloaded = EntityResolver(db)
+        assert reloaded.match_for('iscjxxqgmb', 'l1') == 'x1'
+        assert reloaded.team_for('iscjxxqgmb', 'c7') == reloaded.team_for('xbet', '101') == city
+        assert reloaded.team_for('iscjxxqgmb', None) is None
+
+        # A new provider id joins the existing canonical team; new teams get fresh ids
+        assert reloaded.link_teams('soccer', [('xbet', 101, 'Man City'), ('iscjxxqgmb', 'c8', 'Man. City')]) == city
+        assert reloaded.link_teams('soccer', [('xbet', 200, 'Chelsea')]) > arsenal
+        reloaded.flush()
+        assert reloaded.get_stats()['teams'] == 5
+
+
+def test_prune_forgets_stale_matches():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'entities.db'))
+        resolver = EntityResolver(db)
+        resolver.link_matches('soccer', 'x1', [('xbet', 'x1'), ('iscjxxqgmb', 'l1')])
+        resolver.flush()
+        with db.get_connection() as conn:
+            conn.execute("UPDATE entity_matches SET last_seen = last_seen - 100 * 86400")
+            conn.commit()
+        assert resolver.prune(retention_days=90) == 2
+        assert EntityResolver(db).match_for('xbet', 'x1') is None
+
+
+def test_seen_mappings_refresh_last_seen():
+    """A mapping that keeps being merged is refreshed on flush and survives pruning"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'entities.db'))
+        resolver = EntityResolver(db)
+        resolver.link_matches('soccer', 'x1', [('xbet', 'x1'), ('iscjxxqgmb', 'l1')])
+        resolver.link_matches('soccer', 'x2', [('xbet', 'x2'), ('iscjxxqgmb', 'l2')])
+        resolver.flush()
+        with db.get_connection() as conn:
+            conn.execute("UPDATE entity_matches SET last_seen = last_seen - 100 * 86400")
+            conn.commit()
+
+        # Only x1 is still on offer; its unchanged mapping is refreshed, not re-linked
+        resolver.link_matches('soccer', 'x1', [('xbet', 'x1'), ('iscjxxqgmb', 'l1')])
+        assert resolver.flush() == 0
+        assert resolver.prune(retention_days=90) == 2
+        reloaded = EntityResolver(db)
+        assert reloaded.match_for('iscjxxqgmb', 'l1') == 'x1'
+        assert reloaded.match_for('iscjxxqgmb', 'l2') is None
+
+
+if __name__ == '__main__':
+    test_links_survive_restart()
+    test_prune_forgets_stale_matches()
+    test_seen_mappings_refresh_last_seen()
+    print("SUCCESS: Entity resolution tests passed")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test match event detection, subscribers and the event log
+"""
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from storage.live_state import LiveStateStore
+from storage.events import EventDetector, EventStream, EventLog
+
+
+def _match(match_id, score='0:0', status='pregame', period=1, odds_home=2.0):
+    return {'match_id': match_id, 'home_team': 'Home', 'away_team': 'Away', 'score': score,
+            'status': status, 'period': period, 'odds_home': odds_home}
+
+
+def test_detect_typed_events():
+    """Consecutive polls yield kickoff, score, period, odds and finished events"""
+    store = LiveStateStore(miss_limit=1)
+    detector = EventDetector(odds_move_threshold=0.05)
+
+    delta = store.apply('soccer', [_match('a'), _match('b')])
+    assert detector.detect('soccer', delta, store) == []
+
+    delta = store.apply('soccer', [_match('a', score='1:0', status='live', period=2, odds_home=1.5),
+                                   _match('b', odds_home=2.02)])
+    events = detector.detect('soccer', delta, store)
+    assert [e['type'] for e in events] == ['kickoff', 'score_change', 'period_change', 'odds_move']
+    assert events[1]['data'] == {'old': '0:0', 'new': '1:0'}
+    odds = events[3]['data']
+    assert odds['side'] == 'home' and odds['delta'] == -0.5 and odds['relative'] == -0.25
+
+    # Only a final status finishes a match; 'b' dropping out of the poll is no result
+    delta = store.apply('soccer', [_match('a', score='1:0', status='finished', period=2, odds_home=1.5)])
+    events = detector.detect('soccer', delta, store)
+    assert [(e['type'], e['match_id']) for e in events] == [('finished', 'a')]
+    assert events[0]['data'] == {'score': '1:0'}
+
+
+def test_stream_filters_isolates_and_logs():
+    """Subscribers get matching events, a failing one does not block others, the log replays"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        stream = EventStream(EventLog(os.path.join(temp_dir, 'events')))
+        goals, everything = [], []
+
+        def broken(event):
+            raise RuntimeError('subscriber failure')
+
+        stream.subscribe(broken)
+        stream.subscribe(goals.append, types=['score_change'], sport='soccer')
+        token = stream.subscribe(everything.append)
+
+        events = [
+            {'type': 'score_change', 'ts': 1.0, 'sport': 'soccer', 'match_id': 'a', 'data': {}},
+            {'type': 'score_change', 'ts': 2.0, 'sport': 'tennis', 'match_id': 't', 'data': {}},
+            {'type': 'kickoff', 'ts': 3.0, 'sport': 'soccer', 'match_id': 'b', 'data': {}}
+        ]
+        stream.publish(events)
+        assert [e['match_id'] for e in goals] == ['a']
+        assert len(everything) == 3
+
+        stream.unsubscribe(token)
+        stream.publish(events[:1])
+        assert len(everything) == 3
+
+        logged = list(stream.log.read())
+        assert [e['match_id'] for e in logged] == ['a', 't', 'b', 'a']
+        assert [e['match_id'] for e in stream.log.read(since=1.5)] == ['t', 'b']
+        assert stream.get_stats()['published']['score_change'] == 3
+
+
+if __name__ == '__main__':
+    test_detect_typed_events()
+    test_stream_filters_isolates_and_logs()
+    print("SUCCESS: Event tests passed")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test fuzzy cross-provider match identification
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from merge.matching import BlockingIndex, normalize_name, name_similarity, match_similarity
+
+KICKOFF = 1760000400
+
+
+def _match(home, away, start_time=KICKOFF, tournament='Premier League'):
+    return {'home_team': home, 'away_team': away, 'start_time': start_time, 'tournament': tournament}
+
+
+def test_name_normalization():
+    assert normalize_name('Man. Utd FC') == ('manchester', 'united')
+    assert normalize_name('Atlético Madrid') == ('atletico', 'madrid')
+    assert name_similarity(normalize_name('Man City'), normalize_name('Manchester City')) == 1.0
+    assert name_similarity(normalize_name('Arsenal'), normalize_name('Chelsea')) < 0.6
+
+
+def test_match_similarity_tolerates_small_differences():
+    a = _match('Man City', 'Arsenal FC')
+    assert match_similarity(a, _match('Manchester City', 'Arsenal', KICKOFF + 60, 'England. Premier League')) > 0.75
+    # Kickoffs too far apart or a different opponent are different fixtures
+    assert match_similarity(a, _match('Manchester City', 'Arsenal', KICKOFF + 7200)) == 0.0
+    assert match_similarity(a, _match('Manchester City', 'Chelsea')) == 0.0
+
+
+def test_qualified_sides_do_not_match_senior_sides():
+    """Youth, women's and reserve sides of a club are different teams"""
+    for senior, other in [('Arsenal', 'Arsenal U21'), ('Arsenal', 'Arsenal Women'), ('Chelsea', 'Chelsea FC U-19'),
+                          ('Real Madrid', 'Real Madrid Castilla'), ('Getafe', 'Getafe B'),
+                          ('Arsenal U21', 'Arsenal U23'), ('Arsenal Women', 'Arsenal U21')]:
+        assert name_similarity(normalize_name(senior), normalize_name(other)) == 0.0, (senior, other)
+    assert match_similarity(_match('Arsenal', 'Chelsea'), _match('Arsenal U21', 'Chelsea U21')) == 0.0
+    assert match_similarity(_match('Arsenal', 'Chelsea'), _match('Arsenal Women', 'Chelsea Women')) == 0.0
+
+    # Spelling variants of the same qualifier still match
+    assert name_similarity(normalize_name('Arsenal U-21'), normalize_name('Arsenal FC U21')) == 1.0
+    assert name_similarity(normalize_name('Arsenal W'), normalize_name('Arsenal Ladies')) == 1.0
+    assert name_similarity(normalize_name('Getafe B'), normalize_name('Getafe II')) == 1.0
+    assert match_similarity(_match('Arsenal Women', 'Chelsea W'), _match('Arsenal Ladies', 'Chelsea FC Women')) > 0.75
+
+
+def test_blocking_index_pairs_one_record_per_provider():
+    """A record paired with one provider record is not offered to that provider again"""
+    index = BlockingIndex()
+    index.add('x1', _match('Manchester City', 'Arsenal'), provider='xbet')
+    assert index.find(_match('Man City', 'Arsenal'), provider='xbet') is None
+    assert index.find(_match('Man City', 'Arsenal'), provider='iscjxxqgmb') == 'x1'
+
+    index.pair('x1', 'iscjxxqgmb')
+    assert index.find(_match('Man City', 'Arsenal FC'), provider='iscjxxqgmb') is None
+    index.unpair('x1', 'iscjxxqgmb')
+    assert index.find(_match('Man City', 'Arsenal FC'), provider='iscjxxqgmb') == 'x1'
+
+
+def test_blocking_index_finds_best_candidate():
+    index = BlockingIndex()
+    index.add('x1', _match('Manchester City', 'Arsenal'))
+    index.add('x2', _match('Manchester United', 'Chelsea'))
+    index.add('x3', _match('Manchester City', 'Arsenal', KICKOFF + 86400))
+
+    assert index.find(_match('Man City', 'Arsenal', KICKOFF + 30)) == 'x1'
+    assert index.find(_match('Man Utd', 'Chelsea FC', start_time=0)) == 'x2'
+    assert index.find(_match('Liverpool', 'Everton')) is None
+    # Only records sharing a block are scored
+    assert index.candidates(_match('Liverpool', 'Everton')) == set()
+
+    index.discard('x1')
+    assert index.find(_match('Man City', 'Arsenal')) is None
+
+
+if __name__ == '__main__':
+    test_name_normalization()
+    test_match_similarity_tolerates_small_differences()
+    test_qualified_sides_do_not_match_senior_sides()
+    test_blocking_index_pairs_one_record_per_provider()
+    test_blocking_index_finds_best_candidate()
+    print("SUCCESS: Fuzzy merge tests passed")
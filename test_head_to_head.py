@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test the persistent head-to-head pair index
+"""
+import sys
+import os
+import tempfile
+from datetime import date, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from storage.database import DatabaseManager
+from analysis.head_to_head import HeadToHeadIndex
+from analysis.predictor import MatchPredictor
+from match_fixtures import make_match as _match
+
+
+def test_backfill_record_and_restart():
+    """History is backfilled once, live results replace by match_id and survive a restart"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'h2h.db'))
+        db.insert_match_data('soccer', [_match('a', 'Arsenal', 'Chelsea', '2:0'), _match('b', 'Chelsea', 'Arsenal', '1:1'),
+                                        _match('c', 'Arsenal', 'Chelsea', '')])
+        db.insert_match_data('soccer', [_match('d', 'Arsenal FC', 'Chelsea', '0:1')])
+
+        index = HeadToHeadIndex(db, db)
+        stats = index.get('soccer', 'Arsenal', 'Chelsea')
+        assert (stats['total_matches'], stats['home_wins'], stats['away_wins'], stats['draws']) == (2, 1, 1, 0)
+        index.record_results('soccer', [_match('f', 'Arsenal', 'Chelsea', '5:0')], day=date.today() - timedelta(days=40))
+        assert index.get('soccer', 'Arsenal', 'Chelsea')['total_matches'] == 3
+        assert index.get('soccer', 'Arsenal', 'Chelsea', days=30)['total_matches'] == 2
+        assert index.get('soccer', 'Spurs', 'Chelsea') == {'total_matches': 0, 'home_wins': 0, 'away_wins': 0, 'draws': 0}
+
+        # The live score of 'a' moves on and a new result arrives
+        index.record_results('soccer', [_match('a', 'Arsenal', 'Chelsea', '2:2'), _match('e', 'Chelsea FC', 'Arsenal', '0:3')])
+        meetings = index.get_meetings('soccer', 'Arsenal', 'Chelsea')
+        assert (meetings['total_matches'], meetings['wins'], meetings['draws'], meetings['losses']) == (5, 2, 2, 1)
+
+        # A new index (restart) restores the pairs from its table without walking the daily tables again
+        restarted = HeadToHeadIndex(db, reader=None)
+        assert restarted.get('soccer', 'Arsenal', 'Chelsea') == index.get('soccer', 'Arsenal', 'Chelsea')
+        assert restarted.get('soccer', 'Chelsea', 'Arsenal')['away_wins'] == 1
+
+
+def test_predictor_uses_index():
+    """get_head_to_head_stats and predict_many read the index"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'h2h.db'))
+        db.insert_match_data('soccer', [_match('a', 'Arsenal', 'Chelsea', '0:2')])
+        predictor = MatchPredictor(db, head_to_head=HeadToHeadIndex(db, db))
+
+        assert predictor.get_head_to_head_stats('Arsenal FC', 'Chelsea', 'soccer')['away_win_rate'] == 1.0
+        batch = predictor.predict_many([_match('u', 'Arsenal', 'Chelsea', '')], 'soccer')
+        predictor.prediction_cache.clear()
+        single = predictor.predict_match_outcome('Arsenal', 'Chelsea', 'soccer')
+        assert (batch[0]['prediction'], batch[0]['confidence']) == (single['prediction'], single['confidence'])
+
+
+if __name__ == "__main__":
+    test_backfill_record_and_restart()
+    test_predictor_uses_index()
+    print("SUCCESS: Head-to-head pair index works!")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test the live match feed and its HTTP endpoints
+"""
+import sys
+import os
+import asyncio
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from service.feed import LiveFeed, match_updates
+from storage.live_state import LiveStateStore
+
+
+def test_feed_filters_and_drops_slow_consumers():
+    """Clients only receive their sport/match; a full queue disconnects the client"""
+    async def scenario():
+        feed = LiveFeed(queue_size=2)
+        feed.attach(asyncio.get_running_loop())
+        soccer = feed.register(sports=['soccer'])
+        match = feed.register(match_ids=['t1'])
+
+        feed.publish([{'type': 'match', 'sport': 'soccer', 'match_id': 's1'},
+                      {'type': 'match', 'sport': 'tennis', 'match_id': 't1'}])
+        await asyncio.sleep(0)
+        assert (await soccer.queue.get())['match_id'] == 's1'
+        assert (await match.queue.get())['match_id'] == 't1'
+
+        # The tennis client never reads; its third queued message overflows the queue
+        feed.publish([{'type': 'match', 'sport': 'tennis', 'match_id': 't1'}] * 3)
+        await asyncio.sleep(0)
+        assert match.dropped and match.queue.qsize() == 1
+        assert (await match.queue.get())['type'] == 'dropped'
+        assert not soccer.dropped
+        assert feed.get_stats()['clients'] == 1 and feed.get_stats()['dropped_clients'] == 1
+
+    asyncio.run(scenario())
+
+
+def test_match_updates_from_delta():
+    store = LiveStateStore()
+    delta = store.apply('soccer', [{'match_id': 'a', 'score': '0:0'}])
+    assert [m['match_id'] for m in match_updates('soccer', delta, store)] == ['a']
+    delta = store.apply('soccer', [{'match_id': 'a', 'score': '1:0'}])
+    update = match_updates('soccer', delta, store)[0]
+    assert update['changed'] == ['score'] and update['data']['score'] == '1:0'
+
+
+def test_websocket_feed():
+    """A WebSocket client gets a snapshot, then pushed updates for its sport"""
+    pytest.importorskip('fastapi')
+    pytest.importorskip('httpx')
+    from fastapi.testclient import TestClient
+    from service.server import create_app
+
+    store = LiveStateStore()
+    store.apply('soccer', [{'match_id': 'a', 'score': '0:0'}])
+    feed = LiveFeed()
+
+    with TestClient(create_app(feed, store)) as client:
+        with client.websocket_connect('/feed/ws?sport=soccer') as websocket:
+            snapshot = websocket.receive_json()
+            assert snapshot['type'] == 'snapshot' and [m['match_id'] for m in snapshot['matches']] == ['a']
+
+            feed.publish([{'type': 'match', 'sport': 'tennis', 'match_id': 't'},
+                          {'type': 'score_change', 'sport': 'soccer', 'match_id': 'a'}])
+            assert websocket.receive_json()['type'] == 'score_change'
+
+        assert client.get('/feed/stats').json()['delivered'] == 1
+
+
+if __name__ == '__main__':
+    test_feed_filters_and_drops_slow_consumers()
+    test_match_updates_from_delta()
+    test_websocket_feed()
+    print("SUCCESS: Live feed tests passed")
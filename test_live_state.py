@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test the in-memory live-state store
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from storage.live_state import LiveStateStore, LiveMatch
+
+
+def _match(match_id, score='0:0', status='pregame', odds_home=2.0):
+    return {'match_id': match_id, 'home_team': 'Home', 'away_team': 'Away', 'score': score,
+            'status': status, 'odds_home': odds_home, 'tournament': 'Cup'}
+
+
+def test_apply_reports_new_changed_and_evicted():
+    """Each poll yields only new and changed matches; missing ones are evicted after miss_limit polls"""
+    store = LiveStateStore(miss_limit=2)
+
+    delta = store.apply('soccer', [_match('a'), _match('b')])
+    assert delta['new'] == ['a', 'b'] and len(delta['upserts']) == 2
+
+    delta = store.apply('soccer', [_match('a'), _match('b')])
+    assert delta['new'] == [] and delta['changed'] == {} and delta['upserts'] == []
+
+    delta = store.apply('soccer', [_match('a', score='1:0', status='live'), _match('b', odds_home=1.8)])
+    assert delta['changed'] == {'a': ['score', 'status'], 'b': ['odds_home']}
+    assert [m['match_id'] for m in delta['upserts']] == ['a', 'b']
+    assert store.get('a')['score'] == '1:0'
+
+    # Other sports' polls do not count as misses
+    store.apply('tennis', [_match('t')])
+    assert store.apply('soccer', [_match('a', score='1:0', status='live')])['evicted'] == []
+    delta = store.apply('soccer', [_match('a', score='1:0', status='live')])
+    assert delta['evicted'] == ['b'] and delta['finished'] == []
+    assert store.get('b') is None
+
+    assert store.get_stats() == {'matches': 2, 'live': 1, 'per_sport': {'soccer': 1, 'tennis': 1}}
+    assert [m['match_id'] for m in store.get_matches(sport='soccer', status='live')] == ['a']
+
+
+def test_final_status_reports_result_once():
+    """A match is finished when a provider reports a final status, not when it disappears"""
+    store = LiveStateStore(miss_limit=1)
+    store.apply('soccer', [_match('a', score='1:0', status='live'), _match('b', score='0:0', status='live')])
+
+    delta = store.apply('soccer', [_match('a', score='2:0', status='finished')])
+    assert [(m['match_id'], m['score']) for m in delta['finished']] == [('a', '2:0')]
+    assert delta['evicted'] == ['b'] and delta['upserts'][0]['status'] == 'finished'
+
+    assert store.apply('soccer', [_match('a', score='2:0', status='finished')])['finished'] == []
+
+
+def test_records_are_compact():
+    """Records use __slots__ and a bitmask for change flags"""
+    record = LiveMatch('x')
+    assert not hasattr(record, '__dict__')
+    record.changed = 0b101
+    assert record.changed_fields == ['score', 'period']
+
+
+if __name__ == '__main__':
+    test_apply_reports_new_changed_and_evicted()
+    test_final_status_reports_result_once()
+    test_records_are_compact()
+    print("SUCCESS: Live state tests passed")
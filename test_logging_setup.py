@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Test sampled, rate-limited JSON logging
+"""
+import sys
+import os
+import json
+import logging
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from logging_setup import SamplingFilter, JsonFormatter, setup_logging
+
+
+def _record(msg, level=logging.INFO, lineno=1, **extra):
+    record = logging.LogRecord('test', level, 'hot.py', lineno, msg, (), None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_sampling_and_rate_limit():
+    """Sampled prefixes keep every Nth record; each call site is capped per minute"""
+    sampler = SamplingFilter(rate_per_minute=0, sampling={'DB Insert': 0.1})
+    kept = [sampler.filter(_record(f'DB Insert: Match {i}')) for i in range(30)]
+    assert sum(kept) == 3 and kept[0]
+
+    limiter = SamplingFilter(rate_per_minute=5)
+    assert sum(limiter.filter(_record(f'SUCCESS: row {i}')) for i in range(20)) == 5
+    assert limiter.filter(_record('other call site', lineno=2))
+    assert all(limiter.filter(_record('failure', level=logging.WARNING)) for _ in range(20))
+
+    # The first record of the next window reports what was dropped
+    limiter._windows[('hot.py', 1)][0] -= 60
+    record = _record('SUCCESS: again')
+    assert limiter.filter(record) and record.suppressed == 15
+
+
+def test_json_file_output():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'collector.log')
+        listener = setup_logging({'file': path, 'format': 'json', 'max_file_size_mb': 1, 'backup_count': 2})
+        try:
+            logging.info("CYCLE: done", extra={'matches': 12})
+        finally:
+            listener.stop()
+            logging.getLogger().handlers.clear()
+
+        with open(path, encoding='utf-8') as f:
+            entry = json.loads(f.readline())
+        assert entry['msg'] == 'CYCLE: done' and entry['matches'] == 12 and entry['level'] == 'INFO'
+        assert json.loads(JsonFormatter().format(_record('x', log_key='k')))['log_key'] == 'k'
+
+
+if __name__ == '__main__':
+    test_sampling_and_rate_limit()
+    test_json_file_output()
+    print("SUCCESS: Logging tests passed")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test the budgeted maintenance scheduler (optimize, ANALYZE, incremental vacuum, retention)
+"""
+import sys
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from storage.database import DatabaseManager
+from storage.maintenance import MaintenanceScheduler
+
+
+def _matches(prefix, count):
+    return [{'match_id': f'{prefix}_{i}', 'home_team': f'Home {i}', 'away_team': f'Away {i}',
+             'score': '1:0', 'tournament': 'League ' + 'x' * 200} for i in range(count)]
+
+
+def test_database_uses_wal():
+    """New databases are switched to WAL so the checkpoint job has a log to work on"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'wal.db'))
+        with db.get_connection() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+
+
+def test_standard_jobs_run_and_report_metrics():
+    """All standard jobs run in the first window and record metrics"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'maint.db'))
+        db.insert_match_data('soccer', _matches('today', 50))
+        db.insert_match_data('soccer', _matches('old', 500), target_date=date.today() - timedelta(days=120))
+
+        config = {'database': {'retention_days': 90, 'maintenance_budget_seconds': 5}}
+        scheduler = MaintenanceScheduler.from_config(db, config)
+        summary = scheduler.run_pending(window_seconds=30)
+
+        assert set(summary['ran']) == {'wal_checkpoint', 'optimize', 'analyze',
+                                       'incremental_vacuum', 'retention'}
+        assert not summary['errors']
+
+        metrics = scheduler.get_metrics()
+        assert metrics['wal_checkpoint']['last_result']['wal']
+        assert metrics['analyze']['runs'] == 1
+        assert metrics['analyze']['last_result']['complete']
+
+        # The aged table was dropped and its pages released without a full VACUUM
+        assert db.get_database_stats()['total_tables'] == 1
+        assert metrics['incremental_vacuum']['last_result']['auto_vacuum']
+        with sqlite3.connect(db.db_path) as conn:
+            assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+            assert conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0] > 0
+
+        # Nothing but the checkpoint is due again straight away
+        assert scheduler.run_pending(window_seconds=30)['ran'] == ['wal_checkpoint']
+
+
+def test_window_defers_jobs_and_budgets_stop_analyze():
+    """Jobs beyond the window wait for the next one; ANALYZE stops at its deadline"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'window.db'))
+        scheduler = MaintenanceScheduler(db)
+
+        scheduler.add_job('slow', lambda deadline: time.sleep(0.2) or {}, 3600, budget_seconds=1)
+        scheduler.add_job('later', lambda deadline: {}, 3600)
+        summary = scheduler.run_pending(window_seconds=0.1)
+        assert summary['ran'] == ['slow'] and summary['deferred'] == ['later']
+        assert scheduler.run_pending(window_seconds=1)['ran'] == ['later']
+
+        db.insert_match_data('soccer', _matches('a', 5))
+        db.insert_match_data('soccer', _matches('b', 5), target_date=date.today() - timedelta(days=1))
+        result = scheduler.analyze_changed(deadline=time.monotonic() - 1)
+        assert result == {'tables_analyzed': 0, 'complete': False, 'tables_pending': 3}
+
+        # The next pass resumes with the tables left over instead of starting again
+        result = scheduler.analyze_changed(deadline=time.monotonic() + 5)
+        assert result == {'tables_analyzed': 3, 'complete': True, 'tables_pending': 0}
+        assert scheduler.analyze_changed(deadline=time.monotonic() + 5)['tables_analyzed'] == 1
+
+
+if __name__ == '__main__':
+    test_database_uses_wal()
+    test_standard_jobs_run_and_report_metrics()
+    test_window_defers_jobs_and_budgets_stop_analyze()
+    print("SUCCESS: Maintenance scheduler tests passed")
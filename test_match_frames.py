@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test the columnar (DataFrame / NumPy) match loaders and the vectorized team form
+"""
+import sys
+import os
+import tempfile
+from datetime import date, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+from storage.database import DatabaseManager
+from analysis.predictor import MatchPredictor
+
+
+def _match(match_id, home, away, score):
+    return {'match_id': match_id, 'home_team': home, 'away_team': away, 'score': score,
+            'odds': {'home': 2.1, 'away': 3.4}}
+
+
+def _seed(db):
+    today = date.today()
+    db.insert_match_data('soccer', [_match('m1', 'Arsenal', 'Chelsea', '2:0'),
+                                    _match('m2', 'Spurs', 'Arsenal', '1:1')])
+    db.insert_match_data('soccer', [_match('m3', 'Chelsea', 'Arsenal', '3:1'),
+                                    _match('m4', 'Spurs', 'Chelsea', 'TBD')],
+                         target_date=today - timedelta(days=3))
+
+
+def test_load_matches_frame_types():
+    """Scores are parsed to integers and teams share one categorical dictionary"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'frames.db'))
+        _seed(db)
+
+        frame = db.load_matches_frame('soccer', date.today() - timedelta(days=7), date.today())
+        assert len(frame) == 4
+        assert str(frame['home_score'].dtype) == 'Int64'
+        assert isinstance(frame['home_team'].dtype, pd.CategoricalDtype)
+        assert list(frame['home_team'].cat.categories) == list(frame['away_team'].cat.categories)
+
+        m1 = frame.set_index('match_id').loc['m1']
+        assert (m1['home_score'], m1['away_score']) == (2, 0)
+        assert frame.set_index('match_id').loc['m4', 'home_score'] is pd.NA
+
+        arrays = db.load_matches_arrays('soccer', date.today() - timedelta(days=7), date.today(),
+                                        columns=['home_team', 'away_team', 'score'])
+        assert arrays['home_code'].dtype.kind == 'i'
+        assert set(arrays['teams']) == {'Arsenal', 'Chelsea', 'Spurs'}
+
+
+def test_team_form_table_matches_per_team_stats():
+    """The vectorized form table agrees with get_team_statistics"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'form.db'))
+        _seed(db)
+        predictor = MatchPredictor(db)
+
+        table = predictor.get_team_form_table('soccer', days=30)
+        for team in ('Arsenal', 'Chelsea', 'Spurs'):
+            stats = predictor.get_team_statistics(team, 'soccer', days=30)
+            row = table.loc[team.lower()]
+            for key in ('total_matches', 'wins', 'draws', 'losses', 'goals_for',
+                        'goals_against', 'clean_sheets'):
+                assert row[key] == stats[key], (team, key)
+
+        h2h = predictor.get_head_to_head_table('soccer', days=30)
+        assert h2h.loc[('chelsea', 'arsenal'), 'home_wins'] == 1
+        assert h2h.loc[('spurs', 'chelsea'), 'total_matches'] == 1
+
+
+if __name__ == '__main__':
+    test_load_matches_frame_types()
+    test_team_form_table_matches_per_team_stats()
+    print("SUCCESS: Columnar match loader tests passed")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test the change-only match history table
+"""
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from storage.database import DatabaseManager
+
+
+def _match(**overrides):
+    match = {
+        'match_id': 'hist_1',
+        'home_team': 'Manchester City',
+        'away_team': 'Arsenal',
+        'score': '0:0',
+        'status': 'pregame',
+        'period': 1,
+        'tournament': 'Premier League',
+        'odds_home': 1.85,
+        'odds_away': 3.20,
+        'odds_draw': 3.50,
+        'event_count': 15,
+        'start_time': 1638360000,
+        'data_source': 'xbet'
+    }
+    match.update(overrides)
+    return match
+
+
+def test_history_only_records_changes():
+    """Unchanged polls must not append history rows"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'history.db'))
+
+        db.insert_match_data('soccer', [_match()])
+        db.insert_match_data('soccer', [_match()])
+        db.insert_match_data('soccer', [_match(odds_home=1.80)])
+        db.insert_match_data('soccer', [_match(odds_home=1.80, score='1:0', status='live')])
+
+        history = db.get_match_history('hist_1')
+        assert [row['seq'] for row in history] == [1, 2, 3]
+        assert history[1]['odds_home'] == 1.80
+        assert history[2]['score'] == '1:0'
+        assert history[2]['status'] == 'live'
+
+        # A fresh manager resumes the sequence from the stored rows
+        db = DatabaseManager(os.path.join(tmp, 'history.db'))
+        db.insert_match_data('soccer', [_match(odds_home=1.80, score='1:0', status='live')])
+        db.insert_match_data('soccer', [_match(odds_home=1.80, score='2:0', status='live')])
+        assert [row['seq'] for row in db.get_match_history('hist_1')] == [1, 2, 3, 4]
+
+
+if __name__ == '__main__':
+    test_history_only_records_changes()
+    print("SUCCESS: match history test passed")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test the N-provider match merge and its field rules
+"""
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from storage.database import DatabaseManager
+from merge.entities import EntityResolver
+from merge.merger import MatchMerger, ProviderBatch, decode_provenance
+
+KICKOFF = 1760000400
+
+
+def _match(match_id, home='Manchester City', away='Arsenal', **fields):
+    return dict({'match_id': match_id, 'home_team': home, 'away_team': away, 'start_time': KICKOFF}, **fields)
+
+
+def test_field_rules_and_provenance():
+    merger = MatchMerger(['a', 'b', 'c'], {'score': 'freshest', 'odds_home': 'prefer:c'})
+    merged = merger.merge('soccer', [
+        ProviderBatch('c', [_match('c1', 'Man City', 'Arsenal FC', score='1:0', odds_home=1.9, event_count=4)], 200.0),
+        ProviderBatch('a', [_match('a1', score='0:0', odds_home=2.0, event_count=10, tournament=''),
+                            _match('a2', 'Liverpool', 'Everton')], 300.0),
+        ProviderBatch('b', [_match('b1', tournament='Premier League', event_count=12)], 100.0)
+    ])
+
+    assert len(merged) == 2
+    city = merged[0]
+    assert city['match_id'] == 'a1'                 # 'first' follows provider precedence
+    assert city['score'] == '0:0'                   # freshest batch
+    assert city['odds_home'] == 1.9                 # preferred provider
+    assert city['event_count'] == 12                # max
+    assert city['tournament'] == 'Premier League'   # first non-empty
+    assert city['data_source'] == 'a+b+c'
+    provenance = decode_provenance(city['provenance'], merger.providers)
+    assert provenance['odds_home'] == 'c' and provenance['event_count'] == 'b' and provenance['odds_draw'] is None
+    assert merged[1]['data_source'] == 'a'
+
+
+def test_known_ids_skip_fuzzy_matching():
+    """Linked provider ids merge by lookup even when the names no longer look alike"""
+    with tempfile.TemporaryDirectory() as tmp:
+        entities = EntityResolver(DatabaseManager(os.path.join(tmp, 'merge.db')))
+        merger = MatchMerger(['xbet', 'iscjxxqgmb'], entities=entities)
+
+        first = merger.merge('soccer', [ProviderBatch('xbet', [_match('x1', home_team_id=1, away_team_id=2)], None),
+                                        ProviderBatch('iscjxxqgmb', [_match('l1', 'Man City', 'Arsenal FC',
+                                                                            home_team_id='h', away_team_id='a')], None)])
+        assert [m['data_source'] for m in first] == ['both']
+
+        second = merger.merge('soccer', [
+            ProviderBatch('xbet', [_match('x2', 'MCFC', 'AFC London', home_team_id=1, away_team_id=2)], None),
+            ProviderBatch('iscjxxqgmb', [_match('l2', 'Citizens', 'Gunners', home_team_id='h', away_team_id='a'),
+                                         _match('l1', 'Man City', 'Arsenal FC')], None)
+        ])
+        assert sorted((m['match_id'], m['data_source']) for m in second) == [('x1', 'iscjxxqgmb'), ('x2', 'both')]
+
+
+def test_union_carries_across_cycles():
+    """Unchanged records are skipped, changed ones refold their match, vanished ones leave it"""
+    merger = MatchMerger(['a', 'b'])
+    batches = [ProviderBatch('a', [_match('a1', score='0:0'), _match('a2', 'Liverpool', 'Everton')], 1.0),
+               ProviderBatch('b', [_match('b1', 'Man City', 'Arsenal FC', event_count=5)], 1.0)]
+    first = merger.merge('soccer', batches)
+    assert [m['data_source'] for m in first] == ['both', 'a']
+
+    again = merger.merge('soccer', batches)
+    assert merger.stats['soccer'] == {'records': 3, 'unchanged': 3, 'resolved': 0, 'refolded': 0, 'matches': 2}
+    assert again[0] is first[0]
+
+    changed = merger.merge('soccer', [ProviderBatch('a', [_match('a1', score='1:0')], 2.0), batches[1]])
+    assert merger.stats['soccer']['refolded'] == 2 and merger.stats['soccer']['resolved'] == 0
+    assert [(m['match_id'], m['score'], m['event_count']) for m in changed] == [('a1', '1:0', 5)]
+
+    # The provider dropping out leaves the other provider's record
+    assert [m['data_source'] for m in merger.merge('soccer', [batches[1]])] == ['b']
+    assert merger.merge('soccer', []) == []
+
+
+def test_same_provider_fixtures_stay_separate():
+    """Fixtures one provider lists separately never fold into one match, however alike they look"""
+    fixtures = [_match('x1', 'Arsenal', 'Chelsea'), _match('x2', 'Arsenal U21', 'Chelsea U21'),
+                _match('x3', 'Arsenal Women', 'Chelsea Women'), _match('x4', 'Real Madrid', 'Getafe'),
+                _match('x5', 'Real Madrid Castilla', 'Getafe B'),
+                # Names alike enough for the fuzzy matcher, but listed as two fixtures
+                _match('x6', 'Nacional', 'Sporting', tournament='Portugal. Liga'),
+                _match('x7', 'Nacional', 'Sporting Cristal', tournament='Copa Libertadores')]
+    merger = MatchMerger(['xbet', 'iscjxxqgmb'])
+    merged = merger.merge('soccer', [ProviderBatch('xbet', fixtures, None), ProviderBatch('iscjxxqgmb', [], None)])
+    assert sorted(m['match_id'] for m in merged) == ['x1', 'x2', 'x3', 'x4', 'x5', 'x6', 'x7']
+
+    # Each of the other provider's records pairs with at most one of them, and only one record pairs with each
+    merged = merger.merge('soccer', [ProviderBatch('xbet', fixtures, None), ProviderBatch('iscjxxqgmb', [
+        _match('l1', 'Nacional', 'Sporting', tournament='Portugal. Liga'),
+        _match('l2', 'Arsenal FC', 'Chelsea FC'), _match('l3', 'Arsenal', 'Chelsea FC')], None)])
+    sources = {m['match_id']: m['data_source'] for m in merged}
+    assert len(merged) == 8
+    assert sources['x1'] == 'both' and sources['x6'] == 'both' and sources['x7'] == 'xbet'
+    assert sources['l3'] == 'iscjxxqgmb'
+
+
+def test_same_provider_fixtures_stay_separate_across_cycles():
+    """The union and the entity map keep one provider's fixtures apart in later cycles"""
+    with tempfile.TemporaryDirectory() as tmp:
+        entities = EntityResolver(DatabaseManager(os.path.join(tmp, 'merge.db')))
+        # A mapping learned while x6 was wrongly folded into x1's match
+        entities.link_matches('soccer', 'x1', [('xbet', 'x1'), ('xbet', 'x6'), ('iscjxxqgmb', 'l1')])
+        entities.flush()
+        merger = MatchMerger(['xbet', 'iscjxxqgmb'], entities=entities)
+
+        def cycle(score):
+            return merger.merge('soccer', [
+                ProviderBatch('xbet', [_match('x1', 'Arsenal', 'Chelsea', score=score),
+                                       _match('x2', 'Arsenal U21', 'Chelsea U21'),
+                                       _match('x6', 'Nacional', 'Sporting', score=score),
+                                       _match('x7', 'Nacional', 'Sporting Cristal')], None),
+                ProviderBatch('iscjxxqgmb', [_match('l1', 'Arsenal FC', 'Chelsea')], None)])
+
+        first = cycle('0:0')
+        second = cycle('1:0')
+        assert merger.stats['soccer']['matches'] == 4
+        for merged in (first, second):
+            assert sorted((m['match_id'], m['data_source']) for m in merged) == [
+                ('x1', 'both'), ('x2', 'xbet'), ('x6', 'xbet'), ('x7', 'xbet')]
+        assert {m['match_id']: m.get('score') for m in second}['x6'] == '1:0'
+
+
+if __name__ == '__main__':
+    test_field_rules_and_provenance()
+    test_known_ids_skip_fuzzy_matching()
+    test_union_carries_across_cycles()
+    test_same_provider_fixtures_stay_separate()
+    test_same_provider_fixtures_stay_separate_across_cycles()
+    print("SUCCESS: Match merger tests passed")
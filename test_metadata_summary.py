@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test the incrementally maintained table metadata and summary rows
+"""
+import sys
+import os
+import tempfile
+from datetime import date, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from storage.database import DatabaseManager
+
+
+def _matches(prefix, count):
+    return [{
+        'match_id': f'{prefix}_{i}',
+        'home_team': f'Home {i}',
+        'away_team': f'Away {i}',
+        'score': '0:0',
+        'status': 'pregame',
+        'tournament': 'Test League',
+        'data_source': 'xbet'
+    } for i in range(count)]
+
+
+def test_counters_follow_inserts_and_cleanup():
+    """Counts must track new rows only and shrink when tables are dropped"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'meta.db'))
+        old_day = date.today() - timedelta(days=120)
+
+        db.insert_match_data('soccer', _matches('s', 3))
+        db.insert_match_data('soccer', _matches('s', 5))  # 3 updates + 2 new
+        db.insert_match_data('tennis', _matches('t', 2))
+        db.insert_match_data('tennis', _matches('old', 4), target_date=old_day)
+
+        stats = db.get_database_stats()
+        assert stats['total_tables'] == 3
+        assert stats['total_records'] == 11
+        assert sorted(stats['sports_covered']) == ['soccer', 'tennis']
+        assert stats['per_sport']['soccer']['records'] == 5
+        assert stats['date_range']['oldest'] == old_day.isoformat()
+
+        db.cleanup_old_data(90)
+
+        stats = db.get_database_stats()
+        assert stats['total_tables'] == 2
+        assert stats['total_records'] == 7
+        assert stats['date_range']['oldest'] == date.today().isoformat()
+
+        # Rebuilding from table_metadata gives the same answer
+        db.rebuild_metadata_summary()
+        assert db.get_database_stats()['total_records'] == 7
+
+
+if __name__ == '__main__':
+    test_counters_follow_inserts_and_cleanup()
+    print("SUCCESS: metadata summary test passed")
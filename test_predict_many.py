@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test batched predictions against the single-match predictor
+"""
+import sys
+import os
+import tempfile
+import types
+import pytest
+from datetime import date, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from storage.database import DatabaseManager
+from analysis.aggregates import TeamAggregateStore
+from analysis.predictor import MatchPredictor
+from match_fixtures import make_match as _match
+
+
+HISTORY = [
+    _match('a', 'Arsenal', 'Chelsea', '2:0'), _match('b', 'Chelsea', 'Arsenal', '1:1'),
+    _match('c', 'Spurs', 'Arsenal', '0:3'), _match('d', 'Arsenal', 'Chelsea', '0:1'),
+    _match('e', 'Everton', 'Spurs', ''), _match('f', 'Fulham', 'Everton', '2:2'),
+]
+
+UPCOMING = [
+    _match('u1', 'Arsenal', 'Chelsea', ''), _match('u2', 'Chelsea', 'Arsenal', ''),
+    _match('u3', 'Spurs', 'Fulham', ''), _match('u4', 'Newcomers', 'Everton', ''),
+    _match('u5', 'Nobody', 'Nobody Else', ''),
+]
+
+
+def _check_against_single(predictor):
+    batch = predictor.predict_many(UPCOMING, 'soccer')
+    predictor.prediction_cache.clear()
+    assert [p['match_id'] for p in batch] == [m['match_id'] for m in UPCOMING]
+    for match, prediction in zip(UPCOMING, batch):
+        single = predictor.predict_match_outcome(match['home_team'], match['away_team'], 'soccer')
+        assert prediction['prediction'] == single['prediction'], match
+        assert prediction['confidence'] == single['confidence'], match
+        for factor, value in single['factors'].items():
+            assert abs(prediction['factors'][factor] - value) < 1e-9, (match, factor)
+
+
+def test_predict_many_matches_single_predictions():
+    """Batch outcomes, confidences and factors equal predict_match_outcome's"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'batch.db'))
+        db.insert_match_data('soccer', HISTORY[:3])
+        db.insert_match_data('soccer', HISTORY[3:], target_date=date.today() - timedelta(days=2))
+
+        _check_against_single(MatchPredictor(db))
+        _check_against_single(MatchPredictor(db, TeamAggregateStore(db)))
+
+
+def test_predict_many_without_history():
+    """An empty sport still predicts every match with the no-data defaults"""
+    with tempfile.TemporaryDirectory() as tmp:
+        predictor = MatchPredictor(DatabaseManager(os.path.join(tmp, 'empty.db')))
+        _check_against_single(predictor)
+        assert predictor.predict_many([], 'soccer') == []
+
+
+class _SkippingPredictor:
+    """predict_many and predict_scores that skip different matches and reorder their output"""
+
+    def predict_many(self, matches, sport):
+        return [{'match_id': m['match_id'], 'prediction': 'home_win'} for m in matches if m['match_id'] != 'u3']
+
+    def predict_scores(self, matches, sport):
+        return [{'match_id': m['match_id'], 'predicted_score': m['match_id']}
+                for m in reversed(matches) if m['match_id'] != 'u2']
+
+
+def test_collector_pairs_scores_by_match_id():
+    """Scores attach to the prediction of their own match even when the two lists differ"""
+    pytest.importorskip('yaml')
+    from main import SportsDataCollector
+
+    collector = types.SimpleNamespace(predictor=_SkippingPredictor())
+    matches = [dict(m, status='pregame') for m in UPCOMING[:3]] + [dict(UPCOMING[3], status='live')]
+    predictions = SportsDataCollector._generate_predictions(collector, matches, 'soccer')
+    assert [p['match_id'] for p in predictions] == ['u1', 'u2']
+    assert predictions[0]['score']['predicted_score'] == 'u1'
+    assert predictions[1]['score'] is None
+
+
+if __name__ == "__main__":
+    test_predict_many_matches_single_predictions()
+    test_predict_many_without_history()
+    test_collector_pairs_scores_by_match_id()
+    print("SUCCESS: Batched predictions match single-match predictions!")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test the cached read-optimized query API
+"""
+import sys
+import os
+import gzip
+import json
+import tempfile
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from storage.database import DatabaseManager
+from storage.live_state import LiveStateStore
+from service.query import QueryService
+from analysis.predictor import MatchPredictor
+
+
+def _match(match_id, home, away, score='0:0', status='pregame'):
+    return {'match_id': match_id, 'home_team': home, 'away_team': away, 'score': score, 'status': status}
+
+
+def _payload(cached):
+    return json.loads(cached.body)
+
+
+def test_keyset_pages_and_invalidation():
+    """Today's matches page by match_id; cached bytes are reused until the sport is written"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'query.db'))
+        db.insert_match_data('soccer', [_match(f'm{i}', f'Home{i}', f'Away{i}') for i in range(5)])
+        query = QueryService(db, LiveStateStore(), page_size=2)
+
+        first = _payload(query.todays_matches('soccer'))
+        assert [m['match_id'] for m in first['matches']] == ['m0', 'm1'] and first['next'] == 'm1'
+        last = _payload(query.todays_matches('soccer', after='m3', limit=10))
+        assert [m['match_id'] for m in last['matches']] == ['m4'] and last['next'] is None
+
+        cached = query.todays_matches('soccer')
+        assert query.todays_matches('soccer') is cached
+        assert query.get_stats()['hits'] == 2
+
+        db.insert_match_data('soccer', [_match('m5', 'Arsenal', 'Chelsea', '1:0')])
+        query.invalidate('tennis')
+        assert query.todays_matches('soccer') is cached
+        query.invalidate('soccer')
+        assert query.todays_matches('soccer') is not cached
+
+        recent = _payload(query.team_results('soccer', 'arsenal'))
+        assert [m['match_id'] for m in recent['matches']] == ['m5']
+
+
+def test_live_matches_from_store_and_gzip():
+    store = LiveStateStore()
+    store.apply('soccer', [_match(f'l{i}', 'Home' * 50, 'Away', status='live') for i in range(10)]
+                + [_match('p', 'Home', 'Away')])
+    query = QueryService(None, store, compress_min_bytes=100)
+
+    cached = query.live_matches('soccer')
+    assert len(_payload(cached)['matches']) == 10
+    assert json.loads(gzip.decompress(cached.gzipped)) == _payload(cached)
+    assert QueryService(None, LiveStateStore()).live_matches().gzipped is None
+
+
+def test_predictions_for_pregame_matches():
+    """Pregame matches in the live store are predicted in one batch, ordered by match_id"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'query.db'))
+        db.insert_match_data('soccer', [_match('h1', 'Arsenal', 'Chelsea', '2:0', 'finished')])
+        store = LiveStateStore()
+        store.apply('soccer', [_match('p2', 'Chelsea', 'Arsenal'), _match('p1', 'Arsenal', 'Chelsea'),
+                               _match('l1', 'Spurs', 'Everton', status='live')])
+        predictor = MatchPredictor(db)
+        query = QueryService(db, store, predictor=predictor)
+
+        predictions = _payload(query.predictions('soccer'))['predictions']
+        assert [p['match_id'] for p in predictions] == ['p1', 'p2']
+        single = predictor.predict_match_outcome('Arsenal', 'Chelsea', 'soccer')
+        assert predictions[0]['prediction'] == single['prediction']
+
+
+def test_http_endpoints():
+    """Responses are gzipped on request and revalidate with ETags"""
+    pytest.importorskip('fastapi')
+    pytest.importorskip('httpx')
+    from fastapi.testclient import TestClient
+    from service.feed import LiveFeed
+    from service.server import create_app
+
+    store = LiveStateStore()
+    store.apply('soccer', [_match(f'l{i}', 'Home' * 50, 'Away', status='live') for i in range(10)])
+    query = QueryService(None, store)
+
+    with TestClient(create_app(LiveFeed(), store, query=query)) as client:
+        response = client.get('/matches/live', params={'sport': 'soccer'}, headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['content-encoding'] == 'gzip'
+        assert len(response.json()['matches']) == 10
+
+        etag = response.headers['etag']
+        assert client.get('/matches/live', params={'sport': 'soccer'},
+                          headers={'If-None-Match': etag}).status_code == 304
+        assert client.get('/cache/stats').json()['hits'] == 1
+
+
+if __name__ == '__main__':
+    test_keyset_pages_and_invalidation()
+    test_live_matches_from_store_and_gzip()
+    test_predictions_for_pregame_matches()
+    test_http_endpoints()
+    print("SUCCESS: Query API tests passed")
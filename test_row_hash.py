@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test row-hash change detection on the write path
+"""
+import sys
+import os
+import sqlite3
+import tempfile
+from datetime import date
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from storage.database import DatabaseManager
+
+
+def _match(match_id, score='0:0', odds_home=2.0, **extra):
+    match = {'match_id': match_id, 'home_team': 'Home', 'away_team': 'Away', 'score': score,
+             'status': 'live', 'odds_home': odds_home}
+    match.update(extra)
+    return match
+
+
+def _timestamps(db, table):
+    with sqlite3.connect(db.db_path) as conn:
+        return dict(conn.execute(f"SELECT match_id, timestamp FROM {table}"))
+
+
+def test_unchanged_rows_are_skipped():
+    """Repeated polls only rewrite matches whose tracked fields changed"""
+    for compact in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = DatabaseManager(os.path.join(tmp, 'hash.db'), compact=compact)
+            table = db.get_table_name('soccer')
+
+            assert db.insert_match_data('soccer', [_match('a'), _match('b')]) == 2
+            assert db.get_write_metrics(reset=True) == {'new': 2, 'updated': 0, 'unchanged': 0, 'history': 2}
+
+            # Same data again: nothing is written
+            before = _timestamps(db, table)
+            assert db.insert_match_data('soccer', [_match('a'), _match('b')]) == 2
+            assert db.get_write_metrics(reset=True) == {'new': 0, 'updated': 0, 'unchanged': 2, 'history': 0}
+            assert _timestamps(db, table) == before
+
+            # A score change and an event_count change are both detected
+            db.insert_match_data('soccer', [_match('a', score='1:0'), _match('b', event_count=3)])
+            assert db.get_write_metrics() == {'new': 0, 'updated': 2, 'unchanged': 0, 'history': 1}
+            scores = {m['match_id']: m['score'] for m in db.get_matches_by_date('soccer', date.today())}
+            assert scores == {'a': '1:0', 'b': '0:0'}
+
+
+def test_hashes_survive_restart():
+    """A new process loads stored hashes instead of rewriting every row once"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'restart.db')
+        DatabaseManager(path).insert_match_data('soccer', [_match('a'), _match('b')])
+
+        db = DatabaseManager(path)
+        db.insert_match_data('soccer', [_match('a'), _match('b', odds_home=2.5)])
+        assert db.get_write_metrics() == {'new': 0, 'updated': 1, 'unchanged': 1, 'history': 1}
+
+
+def test_v2_tables_gain_row_hash_in_place():
+    """Existing row tables get the row_hash column without a rebuild"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'v2.db')
+        db = DatabaseManager(path)
+        db.insert_match_data('soccer', [_match('a')])
+        table = db.get_table_name('soccer')
+
+        # Simulate a database written before row hashes
+        with sqlite3.connect(path) as conn:
+            conn.execute(f"ALTER TABLE {table} DROP COLUMN row_hash")
+            conn.execute("PRAGMA user_version = 2")
+
+        db = DatabaseManager(path)
+        with sqlite3.connect(path) as conn:
+            assert 'row_hash' in {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        db.insert_match_data('soccer', [_match('a')])
+        db.insert_match_data('soccer', [_match('a')])
+        assert db.get_write_metrics() == {'new': 0, 'updated': 1, 'unchanged': 1, 'history': 0}
+
+
+if __name__ == '__main__':
+    test_unchanged_rows_are_skipped()
+    test_hashes_survive_restart()
+    test_v2_tables_gain_row_hash_in_place()
+    print("SUCCESS: Row hash tests passed")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test schema versioning and the batched startup migration of daily tables
+"""
+import sys
+import os
+import sqlite3
+import tempfile
+from datetime import date
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from storage.database import DatabaseManager, SCHEMA_VERSION, COMPACT_SCHEMA_VERSION, DAILY_COLUMNS
+
+
+def _create_legacy_tables(path):
+    """Tables as written by older releases: v1 (is_live/confidence) and the 16-column layout"""
+    with sqlite3.connect(path) as conn:
+        conn.execute('''
+            CREATE TABLE soccer_2024_01_05 (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, match_id TEXT UNIQUE NOT NULL,
+                timestamp DATETIME, home_team TEXT NOT NULL, away_team TEXT NOT NULL,
+                score TEXT, status TEXT, is_live BOOLEAN, confidence REAL, period INTEGER,
+                tournament TEXT, sport TEXT NOT NULL, odds_home REAL, odds_away REAL,
+                odds_draw REAL, start_time INTEGER, data_source TEXT
+            )
+        ''')
+        conn.execute("CREATE INDEX idx_soccer_2024_01_05_teams ON soccer_2024_01_05 (home_team, away_team)")
+        conn.execute('''
+            INSERT INTO soccer_2024_01_05 (match_id, home_team, away_team, score, status, is_live, sport)
+            VALUES ('a', 'Arsenal', 'Chelsea', '1:0', 'scheduled', 0, 'soccer'),
+                   ('b', 'Spurs', 'Everton', '2:2', 'live', 1, 'soccer')
+        ''')
+        conn.execute('''
+            CREATE TABLE tennis_2024_01_06 (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, match_id TEXT UNIQUE NOT NULL,
+                timestamp DATETIME, home_team TEXT NOT NULL, away_team TEXT NOT NULL,
+                score TEXT, status TEXT, period INTEGER, tournament TEXT, sport TEXT NOT NULL,
+                odds_home REAL, odds_away REAL, odds_draw REAL, event_count INTEGER,
+                start_time INTEGER, data_source TEXT
+            )
+        ''')
+        conn.execute('''
+            INSERT INTO tennis_2024_01_06 (match_id, home_team, away_team, status, sport, event_count)
+            VALUES ('t', 'Nadal', 'Federer', 'pregame', 'tennis', 7)
+        ''')
+        # Not a daily table, must be left alone
+        conn.execute("CREATE TABLE notes_misc (id INTEGER, body TEXT)")
+
+
+def test_startup_migrates_outdated_tables_once():
+    """Outdated daily tables are upgraded in one pass and user_version makes reruns O(1)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'legacy.db')
+        _create_legacy_tables(path)
+
+        db = DatabaseManager(path)
+        with sqlite3.connect(path) as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+            for table in ('soccer_2024_01_05', 'tennis_2024_01_06'):
+                columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+                assert columns == set(DAILY_COLUMNS), table
+            indexes = {row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'soccer_2024_01_05'")}
+            assert 'idx_soccer_2024_01_05_timestamp' in indexes
+            assert {row[1] for row in conn.execute("PRAGMA table_info(notes_misc)")} == {'id', 'body'}
+
+        soccer = {m['match_id']: m for m in db.get_matches_by_date('soccer', date(2024, 1, 5))}
+        assert soccer['a']['status'] == 'pregame' and soccer['b']['status'] == 'live'
+        assert soccer['a']['score'] == '1:0'
+        assert db.get_matches_by_date('tennis', date(2024, 1, 6))[0]['event_count'] == 7
+
+        calls = []
+        assert db.migrate_all_tables(progress=lambda done, total: calls.append(done)) == 0
+        assert calls == []
+
+
+def test_new_tables_record_their_version():
+    """table_metadata records v2 for row tables and v3 for compact ones"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'versions.db'))
+        db.create_daily_table('soccer', date(2024, 2, 1))
+        db.compact = True
+        db.create_daily_table('tennis', date(2024, 2, 1))
+
+        with sqlite3.connect(db.db_path) as conn:
+            versions = dict(conn.execute("SELECT table_name, schema_version FROM table_metadata"))
+        assert versions == {'soccer_2024_02_01': SCHEMA_VERSION, 'tennis_2024_02_01': COMPACT_SCHEMA_VERSION}
+
+
+if __name__ == '__main__':
+    test_startup_migrates_outdated_tables_once()
+    test_new_tables_record_their_version()
+    print("SUCCESS: Schema versioning tests passed")
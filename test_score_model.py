@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test the vectorized Poisson score model and the predictor's score predictions
+"""
+import sys
+import os
+import math
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from storage.database import DatabaseManager
+from analysis.score_model import ScoreModel
+from analysis.predictor import MatchPredictor
+
+
+def _reference(home_rate, away_rate, max_goals=10):
+    """Cell-by-cell score matrix, normalized like the model's"""
+    pmf = lambda rate, k: math.exp(-rate) * rate ** k / math.factorial(k)
+    cells = {(h, a): pmf(home_rate, h) * pmf(away_rate, a) for h in range(max_goals + 1) for a in range(max_goals + 1)}
+    total = sum(cells.values())
+    return {cell: probability / total for cell, probability in cells.items()}
+
+
+def test_batch_matches_reference():
+    """1X2, over/under and correct scores agree with a per-cell computation"""
+    model = ScoreModel()
+    results = model.evaluate([1.6, 0.9, 0.0], [1.1, 2.3, 0.4])
+    for (home_rate, away_rate), result in zip([(1.6, 1.1), (0.9, 2.3)], results):
+        cells = _reference(home_rate, away_rate)
+        home_win = sum(p for (h, a), p in cells.items() if h > a)
+        draw = sum(p for (h, a), p in cells.items() if h == a)
+        over = sum(p for (h, a), p in cells.items() if h + a > 2.5)
+        best = max(cells, key=cells.get)
+
+        assert abs(result['probabilities']['home_win'] - home_win) < 1e-4
+        assert abs(result['probabilities']['draw'] - draw) < 1e-4
+        assert abs(sum(result['probabilities'].values()) - 1) < 1e-3
+        assert abs(result['over_under']['2.5']['over'] - over) < 1e-4
+        assert result['predicted_score'] == f"{best[0]}:{best[1]}" == result['correct_scores'][0]['score']
+        assert len(result['correct_scores']) == 5
+
+    # A zero rate is floored instead of producing NaNs
+    assert results[2]['predicted_score'] == '0:0'
+    assert not any(math.isnan(p) for p in results[2]['probabilities'].values())
+
+
+def test_cache_per_rate_pair():
+    """Repeated expected-goals pairs (after rounding) are computed once"""
+    model = ScoreModel()
+    first = model.evaluate([1.5, 1.5, 1.501], [1.0, 1.0, 1.0])
+    # Callers get copies: changing one result leaves the others and the cache alone
+    first[0]['probabilities']['draw'] = None
+    first[0]['correct_scores'].clear()
+    assert first[1]['probabilities']['draw'] is not None
+    again = model.evaluate([1.5], [1.0])[0]
+    assert again == first[2] and again['correct_scores']
+    stats = model.get_stats()
+    assert stats['entries'] == 1 and stats['hits'] == 1
+
+
+def test_predictor_score_predictions():
+    """predict_scores() gives the same distribution as predict_score() per match"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'scores.db'))
+        db.insert_match_data('soccer', [
+            {'match_id': 'a', 'home_team': 'Arsenal', 'away_team': 'Chelsea', 'score': '3:1'},
+            {'match_id': 'b', 'home_team': 'Chelsea', 'away_team': 'Spurs', 'score': '0:0'},
+        ])
+        predictor = MatchPredictor(db)
+        upcoming = [{'match_id': 'u1', 'home_team': 'Arsenal', 'away_team': 'Spurs'},
+                    {'match_id': 'u2', 'home_team': 'Chelsea', 'away_team': 'Arsenal'}]
+
+        batch = predictor.predict_scores(upcoming, 'soccer')
+        for match, scored in zip(upcoming, batch):
+            single = predictor.predict_score(match['home_team'], match['away_team'], 'soccer')
+            assert scored['match_id'] == match['match_id']
+            for key in ('predicted_score', 'expected_home_goals', 'expected_away_goals', 'probabilities', 'over_under'):
+                assert scored[key] == single[key], key
+        assert batch[0]['expected_home_goals'] == 1.5  # (3 scored per game + 0 conceded by Spurs) / 2
+
+
+if __name__ == "__main__":
+    test_batch_matches_reference()
+    test_cache_per_rate_pair()
+    test_predictor_score_predictions()
+    print("SUCCESS: Poisson score model works!")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test the storage backend interface and the DuckDB analytics backend
+"""
+import sys
+import os
+import tempfile
+from datetime import date, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+import pytest
+
+from storage.backend import StorageBackend, create_backend
+from storage.database import DatabaseManager
+
+
+def _match(match_id, home, away, score, odds_home=None):
+    return {'match_id': match_id, 'home_team': home, 'away_team': away, 'score': score,
+            'odds_home': odds_home}
+
+
+def test_sqlite_is_a_storage_backend():
+    """DatabaseManager implements the interface and the factory opens it"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = create_backend('sqlite', os.path.join(tmp, 'backend.db'))
+        assert isinstance(db, DatabaseManager) and isinstance(db, StorageBackend)
+        db.insert_match_data('soccer', [_match('1', 'Arsenal', 'Chelsea', '1:0')])
+        assert [m['match_id'] for m in db.get_recent_matches('soccer', days=1)] == ['1']
+
+        with pytest.raises(ValueError):
+            create_backend('postgres')
+
+
+def test_duckdb_backend_syncs_and_serves_reads():
+    """The DuckDB backend mirrors the SQLite tables and answers the same read calls"""
+    pytest.importorskip('duckdb')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        today = date.today()
+        db = DatabaseManager(os.path.join(tmp, 'live.db'))
+        db.insert_match_data('soccer', [_match('1', 'Arsenal', 'Chelsea', '1:0', 2.1)])
+        db.compact = True
+        db.insert_match_data('soccer', [_match('2', 'Spurs', 'Arsenal', '0:2')],
+                             target_date=today - timedelta(days=1))
+
+        analytics = create_backend('duckdb', os.path.join(tmp, 'analytics.duckdb'))
+        assert analytics.sync_from(db)['rows_synced'] == 2
+        # Nothing changed since the last sync
+        assert analytics.sync_from(db)['tables_synced'] == 0
+
+        rows = list(analytics.iter_matches('soccer', today - timedelta(days=2), today,
+                                           columns=['match_id', 'score'], ordered=True))
+        assert rows == [{'match_id': '1', 'score': '1:0'}, {'match_id': '2', 'score': '0:2'}]
+
+        arsenal = list(analytics.iter_matches('soccer', today - timedelta(days=2), today, columns=['match_id'],
+                                              where='lower(away_team) = ?', params=('arsenal',),
+                                              row_factory='tuple'))
+        assert arsenal == [('2',)]
+
+        stats = analytics.get_database_stats()
+        assert stats['total_records'] == 2 and stats['per_sport']['soccer']['tables'] == 2
+
+        # Writes go straight in too, with change-only history
+        analytics.insert_match_data('soccer', [_match('1', 'Arsenal', 'Chelsea', '2:0', 2.1)])
+        analytics.insert_match_data('soccer', [_match('1', 'Arsenal', 'Chelsea', '2:0', 2.1)])
+        assert [h['score'] for h in analytics.get_match_history('1')] == ['1:0', '2:0']
+        assert analytics.get_matches_by_date('soccer', today)[0]['score'] == '2:0'
+        analytics.close()
+
+
+if __name__ == '__main__':
+    test_sqlite_is_a_storage_backend()
+    test_duckdb_backend_syncs_and_serves_reads()
+    print("SUCCESS: Storage backend tests passed")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test the rolling team aggregate store behind MatchPredictor
+"""
+import sys
+import os
+import tempfile
+from datetime import date, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from storage.database import DatabaseManager
+from analysis.aggregates import TeamAggregateStore
+from analysis.predictor import MatchPredictor
+from match_fixtures import make_match as _match
+
+
+def test_results_replace_and_expire():
+    """A match counts once with its latest score; results leave the window with their day"""
+    store = TeamAggregateStore(window_days=7)
+    today = date.today()
+    store.record_results('soccer', [_match('m1', 'Man City', 'Arsenal', '1:0')])
+    store.record_results('soccer', [_match('m1', 'Man City', 'Arsenal', '1:1'),
+                                    _match('m2', 'Arsenal FC', 'Chelsea', '2:0')])
+    store.record_results('soccer', [_match('m3', 'Arsenal', 'Spurs', '0:3')], day=today - timedelta(days=5))
+    store.record_results('soccer', [_match('old', 'Arsenal', 'Spurs', '9:0')], day=today - timedelta(days=8))
+
+    arsenal = store.get('soccer', 'arsenal')
+    assert (arsenal['total_matches'], arsenal['wins'], arsenal['draws'], arsenal['losses']) == (3, 1, 1, 1)
+    assert (arsenal['goals_for'], arsenal['goals_against'], arsenal['clean_sheets']) == (3, 4, 1)
+    assert store.get('soccer', 'Manchester City')['draws'] == 1
+    assert store.get('soccer', 'arsenal', days=2)['total_matches'] == 2
+    assert store.get('tennis', 'arsenal') is None
+
+    # Five days later the m3 bucket (day -5) has expired
+    aggregate = store._teams.counters[('soccer', 'arsenal')]
+    aggregate.buckets = {day - timedelta(days=3): bucket for day, bucket in aggregate.buckets.items()}
+    assert store.get('soccer', 'arsenal')['total_matches'] == 2
+
+
+def test_predictor_reads_bootstrapped_store():
+    """The store bootstraps from the database once and answers without further queries"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'aggregates.db'))
+        db.insert_match_data('soccer', [_match('a', 'Arsenal', 'Chelsea', '2:0'), _match('b', 'Spurs', 'Arsenal', '')])
+        db.insert_match_data('soccer', [_match('c', 'Arsenal', 'Everton', '1:1')],
+                             target_date=date.today() - timedelta(days=3))
+        store = TeamAggregateStore(db)
+        predictor = MatchPredictor(db, store)
+
+        stats = predictor.get_team_statistics('Arsenal', 'soccer')
+        assert (stats['total_matches'], stats['wins'], stats['draws']) == (2, 1, 1)
+        assert predictor.get_team_statistics('Nobody', 'soccer')['total_matches'] == 0
+
+        db.insert_match_data('soccer', [_match('d', 'Arsenal', 'Fulham', '3:0')])
+        store.record_results('soccer', [_match('d', 'Arsenal', 'Fulham', '3:0')])
+        assert predictor.get_team_statistics('Arsenal', 'soccer')['wins'] == 2
+        assert store.get_stats()['sports_loaded'] == ['soccer']
+
+
+if __name__ == '__main__':
+    test_results_replace_and_expire()
+    test_predictor_reads_bootstrapped_store()
+    print("SUCCESS: Team aggregate tests passed")